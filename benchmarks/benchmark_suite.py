@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the hot paths of the library: the "perform_analysis"
+function of the "FinancialAnalyzer" and each of its steps, the
+"appreciated_value" and "return_on_investment" functions and the
+"PDFDocGen.generate" function.
+
+The analyzers are built from fixed inputs parameterized by the number of
+line items, the payment frequency and the horizon so every run measures the
+same work. Every benchmark is timed ``repeat`` times and the statistics (in
+seconds per call) are written as JSON; pass a previous JSON file as the
+baseline to report the benchmarks whose median got slower than the
+threshold.
+
+    python -m benchmarks.benchmark_suite --output results.json
+    python -m benchmarks.benchmark_suite --baseline results.json --threshold 0.1
+"""
+
+from __future__ import print_function
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import *
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.calculator.cache import get_mortgage_schedule_cache
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+# The version of the JSON format of the results.
+BENCHMARK_FORMAT_VERSION = 1
+
+# The parameters of the analyzer benchmarks.
+BENCHMARK_LINE_ITEM_COUNTS = (1, 10, 100)
+BENCHMARK_PAYMENT_FREQUENCIES = (
+    ('month', MORTGAGEKIT_MONTH),
+    ('bi_week', MORTGAGEKIT_BI_WEEK),
+    ('week', MORTGAGEKIT_WEEK),
+)
+BENCHMARK_MAX_YEARS = (10, 30)
+
+# The default number of timings per benchmark and the default slowdown of the
+# median (as a fraction of the baseline) reported as a regression.
+BENCHMARK_REPEAT = 5
+BENCHMARK_THRESHOLD = 0.1
+
+# The sample evaluator document used by the PDF benchmark.
+BENCHMARK_PDF_SAMPLE_FILEPATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'evaluator_sample.json'
+)
+
+
+def get_analyzer(number_of_line_items=1, payment_frequency=MORTGAGEKIT_MONTH, max_year=MAX_YEAR):
+    """
+    Function will return an analyzer with ``number_of_line_items`` of every
+    kind of line item.
+    """
+    spec = get_spec(250000)
+    spec['max_year'] = max_year
+    spec['mortgage']['payment_frequency'] = payment_frequency
+    line_items = {
+        'rental_incomes': spec['rental_incomes'][0],
+        'facility_incomes': dict(spec['expenses'][0], annual_amount=Money(amount=1200, currency='USD'), monthly_amount=Money(amount=100, currency='USD'), name_text="Laundry"),
+        'commercial_incomes': dict(spec['expenses'][0], annual_amount=Money(amount=2400, currency='USD'), monthly_amount=Money(amount=200, currency='USD'), name_text="Store"),
+        'expenses': spec['expenses'][0],
+        'purchase_fees': {'pk': 1, 'name_text': "Fee", 'amount': Money(amount=1000, currency='USD')},
+        'capital_improvements': {'pk': 1, 'name_text': "Repair", 'amount': Money(amount=500, currency='USD')}
+    }
+    for key, fields in line_items.items():
+        spec[key] = [
+            dict(fields, pk=pk, name_text="%s %s" % (fields['name_text'], pk))
+            for pk in range(1, number_of_line_items + 1)
+        ]
+    analyzer = create_analyzer(spec)
+    return analyzer
+
+
+def get_benchmark_name(function_name, **parameters):
+    if not parameters:
+        return function_name
+    return '%s[%s]' % (function_name, ','.join('%s=%s' % item for item in sorted(parameters.items())))
+
+
+def get_analyzer_benchmarks():
+    """
+    Function will yield the ``(name, setup)`` of every analyzer benchmark,
+    where "setup()" returns the function to time; the functions only run
+    the step being measured, the steps it depends on are run beforehand.
+    The "perform_analysis" benchmark runs every step, see
+    "FinancialAnalyzer.invalidate_all".
+    """
+    for number_of_line_items in BENCHMARK_LINE_ITEM_COUNTS:
+        for frequency_name, payment_frequency in BENCHMARK_PAYMENT_FREQUENCIES:
+            for max_year in BENCHMARK_MAX_YEARS:
+                parameters = {
+                    'line_items': number_of_line_items,
+                    'payment_frequency': frequency_name,
+                    'max_year': max_year
+                }
+
+                def setup(function_name, arguments=(number_of_line_items, payment_frequency, max_year)):
+                    analyzer = get_analyzer(*arguments)
+                    analyzer.perform_analysis()
+                    if function_name == 'perform_computation_on_mortgage_cold':
+                        def function():
+                            get_mortgage_schedule_cache().clear()
+                            analyzer.perform_computation_on_mortgage()
+                        return function
+                    if function_name == 'perform_analysis':
+                        def function():
+                            analyzer.invalidate_all()
+                            analyzer.perform_analysis()
+                        return function
+                    if function_name == 'perform_analysis_after_expense_change':
+                        expense = analyzer.get_expense(1)
+
+                        def function():
+                            analyzer.add_expense(**expense)
+                            analyzer.perform_analysis()
+                        return function
+                    if function_name == 'perform_computation_on_analysis':
+                        def function():
+                            analyzer._totals_cache.clear()
+                            analyzer.perform_computation_on_analysis()
+                        return function
+                    return getattr(analyzer, function_name)
+
+                for function_name in ('perform_analysis', 'perform_analysis_after_expense_change',
+                                      'perform_computation_on_mortgage',
+                                      'perform_computation_on_mortgage_cold',
+                                      'perform_computation_on_analysis',
+                                      'perform_computation_on_annual_projections'):
+                    yield get_benchmark_name(function_name, **parameters), lambda setup=setup, function_name=function_name: setup(function_name)
+
+
+def get_utils_benchmarks():
+    initial_value = Money(amount=250000, currency='USD')
+    total_return = Money(amount=312500, currency='USD')
+    inflation_rate = Decimal('0.025')
+    for year in (1, 30):
+        yield get_benchmark_name('appreciated_value', year=year), lambda year=year: lambda: appreciated_value(initial_value, year, inflation_rate)
+    yield get_benchmark_name('return_on_investment'), lambda: lambda: return_on_investment(initial_value, total_return)
+
+
+def get_pdf_benchmarks():
+    def setup():
+        from incomepropertyevaluatorkit.pdf.pdfdocgen import PDFDocGen
+        with open(BENCHMARK_PDF_SAMPLE_FILEPATH) as input_file_handle:
+            doc_content = json.load(input_file_handle)
+        pdf_docgen = PDFDocGen(PDF_EVALUATOR_DOCUMENT_ID)
+        pdf_docgen.set_doc_content(doc_content)
+        filepath = os.path.join(tempfile.gettempdir(), 'benchmark_%s.pdf' % os.getpid())
+
+        def generate():
+            pdf_docgen.generate(filepath)
+            os.remove(filepath)
+        return generate
+
+    yield get_benchmark_name('PDFDocGen.generate', doc_id=PDF_EVALUATOR_DOCUMENT_ID), setup
+
+
+def get_benchmarks(include_pdf=True):
+    """
+    Function will yield the ``(name, setup)`` of every benchmark, see
+    "get_analyzer_benchmarks".
+    """
+    for benchmark in get_analyzer_benchmarks():
+        yield benchmark
+    for benchmark in get_utils_benchmarks():
+        yield benchmark
+    if include_pdf:
+        for benchmark in get_pdf_benchmarks():
+            yield benchmark
+
+
+def time_function(function, repeat=BENCHMARK_REPEAT, min_time=0.05):
+    """
+    Function will return the statistics of the seconds per call of
+    ``function`` over ``repeat`` timings; every timing calls it as many
+    times as it takes to run for at least ``min_time`` seconds.
+    """
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    while elapsed < min_time:
+        number *= 2
+        elapsed = timer.timeit(number)
+    timings = [timer.timeit(number) / number for iteration in range(repeat)]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if repeat > 1 else 0.0
+    }
+
+
+def run_benchmarks(pattern=None, repeat=BENCHMARK_REPEAT, min_time=0.05, include_pdf=True):
+    """
+    Function will run every benchmark whose name contains ``pattern`` and
+    return the results in the JSON format.
+    """
+    benchmarks = {}
+    for name, setup in get_benchmarks(include_pdf):
+        if pattern is not None and pattern not in name:
+            continue
+        benchmarks[name] = time_function(setup(), repeat, min_time)
+    return {
+        'version': BENCHMARK_FORMAT_VERSION,
+        'metadata': {
+            'date': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine()
+        },
+        'benchmarks': benchmarks
+    }
+
+
+def compare_with_baseline(results, baseline, threshold=BENCHMARK_THRESHOLD):
+    """
+    Function will return the list of ``(name, baseline_median, median,
+    ratio)`` of the benchmarks in both ``results`` and ``baseline`` whose
+    median is more than ``threshold`` (a fraction) slower than the baseline.
+    """
+    assert baseline.get('version') == BENCHMARK_FORMAT_VERSION, 'baseline version is not supported: %r' % baseline.get('version')
+    regressions = []
+    for name, statistics_info in sorted(results['benchmarks'].items()):
+        baseline_info = baseline['benchmarks'].get(name)
+        if baseline_info is None:
+            continue
+        ratio = statistics_info['median'] / baseline_info['median']
+        if ratio > 1.0 + threshold:
+            regressions.append((name, baseline_info['median'], statistics_info['median'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('--output', help='JSON file to write the results to.')
+    parser.add_argument('--baseline', help='JSON file of the results to compare with.')
+    parser.add_argument('--threshold', type=float, default=BENCHMARK_THRESHOLD, help='Slowdown of the median reported as a regression (default: %(default)s).')
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT, help='Number of timings per benchmark (default: %(default)s).')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum seconds per timing (default: %(default)s).')
+    parser.add_argument('--filter', help='Only run the benchmarks whose name contains this text.')
+    parser.add_argument('--no-pdf', action='store_true', help='Skip the PDF benchmarks.')
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(arguments.filter, arguments.repeat, arguments.min_time, not arguments.no_pdf)
+    for name, statistics_info in sorted(results['benchmarks'].items()):
+        print('%-110s %12.3f us' % (name, statistics_info['median'] * 1e6))
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file_handle:
+            json.dump(results, output_file_handle, indent=2, sort_keys=True)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file_handle:
+            baseline = json.load(baseline_file_handle)
+        regressions = compare_with_baseline(results, baseline, arguments.threshold)
+        for name, baseline_median, median, ratio in regressions:
+            print('REGRESSION %s: %.3f us -> %.3f us (x%.2f)' % (name, baseline_median * 1e6, median * 1e6, ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio front-end of the "FinancialAnalyzer.perform_analysis" and
+"PDFDocGen.generate" functions. The work runs in an executor (a pool of
+threads by default, or processes) so it does not block the event loop, and a
+semaphore limits how many run at the same time so a few heavy documents do
+not hold up every other request.
+
+    evaluator = AsyncEvaluator(ProcessPoolExecutor(), max_concurrency=4)
+    results = await evaluator.perform_analysis(analyzer)
+    async for chunk in evaluator.iter_pdf_chunks(doc_content):
+        await response.write(chunk)
+
+Cancelling a call releases its slot at once; work which is still queued in
+the executor is dropped but work already running finishes in the background
+(threads and processes cannot be interrupted) and its result is discarded.
+"""
+
+from __future__ import print_function
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.parallel import perform_analysis_on_item
+from incomepropertyevaluatorkit.pdf.parallel import generate_pdf_on_item
+
+
+# "asyncio.get_running_loop" is new in Python 3.7; on Python 3.6 the
+# "asyncio.get_event_loop" called from a coroutine returns the running loop.
+get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+class AsyncEvaluator:
+    """
+    Class will run the analyses and PDF generations in the ``executor``, at
+    most ``max_concurrency`` at a time. The executor must be able to pickle
+    the items when it is a pool of processes; a pool of ``max_concurrency``
+    threads is created (and shut down by "close") if "None".
+
+    The evaluator can be used from several event loops (ex: one per thread);
+    every loop gets its own semaphore, so the limit applies per loop.
+    """
+
+    def __init__(self, executor=None, max_concurrency=ASYNC_MAX_CONCURRENCY,
+                 chunk_size=ASYNC_PDF_CHUNK_SIZE):
+        assert max_concurrency > 0, 'max_concurrency is not positive: %r' % max_concurrency
+        assert chunk_size > 0, 'chunk_size is not positive: %r' % chunk_size
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._executor = executor
+        self._max_concurrency = max_concurrency
+        self._chunk_size = chunk_size
+        self._semaphores = weakref.WeakKeyDictionary()  # Keyed by event loop.
+
+    def get_semaphore(self):
+        """
+        Function will return the semaphore of the running event loop; call
+        it from a coroutine.
+        """
+        loop = get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Function will wait for a free slot, call the ``function`` in the
+        executor and return its result.
+        """
+        async with self.get_semaphore():
+            loop = get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def perform_analysis(self, item, include_schedule=False):
+        """
+        Function will return the results of the analysis of the
+        "FinancialAnalyzer" or property spec ``item``, see
+        "perform_analysis_on_item".
+        """
+        return await self.run(perform_analysis_on_item, item, include_schedule)
+
+    async def perform_analyses(self, items, include_schedule=False):
+        """
+        Function will return the list of results of every item in ``items``
+        in the same order; the analyses share the concurrency limit.
+        """
+        return await asyncio.gather(*[self.perform_analysis(item, include_schedule) for item in items])
+
+    async def generate_pdf(self, doc_content, doc_id=PDF_EVALUATOR_DOCUMENT_ID):
+        """
+        Function will return the bytes of the PDF document of the
+        ``doc_content``.
+        """
+        return await self.run(generate_pdf_on_item, doc_content, None, doc_id)
+
+    async def iter_pdf_chunks(self, doc_content, doc_id=PDF_EVALUATOR_DOCUMENT_ID,
+                              chunk_size=None):
+        """
+        Function will generate the PDF document of the ``doc_content`` and
+        yield its bytes in chunks of ``chunk_size`` (by default the one of
+        this evaluator), ex: to write them into a streaming HTTP response.
+        """
+        chunk_size = chunk_size or self._chunk_size
+        pdf_bytes = await self.generate_pdf(doc_content, doc_id)
+        pdf_view = memoryview(pdf_bytes)
+        for start in range(0, len(pdf_view), chunk_size):
+            yield pdf_view[start:start + chunk_size].tobytes()
+
+    def close(self, wait=True):
+        if self._owns_executor:
+            self._executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        # Do not block the event loop on the work left running.
+        self.close(wait=False)
@@ -1,2 +1,15 @@
 # -*- coding: utf-8 -*-
+from incomepropertyevaluatorkit.calculator import cache
+from incomepropertyevaluatorkit.calculator import instrumentation
+from incomepropertyevaluatorkit.calculator import growth
+from incomepropertyevaluatorkit.calculator import lineitem
+from incomepropertyevaluatorkit.calculator import backend
 from incomepropertyevaluatorkit.calculator import analyzer
+from incomepropertyevaluatorkit.calculator import projection
+from incomepropertyevaluatorkit.calculator import batch
+from incomepropertyevaluatorkit.calculator import parallel
+from incomepropertyevaluatorkit.calculator import sensitivity
+from incomepropertyevaluatorkit.calculator import simulation
+from incomepropertyevaluatorkit.calculator import snapshot
+from incomepropertyevaluatorkit.calculator import export
+from incomepropertyevaluatorkit.calculator import scenario
@@ -10,11 +10,82 @@ import argparse
 from datetime import datetime, timedelta
 from decimal import Decimal
 import math
-import numpy as np  # Third party library to utilize "irr" function.
+from time import perf_counter
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2.
+    from collections import Mapping
+import numpy as np  # Third party library for fast numeric arrays.
 from moneyed import Money # Third party library for "Money" datatype.
 from mortgagekit.calculator import *
 from incomepropertyevaluatorkit.foundation.utils import *
-from incomepropertyevaluatorkit.foundation.constants import MAX_YEAR
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.projection import *
+from incomepropertyevaluatorkit.calculator.cache import *
+from incomepropertyevaluatorkit.calculator.growth import *
+from incomepropertyevaluatorkit.calculator.lineitem import *
+from incomepropertyevaluatorkit.calculator.backend import *
+from incomepropertyevaluatorkit.calculator.instrumentation import *
+
+
+# The "mortgagekit" library compares payment frequencies by identity, which is
+# lost when a "Decimal" gets pickled, so we always hand it its own constants.
+MORTGAGEKIT_PAYMENT_FREQUENCIES = {
+    frequency: frequency for frequency in (
+        MORTGAGEKIT_ANNUAL, MORTGAGEKIT_SEMI_ANNUAL, MORTGAGEKIT_QUARTER,
+        MORTGAGEKIT_BI_MONTH, MORTGAGEKIT_MONTH, MORTGAGEKIT_BI_WEEK,
+        MORTGAGEKIT_WEEK
+    )
+}
+
+
+# The cached totals which are out of date once the input (the key) changes.
+TOTALS_CACHE_DEPENDENCIES = {
+    'rental_income': ('rental_income', 'gross_income', 'net_income_without_mortgage', 'net_income_with_mortgage', 'growth_curve'),
+    'facility_income': ('facility_income', 'gross_income', 'net_income_without_mortgage', 'net_income_with_mortgage', 'growth_curve'),
+    'commercial_income': ('commercial_income', 'gross_income', 'net_income_without_mortgage', 'net_income_with_mortgage', 'growth_curve'),
+    'expense': ('expense', 'net_income_without_mortgage', 'net_income_with_mortgage', 'growth_curve'),
+    'purchase_fee': ('purchase_fee', 'initial_investment'),
+    'capital_improvement': ('capital_improvement', 'initial_investment'),
+    'mortgage': ('net_income_with_mortgage',),
+}
+
+
+# The steps of "perform_analysis" which are out of date once the input (the
+# key) changes; the other steps are skipped and keep their previous results.
+# The mortgage step only depends on the loan itself, the aggregation step on
+# the line items and the projections on nearly every input.
+ANALYSIS_STEPS = ('mortgage', 'aggregation', 'annual_projections')
+ANALYSIS_STEP_DEPENDENCIES = {
+    'rental_income': ('aggregation', 'annual_projections'),
+    'facility_income': ('aggregation', 'annual_projections'),
+    'commercial_income': ('aggregation', 'annual_projections'),
+    'expense': ('aggregation', 'annual_projections'),
+    'purchase_fee': ('aggregation', 'annual_projections'),
+    'capital_improvement': ('aggregation', 'annual_projections'),
+    'mortgage': ANALYSIS_STEPS,
+    'loan_balance_method': ('mortgage', 'annual_projections'),
+    'purchase_price': ('aggregation', 'annual_projections'),
+    'inflation_rate': ('annual_projections',),
+    'selling_fee_rate': ('annual_projections',),
+    'buying_fee_rate': (),
+    'max_year': ('annual_projections',),
+    'projection_engine': ('annual_projections',),
+    'numeric_backend': ('annual_projections',),
+}
+
+
+# The attributes of the line item collections and the keys of the changes of
+# "apply_changes" (the same as in the results of "perform_analysis") with
+# their "add_*" and "remove_*" functions.
+LINE_ITEM_COLLECTIONS = (
+    ('_rental_income_dict', 'rental_incomes', 'add_rental_income', 'remove_rental_income'),
+    ('_facility_income_dict', 'facility_incomes', 'add_facility_income', 'remove_facility_income'),
+    ('_expense_dict', 'expenses', 'add_expense', 'remove_expense'),
+    ('_commercial_income_dict', 'commercial_incomes', 'add_commercial_income', 'remove_commercial_income'),
+    ('_fee_dict', 'purchase_fees', 'add_purchase_fee', 'remove_purchase_fee'),
+    ('_capital_improvements_dict', 'capital_improvements', 'add_capital_improvement', 'remove_capital_improvement'),
+)
 
 
 class FinancialAnalyzer:
@@ -30,31 +101,149 @@ class FinancialAnalyzer:
     def __init__(self, currency='USD'):
         self._currency = currency
         self._purchase_price = Money(amount=0, currency=currency)
-        self._inflation_rate = Money(amount=0, currency=currency)
-        self._selling_fee_rate = Money(amount=0, currency=currency)
-        self._buying_fee_rate = Money(amount=0, currency=currency)
+        self._inflation_rate = Decimal(0)
+        self._inflation_curve = None
+        self._selling_fee_rate = Decimal(0)
+        self._buying_fee_rate = Decimal(0)
+        self._mortgage_terms = None
         self._mortgage_calculator = None
         self._mortgage_payment_schedule = None
-        self._rental_income_dict = {}
-        self._facility_income_dict = {}
-        self._expense_dict = {}
-        self._commercial_income_dict = {}
-        self._fee_dict = {}
-        self._capital_improvements_dict = {}
+        self._loan_balance_schedule = None
+        self._rental_income_dict = LineItemCollection(RentalIncomeLineItem, ('monthly_amount_per_unit', 'annual_amount_per_unit', 'number_of_units', 'growth_curve'), currency)
+        self._facility_income_dict = LineItemCollection(AmountLineItem, ('monthly_amount', 'annual_amount', 'growth_curve'), currency)
+        self._expense_dict = LineItemCollection(AmountLineItem, ('monthly_amount', 'annual_amount', 'growth_curve'), currency)
+        self._commercial_income_dict = LineItemCollection(AmountLineItem, ('monthly_amount', 'annual_amount', 'growth_curve'), currency)
+        self._fee_dict = LineItemCollection(FeeLineItem, ('amount',), currency)
+        self._capital_improvements_dict = LineItemCollection(FeeLineItem, ('amount',), currency)
+        self._projection_engine = PROJECTION_ENGINE_SCALAR
+        self._loan_balance_method = LOAN_BALANCE_METHOD_SCHEDULE
+        self._max_year = MAX_YEAR
+        self._numeric_backend = None  # Use the default numeric backend.
+        self._verify_numeric_backend = False
+        self._instrumentation = None  # See "calculator/instrumentation.py".
+
+        # The totals of the line items are cached until one of the "add_*",
+        # "remove_*" or "set_*" functions changes an input they depend on.
+        self._totals_cache = {}
+
+        # The steps of the analysis to run again, see "perform_analysis".
+        self._stale_steps = set(ANALYSIS_STEPS)
+        self._mortgage_schedule_included = None
+        self._annual_projections_backend = None
+
+        # The line item collections shared with forks, see "fork".
+        self._shared_line_items = set()
 
     def set_purchase_price(self, purchase_price):
         assert isinstance(purchase_price, Money), 'purchase_price is not a Money class: %r' % purchase_price
         self._purchase_price = purchase_price
+        self.invalidate('purchase_price')
+
+    def get_currency(self):
+        return self._currency
+
+    def get_purchase_price(self):
+        return self._purchase_price
 
     def set_inflation_rate(self, inflation_rate):
         assert isinstance(inflation_rate, Decimal), 'inflation_rate is not a Decimal class: %r' % inflation_rate
         self._inflation_rate = inflation_rate
+        self._inflation_curve = GrowthCurve(inflation_rate)
+        self.invalidate('inflation_rate')
+
+    def get_inflation_rate(self):
+        return self._inflation_rate
 
     def set_selling_fee_rate(self, selling_fee_rate):
         self._selling_fee_rate = selling_fee_rate
+        self.invalidate('selling_fee_rate')
+
+    def get_selling_fee_rate(self):
+        return self._selling_fee_rate
 
     def set_buying_fee_rate(self, buying_fee_rate):
         self._buying_fee_rate = buying_fee_rate
+        self.invalidate('buying_fee_rate')
+
+    def get_buying_fee_rate(self):
+        return self._buying_fee_rate
+
+    def set_projection_engine(self, projection_engine):
+        """
+        Function will set the engine of the annual projections when the
+        numeric backend is "decimal": "scalar" computes them year by year
+        with "Money" and "vectorized" the same as the "float64" backend. The
+        "float64" and "int64_cents" backends are always vectorized, see
+        "get_projection_backend".
+        """
+        assert projection_engine in (PROJECTION_ENGINE_SCALAR, PROJECTION_ENGINE_VECTORIZED), 'projection_engine is not supported: %r' % projection_engine
+        self._projection_engine = projection_engine
+        self.invalidate('projection_engine')
+
+    def set_numeric_backend(self, numeric_backend, verify=False):
+        """
+        Function will set the numeric backend (one of "NUMERIC_BACKENDS", or
+        "None" to use the default set by "set_default_numeric_backend") used
+        to compute the annual projections; see "calculator/backend.py" for the
+        rounding rules. The numeric backend wins over the projection engine,
+        see "get_projection_backend". If ``verify`` is set then the projections are also
+        computed with the "decimal" backend and an "AssertionError" is raised
+        if they differ by more than the "NUMERIC_BACKEND_TOLERANCES".
+        """
+        assert numeric_backend is None or numeric_backend in NUMERIC_BACKENDS, 'numeric_backend is not supported: %r' % numeric_backend
+        self._numeric_backend = numeric_backend
+        self._verify_numeric_backend = verify
+        self.invalidate('numeric_backend')
+
+    def get_numeric_backend(self):
+        if self._numeric_backend is None:
+            return get_default_numeric_backend()
+        return self._numeric_backend
+
+    def get_projection_backend(self):
+        """
+        Function will return the numeric backend the annual projections are
+        actually computed with: the numeric backend, except that the
+        "vectorized" projection engine turns "decimal" into "float64".
+        """
+        numeric_backend = self.get_numeric_backend()
+        if numeric_backend == NUMERIC_BACKEND_DECIMAL and self._projection_engine == PROJECTION_ENGINE_VECTORIZED:
+            return NUMERIC_BACKEND_FLOAT64
+        return numeric_backend
+
+    def set_max_year(self, max_year):
+        assert isinstance(max_year, int), 'max_year is not a Integer class: %r' % max_year
+        assert max_year > 0, 'max_year is not positive: %r' % max_year
+        self._max_year = max_year
+        self.invalidate('max_year')
+
+    def get_max_year(self):
+        return self._max_year
+
+    def set_instrumentation(self, instrumentation):
+        """
+        Function will attach the ``instrumentation`` (see
+        "calculator/instrumentation.py") which records the steps of the
+        analysis, or detach it if "None".
+        """
+        self._instrumentation = instrumentation
+
+    def get_instrumentation(self):
+        return self._instrumentation
+
+    def get_instrumentation_stats(self):
+        """
+        Function will return the statistics of the attached instrumentation,
+        see "Instrumentation.get_stats", or "None" if there is none.
+        """
+        if self._instrumentation is None:
+            return None
+        return self._instrumentation.get_stats()
+
+    def set_loan_balance_method(self, loan_balance_method):
+        assert loan_balance_method in (LOAN_BALANCE_METHOD_SCHEDULE, LOAN_BALANCE_METHOD_CLOSED_FORM), 'loan_balance_method is not supported: %r' % loan_balance_method
+        self._loan_balance_method = loan_balance_method
+        self.invalidate('loan_balance_method')
     #
     def set_mortgage(self, total_amount, down_payment, amortization_year,
                     annual_interest_rate, payment_frequency, compounding_period,
@@ -65,6 +254,16 @@ class FinancialAnalyzer:
         assert isinstance(annual_interest_rate, Decimal), 'annual_interest_rate is not a Decimal class: %r' % annual_interest_rate
         assert isinstance(payment_frequency, Decimal), 'payment_frequency is not a Decimal class: %r' % payment_frequency
         assert isinstance(compounding_period, Decimal), 'compounding_period is not a Decimal class: %r' % compounding_period
+        payment_frequency = MORTGAGEKIT_PAYMENT_FREQUENCIES.get(payment_frequency, payment_frequency)
+        self._mortgage_terms = {
+            'total_amount': total_amount,
+            'down_payment': down_payment,
+            'amortization_year': amortization_year,
+            'annual_interest_rate': annual_interest_rate,
+            'payment_frequency': payment_frequency,
+            'compounding_period': compounding_period,
+            'first_payment_date': first_payment_date
+        }
         self._mortgage_calculator = MortgageCalculator(
             total_amount,
             down_payment,
@@ -74,8 +273,18 @@ class FinancialAnalyzer:
             compounding_period,
             first_payment_date
         )
+        self.invalidate('mortgage')
 
-    def add_rental_income(self, pk, annual_amount_per_unit, frequency, monthly_amount_per_unit, type_id, name_text, number_of_units):
+    def get_mortgage_terms(self):
+        """
+        Function will return a copy of the "set_mortgage" arguments, or "None"
+        if there is no mortgage.
+        """
+        if self._mortgage_terms is None:
+            return None
+        return dict(self._mortgage_terms)
+
+    def add_rental_income(self, pk, annual_amount_per_unit, frequency, monthly_amount_per_unit, type_id, name_text, number_of_units, growth_curve=None):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert type(annual_amount_per_unit) is Money, "annual_amount_per_unit is not a Money class: %r" % annual_amount_per_unit
         assert type(monthly_amount_per_unit) is Money, "monthly_amount_per_unit is not a Money class: %r" % monthly_amount_per_unit
@@ -83,22 +292,23 @@ class FinancialAnalyzer:
         assert type(number_of_units) is Decimal, "monthly_amount_per_unit is not a Decimal class: %r" % number_of_units
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
         assert isinstance(number_of_units, Decimal), 'number_of_units is not a Decimal class: %r' % number_of_units
-        self._rental_income_dict[pk] = {
-            'pk': pk,
-            'annual_amount_per_unit': annual_amount_per_unit,
-            'frequency': frequency,
-            'monthly_amount_per_unit': monthly_amount_per_unit,
-            'type_id': type_id,
-            'name_text': name_text,
-            'number_of_units': number_of_units
-        }
+        assert growth_curve is None or isinstance(growth_curve, GrowthCurve), 'growth_curve is not a GrowthCurve class: %r' % growth_curve
+        self.get_writable_line_items('_rental_income_dict').add(
+            pk = pk,
+            annual_amount_per_unit = annual_amount_per_unit,
+            frequency = frequency,
+            monthly_amount_per_unit = monthly_amount_per_unit,
+            type_id = type_id,
+            name_text = name_text,
+            number_of_units = number_of_units,
+            growth_curve = growth_curve
+        )
+        self.invalidate('rental_income')
 
     def remove_rental_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
-        try:
-            del self._rental_income_dict[pk]
-        except KeyError:
-            pass
+        self.get_writable_line_items('_rental_income_dict').remove(pk)
+        self.invalidate('rental_income')
 
     def get_rental_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -107,27 +317,28 @@ class FinancialAnalyzer:
         except KeyError:
             return None
 
-    def add_facility_income(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text):
+    def add_facility_income(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text, growth_curve=None):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert type(annual_amount) is Money, "annual_amount is not a Money class: %r" % annual_amount
         assert type(monthly_amount) is Money, "monthly_amount is not a Money class: %r" % monthly_amount
         assert type(frequency) is Decimal, "frequency is not a Decimal class: %r" % frequency
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
-        self._facility_income_dict[pk] = {
-            'pk': pk,
-            'annual_amount': annual_amount,
-            'frequency': frequency,
-            'monthly_amount': monthly_amount,
-            'type_id': type_id,
-            'name_text': name_text,
-        }
+        assert growth_curve is None or isinstance(growth_curve, GrowthCurve), 'growth_curve is not a GrowthCurve class: %r' % growth_curve
+        self.get_writable_line_items('_facility_income_dict').add(
+            pk = pk,
+            annual_amount = annual_amount,
+            frequency = frequency,
+            monthly_amount = monthly_amount,
+            type_id = type_id,
+            name_text = name_text,
+            growth_curve = growth_curve
+        )
+        self.invalidate('facility_income')
 
     def remove_facility_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
-        try:
-            del self._facility_income_dict[pk]
-        except KeyError:
-            pass
+        self.get_writable_line_items('_facility_income_dict').remove(pk)
+        self.invalidate('facility_income')
 
     def get_facility_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -136,27 +347,28 @@ class FinancialAnalyzer:
         except KeyError:
             return None
 
-    def add_expense(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text):
+    def add_expense(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text, growth_curve=None):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert type(annual_amount) is Money, "annual_amount is not a Money class: %r" % annual_amount
         assert type(monthly_amount) is Money, "monthly_amount is not a Money class: %r" % monthly_amount
         assert type(frequency) is Decimal, "frequency is not a Decimal class: %r" % frequency
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
-        self._expense_dict[pk] = {
-            'pk': pk,
-            'annual_amount': annual_amount,
-            'frequency': frequency,
-            'monthly_amount': monthly_amount,
-            'type_id': type_id,
-            'name_text': name_text,
-        }
+        assert growth_curve is None or isinstance(growth_curve, GrowthCurve), 'growth_curve is not a GrowthCurve class: %r' % growth_curve
+        self.get_writable_line_items('_expense_dict').add(
+            pk = pk,
+            annual_amount = annual_amount,
+            frequency = frequency,
+            monthly_amount = monthly_amount,
+            type_id = type_id,
+            name_text = name_text,
+            growth_curve = growth_curve
+        )
+        self.invalidate('expense')
 
     def remove_expense(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
-        try:
-            del self._expense_dict[pk]
-        except KeyError:
-            pass
+        self.get_writable_line_items('_expense_dict').remove(pk)
+        self.invalidate('expense')
 
     def get_expense(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -165,27 +377,28 @@ class FinancialAnalyzer:
         except KeyError:
             return None
 
-    def add_commercial_income(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text):
+    def add_commercial_income(self, pk, annual_amount, frequency, monthly_amount, type_id, name_text, growth_curve=None):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert type(annual_amount) is Money, "annual_amount is not a Money class: %r" % annual_amount
         assert type(monthly_amount) is Money, "monthly_amount is not a Money class: %r" % monthly_amount
         assert type(frequency) is Decimal, "frequency is not a Decimal class: %r" % frequency
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
-        self._commercial_income_dict[pk] = {
-            'pk': pk,
-            'annual_amount': annual_amount,
-            'frequency': frequency,
-            'monthly_amount':monthly_amount,
-            'type_id': type_id,
-            'name_text': name_text,
-        }
+        assert growth_curve is None or isinstance(growth_curve, GrowthCurve), 'growth_curve is not a GrowthCurve class: %r' % growth_curve
+        self.get_writable_line_items('_commercial_income_dict').add(
+            pk = pk,
+            annual_amount = annual_amount,
+            frequency = frequency,
+            monthly_amount = monthly_amount,
+            type_id = type_id,
+            name_text = name_text,
+            growth_curve = growth_curve
+        )
+        self.invalidate('commercial_income')
 
     def remove_commercial_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
-        try:
-            del self._commercial_income_dict[pk]
-        except KeyError:
-            pass
+        self.get_writable_line_items('_commercial_income_dict').remove(pk)
+        self.invalidate('commercial_income')
 
     def get_commercial_income(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -198,11 +411,12 @@ class FinancialAnalyzer:
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
         assert isinstance(amount, Money), "amount is not a Money class: %r" % amount
-        self._fee_dict[pk] = {
-            'pk': pk,
-            'name_text': name_text,
-            'amount': amount
-        }
+        self.get_writable_line_items('_fee_dict').add(
+            pk = pk,
+            name_text = name_text,
+            amount = amount
+        )
+        self.invalidate('purchase_fee')
 
     def get_purchase_fee(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -213,20 +427,19 @@ class FinancialAnalyzer:
 
     def remove_purchase_fee(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
-        try:
-            del self._fee_dict[pk]
-        except KeyError:
-            pass
+        self.get_writable_line_items('_fee_dict').remove(pk)
+        self.invalidate('purchase_fee')
 
     def add_capital_improvement(self, pk, name_text, amount):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
         assert isinstance(name_text, str), 'name_text is not a String class: %r' % name_text
         assert isinstance(amount, Money), "amount is not a Money class: %r" % amount
-        self._capital_improvements_dict[pk] = {
-            'pk': pk,
-            'name_text': name_text,
-            'amount': amount
-        }
+        self.get_writable_line_items('_capital_improvements_dict').add(
+            pk = pk,
+            name_text = name_text,
+            amount = amount
+        )
+        self.invalidate('capital_improvement')
 
     def get_capital_improvement(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
@@ -237,21 +450,61 @@ class FinancialAnalyzer:
 
     def remove_capital_improvement(self, pk):
         assert isinstance(pk, int), 'pk is not a Integer class: %r' % pk
+        self.get_writable_line_items('_capital_improvements_dict').remove(pk)
+        self.invalidate('capital_improvement')
+
+    def perform_analysis(self, include_schedule=True):
+        """
+        Function will perform the analysis and return the results; the
+        mortgage payment schedule is only included (and, with the closed form
+        loan balance method, only built) if ``include_schedule`` is set.
+
+        Only the steps which depend on an input changed since the previous
+        analysis are run again (see "ANALYSIS_STEP_DEPENDENCIES"), the results
+        of the other steps are the same objects as in the previous results.
+        Call "invalidate_all" after changing the line items in place.
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is None or not instrumentation.is_counting_money_allocations():
+            return self.perform_analysis_steps(include_schedule)
+
+        # The "Money" allocations are only counted while the analysis runs,
+        # so nothing stays patched if the analyzer is never detached.
+        start_counting_money_allocations()
         try:
-            del self._capital_improvements_dict[pk]
-        except KeyError:
-            pass
+            return self.perform_analysis_steps(include_schedule)
+        finally:
+            stop_counting_money_allocations()
+
+    def perform_analysis_steps(self, include_schedule=True):
+        instrumentation = self._instrumentation
+        if instrumentation is not None:
+            analysis_start_time = start_time = perf_counter()
+            money_allocation_count = get_money_allocation_count()
+        stale_steps = self._stale_steps
 
-    def perform_analysis(self):
         #  // Steps 1-3:
-        self.perform_computation_on_mortgage()
+        if 'mortgage' in stale_steps or include_schedule != self._mortgage_schedule_included:
+            self.perform_computation_on_mortgage(include_schedule)
+            if instrumentation is not None:
+                start_time = self.record_step(instrumentation, 'mortgage', start_time)
 
         # // Step 4: Perform a summation/subtraction on all the information to get
         # //         aggregate data.
-        self.perform_computation_on_analysis()
+        if 'aggregation' in stale_steps:
+            self.perform_computation_on_analysis()
+            if instrumentation is not None:
+                start_time = self.record_step(instrumentation, 'aggregation', start_time)
 
         # // Step 5: Analyze various variables for the fincial analysis
-        self.perform_computation_on_annual_projections()
+        if 'annual_projections' in stale_steps or self._annual_projections_backend != self.get_projection_backend():
+            self.perform_computation_on_annual_projections()
+            if instrumentation is not None:
+                self.record_step(instrumentation, 'annual_projections', start_time)
+        if instrumentation is not None:
+            self.record_step(instrumentation, 'perform_analysis', analysis_start_time)
+            if instrumentation.is_counting_money_allocations():
+                instrumentation.increment('money_allocations', get_money_allocation_count() - money_allocation_count)
 
         # STEP 6: Return computations summary from our analysis.
         return {
@@ -296,96 +549,393 @@ class FinancialAnalyzer:
             'annual_projections': self._annual_projections
         }
 
+    def fork(self):
+        """
+        Function will return a new analyzer with the same inputs and cached
+        results as this analyzer. Nothing is copied until it is modified: the
+        line item collections are shared until either analyzer adds or
+        removes a line item (which copies the collection first) and the
+        cached totals, schedules and projections until an input they depend
+        on changes. The instrumentation is not shared.
+        """
+        analyzer = FinancialAnalyzer.__new__(FinancialAnalyzer)
+        analyzer.__dict__.update(self.__dict__)
+        analyzer._totals_cache = dict(self._totals_cache)
+        analyzer._stale_steps = set(self._stale_steps)
+        analyzer._instrumentation = None
+        self._shared_line_items.update(attribute for attribute, key, add_function, remove_function in LINE_ITEM_COLLECTIONS)
+        analyzer._shared_line_items = set(self._shared_line_items)
+        return analyzer
+
+    def with_changes(self, **changes):
+        """
+        Function will return a fork (see "fork") with the ``changes`` applied,
+        see "apply_changes":
+
+            scenario = analyzer.with_changes(
+                purchase_price = Money(amount=240000, currency='USD'),
+                expenses = {2: None}  # Remove the expense 2.
+            )
+        """
+        analyzer = self.fork()
+        analyzer.apply_changes(changes)
+        return analyzer
+
+    def apply_changes(self, changes):
+        """
+        Function will change the inputs in the ``changes`` dictionary, which
+        uses the same keys as the results of "perform_analysis":
+
+        - "mortgage": the "set_mortgage" arguments,
+        - "rental_incomes", "facility_incomes", "expenses",
+          "commercial_incomes", "purchase_fees" and "capital_improvements":
+          the lists of the "add_*" arguments, or mappings keyed by "pk" where
+          "None" removes the line item,
+        - any other key ``name``: the argument of "set_<name>".
+        """
+        line_item_functions = {
+            key: (add_function, remove_function)
+            for attribute, key, add_function, remove_function in LINE_ITEM_COLLECTIONS
+        }
+        for key, value in changes.items():
+            if key == 'mortgage':
+                self.set_mortgage(**value)
+            elif key in line_item_functions:
+                add_function, remove_function = line_item_functions[key]
+                line_items = value.items() if isinstance(value, Mapping) else [(None, fields) for fields in value]
+                for pk, fields in line_items:
+                    if fields is None:
+                        getattr(self, remove_function)(pk)
+                    else:
+                        getattr(self, add_function)(**fields)
+            else:
+                assert hasattr(self, 'set_' + key), 'change is not supported: %r' % key
+                getattr(self, 'set_' + key)(value)
+
+    def iter_annual_projections(self):
+        """
+        Function will perform the stale steps 1-4 of the analysis (see
+        "perform_analysis") and then yield the projection of every year, from
+        the first year to the horizon set by "set_max_year". The scalar
+        engine yields every year as soon as it has been computed; stop
+        iterating to skip computing the remaining years. The projections of
+        the vectorized engine, or of a previous analysis which is still up to
+        date, are the shared results of "perform_analysis", do not modify them.
+        """
+        stale_steps = self._stale_steps
+        if 'mortgage' in stale_steps:
+            self.perform_computation_on_mortgage(include_schedule=False)
+        if 'aggregation' in stale_steps:
+            self.perform_computation_on_analysis()
+
+        numeric_backend = self.get_projection_backend()
+        if numeric_backend != NUMERIC_BACKEND_DECIMAL or 'annual_projections' not in stale_steps:
+            if 'annual_projections' in stale_steps or self._annual_projections_backend != numeric_backend:
+                self.perform_computation_on_annual_projections()
+            for projection in self._annual_projections:
+                yield projection
+            return
+
+        for projection in self.generate_annual_projections():
+            yield projection
+
+    def get_mortgage_payment_schedule(self):
+        """
+        Function will return the mortgage payment schedule, the same as the
+        "schedule" of the "mortgage" results, without performing the rest of
+        the analysis. The schedule is shared, do not modify it.
+        """
+        self.perform_computation_on_mortgage(include_schedule=True)
+        return self._mortgage_payment_schedule
+
+    def goal_seek_purchase_price(self, target, metric='annualized_roi_rate', year=None,
+                                 lower_bound=None, upper_bound=None,
+                                 mortgage_follows_purchase_price=False):
+        """
+        Function will return the purchase price (as "Money") at which the
+        ``metric`` result (one of "GOAL_SEEK_METRICS") of the ``year``
+        projection (by default the last year) equals ``target``, or "None" if
+        no price between the bounds reaches it. The target uses the units of
+        the results: "cap_rate_*" are percents and "*roi_rate" are fractions.
+        When the metric drops as the price grows (ex: the "cap_rate_*") this
+        is the maximum price which still reaches the target.
+
+        If ``mortgage_follows_purchase_price`` is set then the mortgage total
+        amount is the purchase price (the down payment stays the same),
+        otherwise the mortgage does not change. The bounds default to
+        "GOAL_SEEK_*_BOUND_FACTOR" times the current purchase price.
+        """
+        evaluate = self.get_goal_seek_function(metric, year)
+        purchase_price = float(self._purchase_price.amount)
+        if lower_bound is None:
+            lower_bound = purchase_price * GOAL_SEEK_LOWER_BOUND_FACTOR
+        if upper_bound is None:
+            upper_bound = purchase_price * GOAL_SEEK_UPPER_BOUND_FACTOR
+        lower_bound = float(getattr(lower_bound, 'amount', lower_bound))
+        upper_bound = float(getattr(upper_bound, 'amount', upper_bound))
+
+        # The loan balances and payments are linear in the loan amount, so
+        # they are computed once for a loan of one and then scaled.
+        if mortgage_follows_purchase_price:
+            mortgage_calculator = self._mortgage_calculator
+            payment_frequency = int(mortgage_calculator.get_payment_frequency())
+            interest_rate = mortgage_calculator.get_interest_rate_per_payment_frequency()
+            payment_per_loan = float(mortgage_payments_per_payment_frequency(
+                1.0, interest_rate, mortgage_calculator.get_total_number_of_payments_per_frequency()
+            ))
+            loan_balances_per_loan = loan_balances_at_eoy(
+                1.0, interest_rate, payment_per_loan, payment_frequency,
+                self._mortgage_terms['amortization_year'], self._max_year
+            )
+            down_payment = float(self._mortgage_terms['down_payment'].amount)
+
+            def function(value):
+                loan_amount = value - down_payment
+                return evaluate(
+                    purchase_price = value,
+                    annual_mortgage_payment = loan_amount * payment_per_loan * payment_frequency,
+                    loan_balances = loan_amount * loan_balances_per_loan
+                )
+        else:
+            def function(value):
+                return evaluate(purchase_price = value)
+
+        value = goal_seek(function, float(target), lower_bound, upper_bound)
+        return None if value is None else Money(amount=value, currency=self._currency)
+
+    def goal_seek_rental_income(self, pk, target, metric='cap_rate_with_mortgage', year=None,
+                                lower_bound=None, upper_bound=None):
+        """
+        Function will return the "annual_amount_per_unit" (as "Money") of the
+        rental income ``pk`` at which the ``metric`` result equals ``target``,
+        or "None" if no amount between the bounds reaches it; see the
+        function "goal_seek_purchase_price" for the other arguments. The
+        bounds default to zero and "GOAL_SEEK_UPPER_BOUND_FACTOR" times the
+        current amount.
+        """
+        rental_income = self._rental_income_dict[pk]
+        evaluate = self.get_goal_seek_function(metric, year)
+        annual_amount_per_unit = float(rental_income['annual_amount_per_unit'].amount)
+        number_of_units = float(rental_income['number_of_units'])
+        if lower_bound is None:
+            lower_bound = 0
+        if upper_bound is None:
+            upper_bound = annual_amount_per_unit * GOAL_SEEK_UPPER_BOUND_FACTOR
+        lower_bound = float(getattr(lower_bound, 'amount', lower_bound))
+        upper_bound = float(getattr(upper_bound, 'amount', upper_bound))
+        annual_net_income = float(self.get_net_income_without_mortgage()['annual'].amount)
+
+        # A rental income with its own growth curve also changes the amounts
+        # added to the cash flows by the growth curves.
+        growth_curve = rental_income['growth_curve']
+        if growth_curve is None:
+            def function(value):
+                return evaluate(
+                    annual_net_income = annual_net_income + (value - annual_amount_per_unit) * number_of_units
+                )
+        else:
+            projected_year = self._max_year if year is None else year
+            cash_flow_adjustments = self.get_cash_flow_adjustments(projected_year)
+            growth_factors = growth_curve.get_factors(projected_year) - self.get_inflation_curve().get_factors(projected_year)
+
+            def function(value):
+                change = (value - annual_amount_per_unit) * number_of_units
+                return evaluate(
+                    annual_net_income = annual_net_income + change,
+                    cash_flow_adjustments = cash_flow_adjustments + change * growth_factors
+                )
+
+        value = goal_seek(function, float(target), lower_bound, upper_bound)
+        return None if value is None else Money(amount=value, currency=self._currency)
+
     #--------------------------------------------------------------------------#
     #                     P R I V A T E  F U N C T I O N S                     #
     #--------------------------------------------------------------------------#
 
+    def get_goal_seek_function(self, metric, year=None):
+        """
+        Function will return a function which computes the ``metric`` result
+        of the ``year`` projection with "float" arithmetic where only the
+        inputs passed as keyword arguments differ from this analyzer. The
+        inputs which do not change (line item totals, loan balances and
+        appreciation factors) are only computed once.
+        """
+        assert metric in GOAL_SEEK_METRICS, 'metric is not supported: %r' % metric
+        if year is None:
+            year = self._max_year
+        assert isinstance(year, int) and 1 <= year <= self._max_year, 'year is not a projected year: %r' % year
+        self.perform_computation_on_mortgage(include_schedule=False)
+        inputs = {
+            'purchase_price': float(self._purchase_price.amount),
+            'annual_net_income': float(self.get_net_income_without_mortgage()['annual'].amount),
+            'annual_mortgage_payment': float(self._mortgage_calculator.get_annual_mortgage_payment().amount),
+            'loan_balances': np.array([
+                float(self.get_debt_remaining_at_eoy(year_number).amount)
+                for year_number in range_inclusive(1, year)
+            ]),
+            'cash_flow_adjustments': self.get_cash_flow_adjustments(year)
+        }
+        selling_fee_rate = float(self._selling_fee_rate)
+        initial_investment = float(self.get_total_initial_investment_amount().amount)
+        sales_price_factors = self.get_inflation_curve().get_factors(year)
+
+        def evaluate(**changes):
+            values = dict(inputs, **changes)
+            purchase_price = values['purchase_price']
+            annual_net_income = values['annual_net_income']
+            annual_cash_flow = annual_net_income - values['annual_mortgage_payment']
+            if metric == 'cap_rate_with_mortgage':
+                return annual_cash_flow / purchase_price * 100 if purchase_price else 0.0
+            if metric == 'cap_rate_without_mortgage':
+                return annual_net_income / purchase_price * 100 if purchase_price else 0.0
+            projection_arrays = compute_annual_projections(
+                purchase_price = purchase_price,
+                selling_fee_rate = selling_fee_rate,
+                initial_investment = initial_investment,
+                cash_flow_with_mortgage = annual_cash_flow,
+                cash_flow_without_mortgage = annual_net_income,
+                loan_balances = values['loan_balances'][:year],
+                sales_price_factors = sales_price_factors,
+                cash_flow_adjustments = values['cash_flow_adjustments']
+            )
+            return projection_arrays[metric][-1]
+
+        return evaluate
+
+    def invalidate(self, input_name):
+        """
+        Function will remove the cached totals and mark the steps of the
+        analysis which depend on the input ``input_name`` as out of date, see
+        "TOTALS_CACHE_DEPENDENCIES" and "ANALYSIS_STEP_DEPENDENCIES".
+        """
+        self.invalidate_totals(input_name)
+        self._stale_steps.update(ANALYSIS_STEP_DEPENDENCIES[input_name])
+
+    def invalidate_totals(self, input_name):
+        """
+        Function will remove the cached totals which depend on the input
+        ``input_name``, see "TOTALS_CACHE_DEPENDENCIES".
+        """
+        for key in TOTALS_CACHE_DEPENDENCIES.get(input_name, ()):
+            self._totals_cache.pop(key, None)
+
+    def get_writable_line_items(self, attribute):
+        """
+        Function will return the line item collection of the ``attribute``,
+        copied first if it is shared with a fork (see "fork").
+        """
+        if attribute in self._shared_line_items:
+            setattr(self, attribute, getattr(self, attribute).copy())
+            self._shared_line_items.discard(attribute)
+        return getattr(self, attribute)
+
+    def invalidate_all(self):
+        """
+        Function will remove every cached total and mark every step of the
+        analysis as out of date.
+        """
+        self._totals_cache.clear()
+        self._stale_steps.update(ANALYSIS_STEPS)
+
+    def record_step(self, instrumentation, name, start_time):
+        """
+        Function will record the time since ``start_time`` as a call of the
+        ``name`` step and return the current time.
+        """
+        end_time = perf_counter()
+        instrumentation.record(name, end_time - start_time)
+        return end_time
+
+    def __getstate__(self):
+        """
+        Function will return the state to pickle without the mortgage
+        calculator; it gets re-created from the mortgage terms when unpickled
+        (see "MORTGAGEKIT_PAYMENT_FREQUENCIES" for why). The instrumentation
+        is left out as well.
+        """
+        state = self.__dict__.copy()
+        state['_mortgage_calculator'] = None
+        state['_instrumentation'] = None
+        state['_shared_line_items'] = set()
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self._mortgage_terms is not None:
+            self.set_mortgage(**self._mortgage_terms)
+
     def get_total_rental_income_amount(self):
         """
         Function sums "monthly_amount" and "annual_amount" in the
         "Rental Income" objects of this analyzer.
         """
-        total_monthly_amount = Money(amount=0, currency=self._currency)
-        total_annual_amount = Money(amount=0, currency=self._currency)
-        keys = self._rental_income_dict.keys()
-        for key in keys:
-            # Get our object.
-            rental_income = self._rental_income_dict[key]
-
-            # Get the amounts.
-            monthly_amount_per_unit = rental_income['monthly_amount_per_unit']
-            annual_amount_per_unit = rental_income['annual_amount_per_unit']
-            number_of_units = rental_income['number_of_units']
-
-            # Sum
-            total_monthly_amount += monthly_amount_per_unit * number_of_units
-            total_annual_amount += annual_amount_per_unit * number_of_units
-        return {
+        if 'rental_income' in self._totals_cache:
+            return dict(self._totals_cache['rental_income'])
+
+        total_monthly_amount = self._rental_income_dict.get_total('monthly_amount_per_unit', 'number_of_units')
+        total_annual_amount = self._rental_income_dict.get_total('annual_amount_per_unit', 'number_of_units')
+        total = {
             'monthly': total_monthly_amount,
             'annual': total_annual_amount
         }
+        self._totals_cache['rental_income'] = total
+        return dict(total)
 
     def get_total_facility_income_amount(self):
         """
         Function sums "monthly_amount" and "annual_amount" in the
         "Facility Income" objects of this analyzer.
         """
-        total_monthly_amount = Money(amount=0, currency=self._currency)
-        total_annual_amount = Money(amount=0, currency=self._currency)
-        keys = self._facility_income_dict.keys()
-        for key in keys:
-            # Get our object.
-            facility_income = self._facility_income_dict[key]
+        if 'facility_income' in self._totals_cache:
+            return dict(self._totals_cache['facility_income'])
 
-            # Get the amounts & sum.
-            total_monthly_amount += facility_income['monthly_amount']
-            total_annual_amount += facility_income['annual_amount']
-        return {
+        total_monthly_amount = self._facility_income_dict.get_total('monthly_amount')
+        total_annual_amount = self._facility_income_dict.get_total('annual_amount')
+        total = {
             'monthly': total_monthly_amount,
             'annual': total_annual_amount
         }
+        self._totals_cache['facility_income'] = total
+        return dict(total)
 
     def get_total_expense_amount(self):
         """
         Function sums "monthly_amount" and "annual_amount" in the
         "Expense" objects of this analyzer.
         """
-        total_monthly_amount = Money(amount=0, currency=self._currency)
-        total_annual_amount = Money(amount=0, currency=self._currency)
-        keys = self._expense_dict.keys()
-        for key in keys:
-            # Get our object.
-            expense = self._expense_dict[key]
+        if 'expense' in self._totals_cache:
+            return dict(self._totals_cache['expense'])
 
-            # Get the amounts & sum.
-            total_monthly_amount += expense['monthly_amount']
-            total_annual_amount += expense['annual_amount']
-        return {
+        total_monthly_amount = self._expense_dict.get_total('monthly_amount')
+        total_annual_amount = self._expense_dict.get_total('annual_amount')
+        total = {
             'monthly': total_monthly_amount,
             'annual': total_annual_amount
         }
+        self._totals_cache['expense'] = total
+        return dict(total)
 
     def get_total_commercial_income_amount(self):
         """
         Function sums "monthly_amount" and "annual_amount" in the
         "commercial Income" objects of this analyzer.
         """
-        total_monthly_amount = Money(amount=0, currency=self._currency)
-        total_annual_amount = Money(amount=0, currency=self._currency)
-        keys = self._commercial_income_dict.keys()
-        for key in keys:
-            # Get our object.
-            commercial_income = self._commercial_income_dict[key]
+        if 'commercial_income' in self._totals_cache:
+            return dict(self._totals_cache['commercial_income'])
 
-            # Get the amounts & sum.
-            total_monthly_amount += commercial_income['monthly_amount']
-            total_annual_amount += commercial_income['annual_amount']
-        return {
+        total_monthly_amount = self._commercial_income_dict.get_total('monthly_amount')
+        total_annual_amount = self._commercial_income_dict.get_total('annual_amount')
+        total = {
             'monthly': total_monthly_amount,
             'annual': total_annual_amount
         }
+        self._totals_cache['commercial_income'] = total
+        return dict(total)
 
     def get_total_gross_income_amount(self):
+        if 'gross_income' in self._totals_cache:
+            return dict(self._totals_cache['gross_income'])
+
         # Compute the individual totals.
         commercial_income_total = self.get_total_commercial_income_amount()
         rental_income_total = self.get_total_rental_income_amount()
@@ -396,60 +946,128 @@ class FinancialAnalyzer:
         total_annual_amount = commercial_income_total['annual'] + rental_income_total['annual'] + facility_income_total['annual']
 
         # Return results.
-        return {
+        total = {
             'monthly': total_monthly_amount,
             'annual': total_annual_amount
         }
+        self._totals_cache['gross_income'] = total
+        return dict(total)
 
     def get_total_purchase_fee_amount(self):
         """
         Function sums "monthly_amount" and "annual_amount" in the
         "commercial Income" objects of this analyzer.
         """
-        total_amount = Money(amount=0, currency=self._currency)
-        keys = self._fee_dict.keys()
-        for key in keys:
-            # Get our object.
-            purchase_fee = self._fee_dict[key]
+        if 'purchase_fee' in self._totals_cache:
+            return self._totals_cache['purchase_fee']
 
-            # Get the amounts & sum.
-            total_amount += purchase_fee['amount']
+        total_amount = self._fee_dict.get_total('amount')
+        self._totals_cache['purchase_fee'] = total_amount
         return total_amount
 
     def get_net_income_without_mortgage(self):
+        if 'net_income_without_mortgage' in self._totals_cache:
+            return dict(self._totals_cache['net_income_without_mortgage'])
+
         gross_income_info = self.get_total_gross_income_amount()
         expense_info = self.get_total_expense_amount()
-        return {
+        total = {
             'monthly': gross_income_info['monthly'] - expense_info['monthly'],
             'annual': gross_income_info['annual'] - expense_info['annual'],
         }
+        self._totals_cache['net_income_without_mortgage'] = total
+        return dict(total)
 
     def get_net_income_with_mortgage(self):
+        if 'net_income_with_mortgage' in self._totals_cache:
+            return dict(self._totals_cache['net_income_with_mortgage'])
+
         net_income_info = self.get_net_income_without_mortgage()
 
         monthly_mortgage_payment = self._mortgage_calculator.get_monthly_mortgage_payment()
         annual_mortgage_payment = self._mortgage_calculator.get_annual_mortgage_payment()
 
-        return {
+        total = {
             'monthly': net_income_info['monthly'] - monthly_mortgage_payment,
             'annual': net_income_info['annual'] - annual_mortgage_payment
         }
+        self._totals_cache['net_income_with_mortgage'] = total
+        return dict(total)
+
+    def get_growth_curve_amounts(self):
+        """
+        Function sums the "annual_amount" of the income (positive) and
+        expense (negative) line items which have their own growth curve,
+        grouped by the curve. The other line items grow with the inflation
+        rate.
+        """
+        totals = {}
+        for kind_totals in self.get_growth_curve_amounts_by_kind().values():
+            for growth_curve, amount in kind_totals.items():
+                totals[growth_curve] = totals[growth_curve] + amount if growth_curve in totals else amount
+        return totals
+
+    def get_growth_curve_amounts_by_kind(self):
+        """
+        Function will return the amounts of "get_growth_curve_amounts" per
+        kind of line item ("rental_income", "facility_income",
+        "commercial_income" and "expense"), ex: to scale the rental incomes
+        only.
+        """
+        if 'growth_curve' in self._totals_cache:
+            return {kind: dict(totals) for kind, totals in self._totals_cache['growth_curve'].items()}
+
+        totals_by_kind = {}
+        for kind, collection, key, weight_key, sign in (
+            ('rental_income', self._rental_income_dict, 'annual_amount_per_unit', 'number_of_units', 1),
+            ('facility_income', self._facility_income_dict, 'annual_amount', None, 1),
+            ('commercial_income', self._commercial_income_dict, 'annual_amount', None, 1),
+            ('expense', self._expense_dict, 'annual_amount', None, -1)):
+            totals_by_kind[kind] = {
+                growth_curve: amount * Decimal(sign)
+                for growth_curve, amount in collection.get_totals_by('growth_curve', key, weight_key).items()
+                if growth_curve is not None
+            }
+        self._totals_cache['growth_curve'] = totals_by_kind
+        return {kind: dict(totals) for kind, totals in totals_by_kind.items()}
+
+    def get_inflation_curve(self):
+        if self._inflation_curve is None:
+            self._inflation_curve = GrowthCurve(self._inflation_rate)
+        return self._inflation_curve
+
+    def get_cash_flow_adjustments(self, max_year, in_cents=False):
+        """
+        Function will return the array of the amounts (of cents if
+        ``in_cents`` is set) added to the cash flow of every year from 1 to
+        ``max_year`` by the line items which grow with their own growth curve
+        instead of the inflation rate, or "None" if there are none.
+        """
+        inflation_factors = self.get_inflation_curve().get_factors(max_year)
+        cash_flow_adjustments = None
+        for growth_curve, amount in self.get_growth_curve_amounts().items():
+            amount = to_cents(amount) if in_cents else float(amount.amount)
+            adjustments = amount * (growth_curve.get_factors(max_year) - inflation_factors)
+            cash_flow_adjustments = adjustments if cash_flow_adjustments is None else cash_flow_adjustments + adjustments
+        return cash_flow_adjustments
 
     def get_total_capital_improvements_amount(self):
-        total_amount = Money(amount=0, currency=self._currency)
-        keys = self._capital_improvements_dict.keys()
-        for key in keys:
-            # Get our object.
-            capital_improvement = self._capital_improvements_dict[key]
-
-            # Get the amounts & sum.
-            total_amount += capital_improvement['amount']
+        if 'capital_improvement' in self._totals_cache:
+            return self._totals_cache['capital_improvement']
+
+        total_amount = self._capital_improvements_dict.get_total('amount')
+        self._totals_cache['capital_improvement'] = total_amount
         return total_amount
 
     def get_total_initial_investment_amount(self):
+        if 'initial_investment' in self._totals_cache:
+            return self._totals_cache['initial_investment']
+
         total_purchase_fee = self.get_total_purchase_fee_amount()
         total_capital_improvement = self.get_total_capital_improvements_amount()
-        return total_purchase_fee + total_capital_improvement
+        total = total_purchase_fee + total_capital_improvement
+        self._totals_cache['initial_investment'] = total
+        return total
 
     def get_cap_rate_with_mortgage_expense_included(self):
         if self._purchase_price.amount == 0:  # Defensive Code: Cannot divide by zero.
@@ -468,8 +1086,29 @@ class FinancialAnalyzer:
         cap_rate_percent = Decimal(cap_rate * 100)
         return Decimal(cap_rate_percent)
 
-    def perform_computation_on_mortgage(self):
-        self._mortgage_payment_schedule = self._mortgage_calculator.get_mortgage_payment_schedule()
+    def perform_computation_on_mortgage(self, include_schedule=True):
+        # The schedule is shared with every analyzer which has the same loan
+        # terms, see "calculator/cache.py".
+        payment_schedule = None
+        if include_schedule or self._loan_balance_method == LOAN_BALANCE_METHOD_SCHEDULE:
+            payment_schedule = mortgage_schedule_cache.get_schedule(**self._mortgage_terms)
+        self._mortgage_payment_schedule = payment_schedule if include_schedule else None
+
+        self._loan_balance_schedule = payment_schedule
+        self._mortgage_schedule_included = include_schedule
+        self._stale_steps.discard('mortgage')
+
+    def get_debt_remaining_at_eoy(self, year):
+        """
+        Function will return the loan balance at the end of the year with the
+        method set by "set_loan_balance_method".
+
+        Note: You need to run "perform_computation_on_mortgage" before running
+        this function.
+        """
+        if self._loan_balance_method == LOAN_BALANCE_METHOD_CLOSED_FORM:
+            return self.closed_form_debt_remaining_at_eoy(year, self._mortgage_calculator)
+        return self.debt_remaining_at_eoy(year, self._loan_balance_schedule, self._mortgage_calculator)
 
     def perform_computation_on_analysis(self):
         total_amount = self.get_total_rental_income_amount()
@@ -506,6 +1145,7 @@ class FinancialAnalyzer:
 
         self._cap_rate_with_mortgage = self.get_cap_rate_with_mortgage_expense_included()
         self._cap_rate_without_mortgage = self.get_cap_rate_with_mortgage_expense_excluded()
+        self._stale_steps.discard('aggregation')
 
     def debt_remaining_at_eoy(self, year, payment_schedule, mortgage_calculator):
         # Note: We need to get how many pay cycles there will be per year.
@@ -523,18 +1163,71 @@ class FinancialAnalyzer:
 
         return loan_balance
 
+    def closed_form_debt_remaining_at_eoy(self, year, mortgage_calculator):
+        """
+        Function will return the same loan balance as "debt_remaining_at_eoy"
+        but computed with the amortization formula instead of looking it up in
+        the payment schedule:
+
+            balance = P * (1 + r) ** k - payment * ((1 + r) ** k - 1) / r
+
+        where ``k`` is the number of payments made by the end of the year.
+        Once the loan is paid off the balance is exactly zero, whereas the
+        payment schedule usually ends with a rounding error sized balance.
+        """
+        payment_frequency_integer = int(mortgage_calculator.get_payment_frequency())
+        number_of_payments = year * payment_frequency_integer
+        if number_of_payments >= mortgage_calculator.get_total_number_of_payments_per_frequency():
+            return Money(amount=0, currency=self._currency)
+
+        loan_amount = self._mortgage_terms['total_amount'] - self._mortgage_terms['down_payment']
+        mortgage_payment = mortgage_calculator.get_mortgage_payment_per_payment_frequency()
+        interest_rate_per_payment = Decimal(mortgage_calculator.get_interest_rate_per_payment_frequency())
+        if interest_rate_per_payment == 0:
+            return loan_amount - mortgage_payment * number_of_payments
+        growth = (interest_rate_per_payment + 1) ** number_of_payments
+        return loan_amount * growth - mortgage_payment * ((growth - 1) / interest_rate_per_payment)
+
     def perform_computation_on_annual_projections(self):
         """
         Note: You need to run "perform_computation_on_mortgage" before running
         this function.
         """
-        # Variable which will hold all our projections on a per year basis.
-        annual_projections = []
+        numeric_backend = self.get_projection_backend()
+        if numeric_backend == NUMERIC_BACKEND_DECIMAL:
+            self._annual_projections = list(self.generate_annual_projections())
+            self._annual_projections_backend = numeric_backend
+            self._stale_steps.discard('annual_projections')
+            return
+
+        in_cents = numeric_backend == NUMERIC_BACKEND_INT64_CENTS
+        self.perform_vectorized_computation_on_annual_projections(in_cents)
+
+        # Test mode: compare with the reference "decimal" backend.
+        if self._verify_numeric_backend and numeric_backend != NUMERIC_BACKEND_DECIMAL:
+            differences = compare_annual_projections(
+                list(self.generate_annual_projections()), self._annual_projections, numeric_backend
+            )
+            assert not differences, 'numeric backend %r differs from %r: %s' % (numeric_backend, NUMERIC_BACKEND_DECIMAL, '; '.join(differences))
+        self._annual_projections_backend = numeric_backend
+        self._stale_steps.discard('annual_projections')
+
+    def generate_annual_projections(self):
+        """
+        Function will yield the annual projection of every year up to the
+        horizon set by "set_max_year" one year at a time.
 
+        Note: You need to run "perform_computation_on_mortgage" before running
+        this function.
+        """
         # Calculate and extract values we'll be using throughout our computation.
-        mortgage_payment_schedule = self._mortgage_payment_schedule
-        mortgage_calculator = self._mortgage_calculator
-        inflation_rate = self._inflation_rate
+        instrumentation = self._instrumentation
+        max_year = self._max_year
+        inflation_factors = self.get_inflation_curve().get_decimal_factors(max_year)
+        growth_curve_amounts = [
+            (amount, growth_curve.get_decimal_factors(max_year))
+            for growth_curve, amount in self.get_growth_curve_amounts().items()
+        ]
         annual_net_income_with_mortgage_info = self.get_net_income_with_mortgage()
         annual_net_income_without_mortgage_info = self.get_net_income_without_mortgage()
         sales_price = self._purchase_price
@@ -543,18 +1236,26 @@ class FinancialAnalyzer:
 
         # To calculate "IRR", we will need to store the initial investment
         # (negative) and then add all the cash flows afterwords (positive).
-        cash_flow_array = []
+        # The array is allocated once and grows by one year per iteration.
+        cash_flow_array = np.zeros(max_year + 1)
         negative_initial_investment_amount = initial_investment_amount * Decimal(-1)
-        cash_flow_array.append(negative_initial_investment_amount)
+        cash_flow_array[0] = negative_initial_investment_amount.amount
+
+        # Variable stores the previous years "IRR" which we use as the
+        # starting point for solving the current years "IRR".
+        irr_rate = IRR_GUESS
 
         # Variable stores the previous years cash flow value.
         previous_years_cash_flow = Money(amount=0, currency=self._currency)
 
-        for year in range_inclusive(1, MAX_YEAR):
+        for year in range_inclusive(1, max_year):
+            if instrumentation is not None:
+                year_start_time = perf_counter()
+
             # Generic Calculations
             #------------------------------------------------------
             # Calculate how much debt we have remaining to pay off.
-            loan_balance = self.debt_remaining_at_eoy(year, mortgage_payment_schedule, mortgage_calculator)
+            loan_balance = self.get_debt_remaining_at_eoy(year)
 
             # Defensive Coding: Cannot have negative 'debtRemaining' values.
             if loan_balance.amount < 0:
@@ -562,21 +1263,26 @@ class FinancialAnalyzer:
 
             # Calculate how much money we have coming in at the end of the year and
             # apply appreciation to it.
+            # The line items with their own growth curve grow by the
+            # difference between their curve and the inflation rate.
+            inflation_factor = inflation_factors[year - 1]
             cash_flow = Money(amount=0, currency=self._currency)
             appreciated_cash_flow = Money(amount=0, currency=self._currency)
             if loan_balance.amount > 0:
                 cash_flow = annual_net_income_with_mortgage_info['annual']
-                appreciated_cash_flow = appreciated_value(cash_flow, year, inflation_rate)
+                appreciated_cash_flow = cash_flow * inflation_factor
             else:
                 cash_flow = annual_net_income_without_mortgage_info['annual']
-                appreciated_cash_flow = appreciated_value(cash_flow, year, inflation_rate)
+                appreciated_cash_flow = cash_flow * inflation_factor
+            for amount, growth_factors in growth_curve_amounts:
+                appreciated_cash_flow += amount * (growth_factors[year - 1] - inflation_factor)
 
             # Calculate our new sales price
-            appreciated_sales_price = appreciated_value(sales_price, year, inflation_rate)
+            appreciated_sales_price = sales_price * inflation_factor
 
             # Calculate legal & realty domain fees
             fees = sales_price * selling_fee_rate
-            appreciated_fees = appreciated_value(fees, year, inflation_rate)
+            appreciated_fees = fees * inflation_factor
 
             # Calculate the proceeds of sale
             proceeds_of_sale = appreciated_sales_price - appreciated_fees
@@ -601,21 +1307,22 @@ class FinancialAnalyzer:
             net_processed_from_sales = previous_years_cash_flow + proceeds_of_sale
 
             # STEP 3: Add the final object to our cash flow array of payments.
-            cash_flow_array.append(net_processed_from_sales) # IRR Code 1 of 2
-
-            # STEP 4: Calculate our IRR.
-            float_cash_flow_array = []
-            for value in cash_flow_array: # Convert from Decimal to Float.
-                float_cash_flow_array.append(value.amount)
-
-            # Use the python 'numpy' library to get the 'irr' functionality
-            # instead of implementing it ourselves.
-            irr_rate = np.irr(float_cash_flow_array)
+            cash_flow_array[year] = net_processed_from_sales.amount # IRR Code 1 of 2
+
+            # STEP 4: Calculate our IRR starting from last years result.
+            if instrumentation is not None:
+                irr_start_time = perf_counter()
+            irr_rate = internal_rate_of_return(
+                cash_flow_array[:year+1],
+                guess = irr_rate if np.isfinite(irr_rate) else IRR_GUESS
+            )
+            if instrumentation is not None:
+                self.record_step(instrumentation, 'irr_solve', irr_start_time)
             irr_percent = irr_rate * 100
 
             # Update the MODEL with the following values
             #---------------------------------------------------
-            annual_projections.append({
+            projection = {
                 'year': year,
                 'debt_remaining': loan_balance,
                 'sales_price': appreciated_sales_price,
@@ -628,17 +1335,75 @@ class FinancialAnalyzer:
                 'roi_percent': roi_percent,
                 'annualized_roi_rate': irr_rate,
                 'annualized_roi_percent': irr_percent
-            })
+            }
 
             # Calculate Annualized Return on Investment (2 of 2)
             #----------------------------------------------------
             # Update the cashFlow
             # However, this is not the last year! Therefore remove the total return
             # which is the last object and cashflow.
-            del cash_flow_array[-1]  # IRR Code 2 of 2 - Remove last object.
-            cash_flow_array.append(previous_years_cash_flow);
+            cash_flow_array[year] = previous_years_cash_flow.amount  # IRR Code 2 of 2 - Replace last object.
 
             previous_years_cash_flow = appreciated_cash_flow
 
-        # Return the annual projects we have computed in this function.
-        self._annual_projections = annual_projections
+            if instrumentation is not None:
+                self.record_step(instrumentation, 'projection_year', year_start_time)
+            yield projection
+
+    def perform_vectorized_computation_on_annual_projections(self, in_cents=False):
+        """
+        Function computes the same annual projections as the function
+        "perform_computation_on_annual_projections" but computes all the years
+        at once with "numpy" arrays, of whole cents if ``in_cents`` is set,
+        and only converts into the "Money" format at the end. See
+        "calculator/projection.py" for the tolerances.
+
+        Note: You need to run "perform_computation_on_mortgage" before running
+        this function.
+        """
+        instrumentation = self._instrumentation
+        if instrumentation is not None:
+            start_time = perf_counter()
+
+        # Calculate and extract values we'll be using throughout our computation.
+        if self._loan_balance_method == LOAN_BALANCE_METHOD_CLOSED_FORM:
+            mortgage_calculator = self._mortgage_calculator
+            loan_balances = loan_balances_at_eoy(
+                (self._mortgage_terms['total_amount'] - self._mortgage_terms['down_payment']).amount,
+                mortgage_calculator.get_interest_rate_per_payment_frequency(),
+                mortgage_calculator.get_mortgage_payment_per_payment_frequency().amount,
+                mortgage_calculator.get_payment_frequency(),
+                self._mortgage_terms['amortization_year'],
+                self._max_year
+            )
+        else:
+            loan_balances = np.array([
+                self.get_debt_remaining_at_eoy(year).amount
+                for year in range_inclusive(1, self._max_year)
+            ], dtype=np.float64)
+        amounts = {
+            'purchase_price': self._purchase_price.amount,
+            'initial_investment': self.get_total_initial_investment_amount().amount,
+            'cash_flow_with_mortgage': self.get_net_income_with_mortgage()['annual'].amount,
+            'cash_flow_without_mortgage': self.get_net_income_without_mortgage()['annual'].amount
+        }
+        if in_cents:
+            amounts = {key: to_cents(amount) for key, amount in amounts.items()}
+            # Defensive Code: A loan which is not paid off keeps at least one
+            #                 cent so it is still considered a mortgage.
+            loan_balances = np.asarray(loan_balances, dtype=np.float64)
+            loan_balances = np.where(loan_balances > 0, np.maximum(round_half_up(loan_balances * 100.0), 1), 0)
+
+        projection_arrays = compute_annual_projections(
+            selling_fee_rate = self._selling_fee_rate,
+            loan_balances = loan_balances,
+            sales_price_factors = self.get_inflation_curve().get_factors(self._max_year),
+            cash_flow_adjustments = self.get_cash_flow_adjustments(self._max_year, in_cents),
+            in_cents = in_cents,
+            **amounts
+        )
+
+        # Convert our arrays into the annual projections format.
+        self._annual_projections = annual_projections_to_list(projection_arrays, self._currency, in_cents)
+        if instrumentation is not None:
+            self.record_step(instrumentation, 'vectorized_projections', start_time)
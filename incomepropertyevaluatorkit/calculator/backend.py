@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+The numeric backends the "FinancialAnalyzer" can compute the annual
+projections with, see "FinancialAnalyzer.set_numeric_backend":
+
+- "decimal": every amount is a "Money" object on top of "Decimal"; this is
+  the reference implementation.
+- "float64": every year is computed at once on ``float64`` arrays; the
+  "decimal" backend with the "vectorized" projection engine is this backend
+  (see "FinancialAnalyzer.get_projection_backend").
+- "int64_cents": every year is computed at once on ``int64`` arrays of whole
+  cents; inputs are rounded to cents, sums and differences are exact and
+  every amount multiplied by a factor or rate is rounded back to cents,
+  halves away from zero (the same rule as "decimal.ROUND_HALF_UP"); a loan
+  balance which is not zero is never rounded below one cent so the loan is
+  not considered paid off early.
+
+With both array backends the line item totals are still summed as
+"Decimal", the results are converted into "Money" only once the arrays are
+computed, the "roi_rate" is rounded with "rate_decimal" and the IRR is solved
+in ``float64``. The largest differences from the "decimal" backend are the
+"NUMERIC_BACKEND_TOLERANCES" below.
+"""
+
+from __future__ import print_function
+from decimal import Decimal
+from incomepropertyevaluatorkit.foundation.constants import *
+
+
+# The largest differences from the "decimal" backend: for the amounts (in
+# the currency), for the "roi_rate" (one step of its 4 decimal places
+# rounding) and for the "annualized_roi_rate".
+NUMERIC_BACKEND_TOLERANCES = {
+    NUMERIC_BACKEND_FLOAT64: {
+        'amount': Decimal('0.0001'),
+        'roi_rate': Decimal('0.0001'),
+        'annualized_roi_rate': 1e-8
+    },
+    NUMERIC_BACKEND_INT64_CENTS: {
+        'amount': Decimal('0.03'),
+        'roi_rate': Decimal('0.0001'),
+        'annualized_roi_rate': 1e-6
+    },
+}
+
+
+# The keys of the "Money" amounts of every annual projection.
+PROJECTION_MONEY_KEYS = (
+    'debt_remaining', 'sales_price', 'legal_fees', 'cash_flow',
+    'initial_investment', 'proceeds_of_sale', 'total_return'
+)
+
+
+# The backend used by the analyzers which have not selected one.
+default_numeric_backend = NUMERIC_BACKEND_DECIMAL
+
+
+def get_default_numeric_backend():
+    return default_numeric_backend
+
+
+def set_default_numeric_backend(numeric_backend):
+    """
+    Function will set the numeric backend of every "FinancialAnalyzer" in
+    this process which has not selected one itself.
+    """
+    global default_numeric_backend
+    assert numeric_backend in NUMERIC_BACKENDS, 'numeric_backend is not supported: %r' % numeric_backend
+    default_numeric_backend = numeric_backend
+
+
+def compare_annual_projections(expected_projections, actual_projections, numeric_backend):
+    """
+    Function will return the list of differences, as messages, between the
+    ``expected_projections`` of the "decimal" backend and the
+    ``actual_projections`` of ``numeric_backend`` which are larger than its
+    "NUMERIC_BACKEND_TOLERANCES".
+    """
+    tolerances = NUMERIC_BACKEND_TOLERANCES[numeric_backend]
+    differences = []
+    if len(expected_projections) != len(actual_projections):
+        differences.append('expected %s years but computed %s' % (len(expected_projections), len(actual_projections)))
+    for expected, actual in zip(expected_projections, actual_projections):
+        for key in PROJECTION_MONEY_KEYS:
+            difference = abs(expected[key].amount - actual[key].amount)
+            if difference > tolerances['amount']:
+                differences.append('year %s "%s": %s != %s' % (expected['year'], key, expected[key], actual[key]))
+        if abs(expected['roi_rate'] - actual['roi_rate']) > tolerances['roi_rate']:
+            differences.append('year %s "roi_rate": %s != %s' % (expected['year'], expected['roi_rate'], actual['roi_rate']))
+        expected_irr = expected['annualized_roi_rate']
+        actual_irr = actual['annualized_roi_rate']
+        if expected_irr != expected_irr or actual_irr != actual_irr:  # NaN
+            if (expected_irr != expected_irr) != (actual_irr != actual_irr):
+                differences.append('year %s "annualized_roi_rate": %s != %s' % (expected['year'], expected_irr, actual_irr))
+        elif abs(expected_irr - actual_irr) > tolerances['annualized_roi_rate']:
+            differences.append('year %s "annualized_roi_rate": %s != %s' % (expected['year'], expected_irr, actual_irr))
+    return differences
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Python library for performing rental and income property calculations on a
+portfolio of properties at once. See README for more details.
+"""
+
+from __future__ import print_function
+import numpy as np
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.projection import *
+
+
+class BatchFinancialAnalyzer:
+    """
+    Class will take the financial information of many rental properties in a
+    columnar format (one array per input, one item per property) and perform
+    the same calculations as the "FinancialAnalyzer" class on all of them in
+    one vectorized pass. The results are returned as columns too.
+
+    The "FinancialAnalyzer" class remains the reference implementation; the
+    amounts computed here are ``float64`` and agree with it to within the
+    tolerances documented in "calculator/projection.py".
+    """
+
+    #--------------------------------------------------------------------------#
+    #                     P U B L I C  F U N C T I O N S                       #
+    #--------------------------------------------------------------------------#
+
+    def __init__(self, number_of_properties, currency='USD'):
+        assert isinstance(number_of_properties, int), 'number_of_properties is not a Integer class: %r' % number_of_properties
+        self._currency = currency
+        self._number_of_properties = number_of_properties
+        self._max_year = MAX_YEAR
+        self._purchase_price = self.to_column(0)
+        self._inflation_rate = self.to_column(0)
+        self._selling_fee_rate = self.to_column(0)
+        self._buying_fee_rate = self.to_column(0)
+        self._total_amount = self.to_column(0)
+        self._down_payment = self.to_column(0)
+        self._amortization_year = self.to_column(0)
+        self._annual_interest_rate = self.to_column(0)
+        self._payment_frequency = self.to_column(12)
+        self._compounding_period = self.to_column(2)
+        self._monthly_rental_income = self.to_column(0)
+        self._annual_rental_income = self.to_column(0)
+        self._monthly_facility_income = self.to_column(0)
+        self._annual_facility_income = self.to_column(0)
+        self._monthly_commercial_income = self.to_column(0)
+        self._annual_commercial_income = self.to_column(0)
+        self._monthly_expense = self.to_column(0)
+        self._annual_expense = self.to_column(0)
+        self._purchase_fees_amount = self.to_column(0)
+        self._capital_improvements_amount = self.to_column(0)
+        self._cash_flow_adjustments = None
+
+    def set_max_year(self, max_year):
+        assert isinstance(max_year, int), 'max_year is not a Integer class: %r' % max_year
+        assert max_year > 0, 'max_year is not positive: %r' % max_year
+        self._max_year = max_year
+
+    def set_purchase_prices(self, purchase_prices):
+        self._purchase_price = self.to_column(purchase_prices)
+
+    def set_inflation_rates(self, inflation_rates):
+        self._inflation_rate = self.to_column(inflation_rates)
+
+    def set_selling_fee_rates(self, selling_fee_rates):
+        self._selling_fee_rate = self.to_column(selling_fee_rates)
+
+    def set_buying_fee_rates(self, buying_fee_rates):
+        self._buying_fee_rate = self.to_column(buying_fee_rates)
+
+    def set_mortgages(self, total_amounts, down_payments, amortization_years,
+                      annual_interest_rates, payment_frequencies, compounding_periods):
+        self._total_amount = self.to_column(total_amounts)
+        self._down_payment = self.to_column(down_payments)
+        self._amortization_year = self.to_column(amortization_years)
+        self._annual_interest_rate = self.to_column(annual_interest_rates)
+        self._payment_frequency = self.to_column(payment_frequencies)
+        self._compounding_period = self.to_column(compounding_periods)
+
+    def set_rental_incomes(self, monthly_amounts, annual_amounts):
+        self._monthly_rental_income = self.to_column(monthly_amounts)
+        self._annual_rental_income = self.to_column(annual_amounts)
+
+    def set_facility_incomes(self, monthly_amounts, annual_amounts):
+        self._monthly_facility_income = self.to_column(monthly_amounts)
+        self._annual_facility_income = self.to_column(annual_amounts)
+
+    def set_commercial_incomes(self, monthly_amounts, annual_amounts):
+        self._monthly_commercial_income = self.to_column(monthly_amounts)
+        self._annual_commercial_income = self.to_column(annual_amounts)
+
+    def set_expenses(self, monthly_amounts, annual_amounts):
+        self._monthly_expense = self.to_column(monthly_amounts)
+        self._annual_expense = self.to_column(annual_amounts)
+
+    def set_purchase_fees(self, amounts):
+        self._purchase_fees_amount = self.to_column(amounts)
+
+    def set_capital_improvements(self, amounts):
+        self._capital_improvements_amount = self.to_column(amounts)
+
+    def set_cash_flow_adjustments(self, cash_flow_adjustments):
+        """
+        Function will set the amounts added to the appreciated cash flow of
+        every year from 1 to the max year, ex: by the line items which grow
+        with their own growth curve (see
+        "FinancialAnalyzer.get_cash_flow_adjustments"). The array has the
+        ``(years,)`` shape for every property or ``(properties, years)``.
+        """
+        if cash_flow_adjustments is None:
+            self._cash_flow_adjustments = None
+            return
+        cash_flow_adjustments = np.asarray(cash_flow_adjustments, dtype=np.float64)
+        assert cash_flow_adjustments.ndim in (1, 2), 'cash_flow_adjustments is not a (years,) or (properties, years) array: %r' % (cash_flow_adjustments.shape,)
+        self._cash_flow_adjustments = np.broadcast_to(
+            cash_flow_adjustments, (self._number_of_properties, cash_flow_adjustments.shape[-1])
+        )
+
+    def perform_analysis(self, chunk_size=BATCH_CHUNK_SIZE):
+        """
+        Function will return the "mortgage", "analysis" and
+        "annual_projections" results of every property as columns; the
+        "annual_projections" columns have a ``(properties, years)`` shape.
+        """
+        # Steps 1-3:
+        mortgage = self.perform_computation_on_mortgage()
+
+        # Step 4: Perform a summation/subtraction on all the information to get
+        #         aggregate data.
+        analysis = self.perform_computation_on_analysis(mortgage)
+
+        # Step 5: Analyze various variables for the fincial analysis
+        annual_projections = self.perform_computation_on_annual_projections(mortgage, analysis, chunk_size)
+
+        # Step 6: Return computations summary from our analysis.
+        return {
+            'purchase_price': self._purchase_price,
+            'inflation_rate': self._inflation_rate,
+            'selling_fee_rate': self._selling_fee_rate,
+            'buying_fee_rate': self._buying_fee_rate,
+            'mortgage': mortgage,
+            'analysis': analysis,
+            'annual_projections': annual_projections
+        }
+
+    #--------------------------------------------------------------------------#
+    #                     P R I V A T E  F U N C T I O N S                     #
+    #--------------------------------------------------------------------------#
+
+    def to_column(self, values):
+        """
+        Function will convert the inputted values (or a single value used by
+        every property) into a ``float64`` column for all the properties.
+        """
+        column = np.asarray(values, dtype=np.float64)
+        assert column.ndim == 0 or column.shape == (self._number_of_properties,), 'values do not have one item per property: %r' % (column.shape,)
+        return np.array(np.broadcast_to(column, (self._number_of_properties,)))
+
+    def perform_computation_on_mortgage(self):
+        loan_amount = self._total_amount - self._down_payment
+        interest_rate = interest_rates_per_payment_frequency(
+            self._annual_interest_rate, self._payment_frequency, self._compounding_period
+        )
+        total_number_of_payments = self._amortization_year * self._payment_frequency
+        mortgage_payment = mortgage_payments_per_payment_frequency(
+            loan_amount, interest_rate, total_number_of_payments
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent_financed = np.where(self._total_amount == 0, 0.0, loan_amount / self._total_amount * 100)
+        return {
+            'loan_amount': loan_amount,
+            'interest_rate_per_payment_frequency': interest_rate,
+            'total_number_of_payments_per_frequency': total_number_of_payments,
+            'mortgage_payment_per_payment_frequency': mortgage_payment,
+            'monthly_mortgage_payment': monthly_mortgage_payments(mortgage_payment, self._payment_frequency),
+            'annual_mortgage_payment': mortgage_payment * self._payment_frequency,
+            'percent_of_loan_financed': percent_financed
+        }
+
+    def perform_computation_on_analysis(self, mortgage):
+        monthly_gross_income = self._monthly_commercial_income + self._monthly_rental_income + self._monthly_facility_income
+        annual_gross_income = self._annual_commercial_income + self._annual_rental_income + self._annual_facility_income
+        monthly_net_income = monthly_gross_income - self._monthly_expense
+        annual_net_income = annual_gross_income - self._annual_expense
+        monthly_cash_flow = monthly_net_income - mortgage['monthly_mortgage_payment']
+        annual_cash_flow = annual_net_income - mortgage['annual_mortgage_payment']
+
+        # Defensive Code: Cannot divide by zero.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cap_rate_with_mortgage = np.where(self._purchase_price == 0, 0.0, annual_cash_flow / self._purchase_price * 100)
+            cap_rate_without_mortgage = np.where(self._purchase_price == 0, 0.0, annual_net_income / self._purchase_price * 100)
+
+        return {
+            'monthly_rental_income': self._monthly_rental_income,
+            'annual_rental_income': self._annual_rental_income,
+            'monthly_facility_income': self._monthly_facility_income,
+            'annual_facility_income': self._annual_facility_income,
+            'monthly_expense': self._monthly_expense,
+            'annual_expense': self._annual_expense,
+            'monthly_gross_income': monthly_gross_income,
+            'annual_gross_income': annual_gross_income,
+            'monthly_net_income': monthly_net_income,
+            'annual_net_income': annual_net_income,
+            'monthly_cash_flow': monthly_cash_flow,
+            'annual_cash_flow': annual_cash_flow,
+            'purchase_fees_amount': self._purchase_fees_amount,
+            'capital_improvements_amount': self._capital_improvements_amount,
+            'initial_investment_amount': self._purchase_fees_amount + self._capital_improvements_amount,
+            'cap_rate_with_mortgage': cap_rate_with_mortgage,
+            'cap_rate_without_mortgage': cap_rate_without_mortgage
+        }
+
+    def perform_computation_on_annual_projections(self, mortgage, analysis, chunk_size=BATCH_CHUNK_SIZE):
+        """
+        Function computes the projections ``chunk_size`` properties at a time
+        so the memory used by the IRR computation stays bounded.
+        """
+        shape = (self._number_of_properties, self._max_year)
+        if self._cash_flow_adjustments is not None:
+            assert self._cash_flow_adjustments.shape == shape, 'cash_flow_adjustments do not have one item per year: %r' % (self._cash_flow_adjustments.shape,)
+        annual_projections = {key: np.empty(shape) for key in PROJECTION_ARRAY_KEYS}
+        for start in range(0, self._number_of_properties, chunk_size):
+            rows = slice(start, start + chunk_size)
+            loan_balances = loan_balances_at_eoy(
+                mortgage['loan_amount'][rows],
+                mortgage['interest_rate_per_payment_frequency'][rows],
+                mortgage['mortgage_payment_per_payment_frequency'][rows],
+                self._payment_frequency[rows],
+                self._amortization_year[rows],
+                self._max_year
+            )
+            projection_arrays = compute_annual_projections(
+                purchase_price = self._purchase_price[rows],
+                selling_fee_rate = self._selling_fee_rate[rows],
+                initial_investment = analysis['initial_investment_amount'][rows],
+                cash_flow_with_mortgage = analysis['annual_cash_flow'][rows],
+                cash_flow_without_mortgage = analysis['annual_net_income'][rows],
+                loan_balances = loan_balances,
+                sales_price_factors = appreciation_factors(self._inflation_rate[rows], self._max_year),
+                cash_flow_adjustments = None if self._cash_flow_adjustments is None else self._cash_flow_adjustments[rows]
+            )
+            for key, values in projection_arrays.items():
+                annual_projections[key][rows] = values
+
+        # Apply the same rounding (4 decimal places) as "rate_decimal".
+        annual_projections['roi_rate'] = round_rates_half_up(annual_projections['roi_rate'])
+        annual_projections['roi_percent'] = annual_projections['roi_rate'] * 100
+        annual_projections['annualized_roi_percent'] = annual_projections['annualized_roi_rate'] * 100
+        annual_projections['year'] = np.arange(1, self._max_year + 1)
+        return annual_projections
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide cache of mortgage payment schedules. Analyzers with the same
+loan terms share one immutable schedule instead of generating the same
+"Money" rows every time "perform_analysis" gets called.
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+from threading import Lock
+from mortgagekit.calculator import MortgageCalculator
+from incomepropertyevaluatorkit.foundation.constants import *
+
+
+class MortgageScheduleRow(dict):
+    """
+    Read-only dictionary of one payment in a cached mortgage payment
+    schedule; copy it with "dict(row)" to get a row you can modify.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('mortgage payment schedule rows are read-only')
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __reduce__(self):
+        return (MortgageScheduleRow, (dict(self),))
+
+
+class MortgageScheduleCache:
+    """
+    Class will keep the most recently used mortgage payment schedules keyed
+    by the loan terms, up to ``max_size`` schedules, and count the number of
+    hits and misses. The cache is safe to use from many threads.
+    """
+
+    def __init__(self, max_size=MORTGAGE_SCHEDULE_CACHE_SIZE):
+        assert isinstance(max_size, int) and max_size >= 0, 'max_size is not a positive Integer: %r' % max_size
+        self._max_size = max_size
+        self._schedules = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_schedule(self, total_amount, down_payment, amortization_year,
+                     annual_interest_rate, payment_frequency, compounding_period,
+                     first_payment_date):
+        """
+        Function will return the payment schedule of the loan terms (the
+        "set_mortgage" arguments) as a tuple of read-only rows, generating it
+        with "mortgagekit" if it is not in the cache.
+        """
+        key = (
+            total_amount, down_payment, amortization_year, annual_interest_rate,
+            payment_frequency, compounding_period, str(first_payment_date)
+        )
+        with self._lock:
+            schedule = self._schedules.get(key)
+            if schedule is not None:
+                self._schedules.move_to_end(key)
+                self._hits += 1
+                return schedule
+            self._misses += 1
+
+        # Generate the schedule outside of the lock so other threads are not
+        # blocked; at worst two threads generate the same schedule.
+        mortgage_calculator = MortgageCalculator(
+            total_amount,
+            down_payment,
+            amortization_year,
+            annual_interest_rate,
+            payment_frequency,
+            compounding_period,
+            first_payment_date
+        )
+        schedule = tuple(
+            MortgageScheduleRow(row) for row in mortgage_calculator.get_mortgage_payment_schedule()
+        )
+
+        with self._lock:
+            if self._max_size > 0:
+                self._schedules[key] = schedule
+                self._schedules.move_to_end(key)
+                while len(self._schedules) > self._max_size:
+                    self._schedules.popitem(last=False)
+        return schedule
+
+    def set_max_size(self, max_size):
+        assert isinstance(max_size, int) and max_size >= 0, 'max_size is not a positive Integer: %r' % max_size
+        with self._lock:
+            self._max_size = max_size
+            while len(self._schedules) > self._max_size:
+                self._schedules.popitem(last=False)
+
+    def clear(self):
+        """
+        Function will remove every schedule and reset the statistics.
+        """
+        with self._lock:
+            self._schedules.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'size': len(self._schedules),
+                'max_size': self._max_size
+            }
+
+
+# The cache shared by every "FinancialAnalyzer" in this process.
+mortgage_schedule_cache = MortgageScheduleCache()
+
+
+def get_mortgage_schedule_cache():
+    return mortgage_schedule_cache
+
+
+def set_mortgage_schedule_cache_size(max_size):
+    mortgage_schedule_cache.set_max_size(max_size)
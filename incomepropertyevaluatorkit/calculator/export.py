@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming export of the annual projections and mortgage payment schedules of
+a portfolio into columnar files (CSV, NPZ or Parquet). The rows of every
+property are copied into fixed size column buffers which are written out
+whenever they are full, so the memory used does not grow with the size of
+the portfolio.
+
+Parquet files need the optional "pyarrow" library.
+"""
+
+from __future__ import print_function
+import csv
+from abc import ABC, abstractmethod
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from numpy.lib import format as npy_format
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import FinancialAnalyzer
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional dependency.
+    pyarrow = None
+
+
+# The columns (and their types) of the exported annual projections.
+PROJECTION_EXPORT_COLUMNS = (
+    ('property_id', 'int64'),
+    ('year', 'int64'),
+    ('debt_remaining', 'float64'),
+    ('sales_price', 'float64'),
+    ('legal_fees', 'float64'),
+    ('cash_flow', 'float64'),
+    ('initial_investment', 'float64'),
+    ('proceeds_of_sale', 'float64'),
+    ('total_return', 'float64'),
+    ('roi_rate', 'float64'),
+    ('roi_percent', 'float64'),
+    ('annualized_roi_rate', 'float64'),
+    ('annualized_roi_percent', 'float64'),
+)
+
+
+# The columns (and their types) of the exported mortgage payment schedules;
+# the "payment_date" is the "paymentData" of the schedule rows.
+SCHEDULE_EXPORT_COLUMNS = (
+    ('property_id', 'int64'),
+    ('year', 'int64'),
+    ('interval', 'int64'),
+    ('payment', 'float64'),
+    ('interest', 'float64'),
+    ('principle', 'float64'),
+    ('loan_balance', 'float64'),
+    ('total_paid_to_interest', 'float64'),
+    ('total_paid_to_bank', 'float64'),
+    ('payment_date', 'datetime64[D]'),
+)
+
+
+class ColumnarWriter(ABC):
+    """
+    Base class of the writers which get the rows to export as chunks of
+    ``columns``, a sequence of "(key, dtype)"; the subclasses write the
+    arrays of every chunk with "write_arrays".
+    """
+
+    def __init__(self, columns):
+        self._columns = tuple(columns)
+        self._number_of_rows = 0
+
+    def get_number_of_rows(self):
+        return self._number_of_rows
+
+    def write_columns(self, columns):
+        """
+        Function will write the rows of the ``columns`` dictionary of arrays
+        (all of the same length) keyed by the column keys.
+        """
+        arrays = [np.asarray(columns[key], dtype=dtype) for key, dtype in self._columns]
+        self.write_arrays(arrays)
+        self._number_of_rows += len(arrays[0])
+
+    @abstractmethod
+    def write_arrays(self, arrays):
+        """
+        Function will write the rows of the ``arrays``, one per column in
+        the order of the columns.
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CSVColumnarWriter(ColumnarWriter):
+    """
+    Class will write the rows into the text ``file_object`` as CSV with a
+    header row of the column keys.
+    """
+
+    def __init__(self, file_object, columns):
+        ColumnarWriter.__init__(self, columns)
+        self._writer = csv.writer(file_object)
+        self._writer.writerow([key for key, dtype in self._columns])
+
+    def write_arrays(self, arrays):
+        self._writer.writerows(zip(*[array.tolist() for array in arrays]))
+
+
+class NPZColumnarWriter(ColumnarWriter):
+    """
+    Class will write the rows into the NPZ file ``file`` (a path or a binary
+    file object), one ``.npy`` array per column which "numpy.load" can read
+    (and memory-map once extracted). Every column is streamed to a temporary
+    file until the writer gets closed, then copied into the archive.
+    """
+
+    def __init__(self, file, columns):
+        ColumnarWriter.__init__(self, columns)
+        self._file = file
+        self._temporary_files = [tempfile.TemporaryFile() for column in self._columns]
+
+    def write_arrays(self, arrays):
+        for temporary_file, array in zip(self._temporary_files, arrays):
+            temporary_file.write(np.ascontiguousarray(array).tobytes())
+
+    def close(self):
+        if self._temporary_files is None:
+            return
+        with zipfile.ZipFile(self._file, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for (key, dtype), temporary_file in zip(self._columns, self._temporary_files):
+                with archive.open(key + '.npy', 'w', force_zip64=True) as entry:
+                    npy_format.write_array_header_1_0(entry, {
+                        'descr': npy_format.dtype_to_descr(np.dtype(dtype)),
+                        'fortran_order': False,
+                        'shape': (self._number_of_rows,)
+                    })
+                    temporary_file.seek(0)
+                    shutil.copyfileobj(temporary_file, entry)
+                temporary_file.close()
+        self._temporary_files = None
+
+
+class ParquetColumnarWriter(ColumnarWriter):
+    """
+    Class will write the rows into the Parquet file ``file`` (a path or a
+    binary file object), one row group per chunk of rows.
+    """
+
+    def __init__(self, file, columns):
+        assert pyarrow is not None, 'Parquet files need the "pyarrow" library.'
+        ColumnarWriter.__init__(self, columns)
+        self._schema = pyarrow.schema([
+            (key, pyarrow.from_numpy_dtype(np.dtype(dtype))) for key, dtype in self._columns
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(file, self._schema)
+
+    def write_arrays(self, arrays):
+        self._writer.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(array) for array in arrays], schema=self._schema
+        ))
+
+    def close(self):
+        self._writer.close()
+
+
+def create_columnar_writer(file, columns, export_format):
+    """
+    Function will return the writer of the ``export_format`` (one of the
+    "EXPORT_FORMAT_*" constants); CSV needs a text ``file``, the others a
+    path or a binary file object.
+    """
+    writer_classes = {
+        EXPORT_FORMAT_CSV: CSVColumnarWriter,
+        EXPORT_FORMAT_NPZ: NPZColumnarWriter,
+        EXPORT_FORMAT_PARQUET: ParquetColumnarWriter,
+    }
+    assert export_format in writer_classes, 'export_format is not supported: %r' % export_format
+    return writer_classes[export_format](file, columns)
+
+
+class ColumnBuffer:
+    """
+    Class will collect rows into preallocated column arrays of ``size`` rows
+    and write them out to the ``writer`` whenever they are full.
+    """
+
+    def __init__(self, writer, columns, size=EXPORT_BUFFER_SIZE):
+        assert size > 0, 'size is not positive: %r' % size
+        self._writer = writer
+        self._arrays = {key: np.empty(size, dtype=dtype) for key, dtype in columns}
+        self._size = size
+        self._length = 0
+
+    def append(self, columns, length):
+        """
+        Function will append the ``length`` rows of the ``columns``, a
+        dictionary of sequences (or of values repeated on every row).
+        """
+        start = 0
+        while start < length:
+            count = min(length - start, self._size - self._length)
+            for key, array in self._arrays.items():
+                values = columns[key]
+                if isinstance(values, (list, tuple, np.ndarray)):
+                    values = values[start:start + count]
+                array[self._length:self._length + count] = values
+            self._length += count
+            start += count
+            if self._length == self._size:
+                self.flush()
+
+    def flush(self):
+        if self._length:
+            self._writer.write_columns({key: array[:self._length] for key, array in self._arrays.items()})
+            self._length = 0
+
+
+def get_money_column(rows, key):
+    return [float(row[key].amount) for row in rows]
+
+
+def get_number_column(rows, key):
+    return [float(row[key]) for row in rows]
+
+
+def get_projection_columns(property_id, projections):
+    columns = {
+        'property_id': property_id,
+        'year': [projection['year'] for projection in projections],
+        'roi_rate': get_number_column(projections, 'roi_rate'),
+        'roi_percent': get_number_column(projections, 'roi_percent'),
+        'annualized_roi_rate': get_number_column(projections, 'annualized_roi_rate'),
+        'annualized_roi_percent': get_number_column(projections, 'annualized_roi_percent')
+    }
+    for key in ('debt_remaining', 'sales_price', 'legal_fees', 'cash_flow',
+                'initial_investment', 'proceeds_of_sale', 'total_return'):
+        columns[key] = get_money_column(projections, key)
+    return columns
+
+
+def export_annual_projections(writer, items, buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Function will write the annual projections of every ``(property_id,
+    item)`` pair in ``items`` to the ``writer`` (see
+    "create_columnar_writer" with "PROJECTION_EXPORT_COLUMNS") and return
+    the number of rows written. An item is a "FinancialAnalyzer" or its
+    results; ex: the pairs yielded by "iter_analysis_in_parallel". The
+    ``items`` are consumed one at a time.
+    """
+    buffer = ColumnBuffer(writer, PROJECTION_EXPORT_COLUMNS, buffer_size)
+    number_of_rows = 0
+    for property_id, item in items:
+        if isinstance(item, FinancialAnalyzer):
+            item = item.perform_analysis(include_schedule=False)
+        projections = item['annual_projections']
+        buffer.append(get_projection_columns(property_id, projections), len(projections))
+        number_of_rows += len(projections)
+    buffer.flush()
+    return number_of_rows
+
+
+def export_mortgage_schedules(writer, items, buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Function will write the mortgage payment schedule of every
+    ``(property_id, item)`` pair in ``items`` to the ``writer`` (see
+    "create_columnar_writer" with "SCHEDULE_EXPORT_COLUMNS") and return the
+    number of rows written; see "export_annual_projections". The results
+    must include the schedule.
+    """
+    buffer = ColumnBuffer(writer, SCHEDULE_EXPORT_COLUMNS, buffer_size)
+    number_of_rows = 0
+    for property_id, item in items:
+        if isinstance(item, FinancialAnalyzer):
+            schedule = item.get_mortgage_payment_schedule()
+        else:
+            schedule = item['mortgage']['schedule']
+        assert schedule is not None, 'results of property %r do not include the schedule' % property_id
+        columns = {
+            'property_id': property_id,
+            'year': [row['year'] for row in schedule],
+            'interval': [row['interval'] for row in schedule],
+            'payment_date': [np.datetime64(row['paymentData'], 'D') for row in schedule]
+        }
+        for key in ('payment', 'interest', 'principle', 'loan_balance',
+                    'total_paid_to_interest', 'total_paid_to_bank'):
+            columns[key] = get_money_column(schedule, key)
+        buffer.append(columns, len(schedule))
+        number_of_rows += len(schedule)
+    buffer.flush()
+    return number_of_rows
+
+
+def export_batch_annual_projections(writer, results, property_ids=None,
+                                    buffer_size=EXPORT_BUFFER_SIZE):
+    """
+    Function will write the annual projections of the ``results`` of
+    "BatchFinancialAnalyzer.perform_analysis" to the ``writer``, about
+    ``buffer_size`` rows at a time, and return the number of rows written.
+    The properties are numbered from zero unless ``property_ids`` is set.
+    """
+    annual_projections = results['annual_projections']
+    years = np.asarray(annual_projections['year'])
+    number_of_properties = annual_projections['roi_rate'].shape[0]
+    if property_ids is None:
+        property_ids = np.arange(number_of_properties)
+    property_ids = np.asarray(property_ids)
+    assert len(property_ids) == number_of_properties, 'property_ids is not one per property: %r' % len(property_ids)
+
+    step = max(1, buffer_size // len(years))
+    for start in range(0, number_of_properties, step):
+        rows = slice(start, start + step)
+        count = len(property_ids[rows])
+        columns = {
+            'property_id': np.repeat(property_ids[rows], len(years)),
+            'year': np.tile(years, count)
+        }
+        for key, dtype in PROJECTION_EXPORT_COLUMNS[2:]:
+            columns[key] = annual_projections[key][rows].ravel()
+        writer.write_columns(columns)
+    return number_of_properties * len(years)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Growth curves of the income and expense line items of a "FinancialAnalyzer"
+(rent escalators, expense inflation, one-time step-ups, etc). Every curve
+computes its cumulative growth factor of every year once per horizon and
+keeps the table, so the annual projections multiply by the precomputed
+factors instead of raising the rate to the power of the year every time.
+"""
+
+from __future__ import print_function
+from decimal import Decimal
+import numpy as np
+
+
+class GrowthCurve(object):
+    """
+    Read-only growth curve of an amount. ``rates`` is the annual growth rate,
+    either one "Decimal" for every year or a sequence of the rate of year 1,
+    2, etc where the last rate is used for the years after it. ``step_ups``
+    is a dictionary of the one-time increases keyed by the year they are
+    applied in, ex: "{5: Decimal('0.10')}" raises the amount by 10% from
+    year 5 on.
+
+    Curves with the same rates and step-ups are equal, so the line items
+    which share a curve get grouped together in the projections.
+    """
+
+    __slots__ = ('rates', 'step_ups', '_factors')
+
+    def __init__(self, rates, step_ups=None):
+        if isinstance(rates, Decimal):
+            rates = (rates,)
+        rates = tuple(rates)
+        step_ups = tuple(sorted(dict(step_ups or {}).items()))
+        assert len(rates) > 0, 'rates is empty'
+        for rate in rates:
+            assert isinstance(rate, Decimal), 'rate is not a Decimal class: %r' % rate
+        for year, rate in step_ups:
+            assert isinstance(year, int) and year > 0, 'step-up year is not a positive Integer: %r' % year
+            assert isinstance(rate, Decimal), 'step-up rate is not a Decimal class: %r' % rate
+        object.__setattr__(self, 'rates', rates)
+        object.__setattr__(self, 'step_ups', step_ups)
+        object.__setattr__(self, '_factors', {})
+
+    def get_decimal_factors(self, max_year):
+        """
+        Function will return the tuple of the cumulative "Decimal" growth
+        factors of every year from 1 to ``max_year`` (inclusive).
+        """
+        return self.get_factor_tables(max_year)[0]
+
+    def get_factors(self, max_year):
+        """
+        Function will return the read-only ``float64`` array of the
+        cumulative growth factors of every year from 1 to ``max_year``
+        (inclusive).
+        """
+        return self.get_factor_tables(max_year)[1]
+
+    def get_factor_tables(self, max_year):
+        # At worst two threads compute the same tables.
+        tables = self._factors.get(max_year)
+        if tables is None:
+            decimal_factors = self.compute_decimal_factors(max_year)
+            factors = np.array([float(factor) for factor in decimal_factors], dtype=np.float64)
+            factors.flags.writeable = False
+            tables = (decimal_factors, factors)
+            self._factors[max_year] = tables
+        return tables
+
+    def compute_decimal_factors(self, max_year):
+        assert isinstance(max_year, int) and max_year > 0, 'max_year is not a positive Integer: %r' % max_year
+
+        # A constant rate is the same "pow" as the "appreciated_value"
+        # function so it gives the exact same amounts.
+        if len(self.rates) == 1 and not self.step_ups:
+            appreciated_rate = self.rates[0] + Decimal(1.0)
+            return tuple(pow(appreciated_rate, year) for year in range(1, max_year + 1))
+
+        step_ups = dict(self.step_ups)
+        factor = Decimal(1)
+        factors = []
+        for year in range(1, max_year + 1):
+            factor *= self.rates[min(year, len(self.rates)) - 1] + Decimal(1)
+            if year in step_ups:
+                factor *= step_ups[year] + Decimal(1)
+            factors.append(factor)
+        return tuple(factors)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('growth curves are read-only')
+
+    def __eq__(self, other):
+        if not isinstance(other, GrowthCurve):
+            return NotImplemented
+        return self.rates == other.rates and self.step_ups == other.step_ups
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return hash((self.rates, self.step_ups))
+
+    def __repr__(self):
+        return 'GrowthCurve(%r, %r)' % (self.rates, dict(self.step_ups))
+
+    def __reduce__(self):
+        return (GrowthCurve, (self.rates, dict(self.step_ups)))
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Optional instrumentation of the "FinancialAnalyzer.perform_analysis"
+function. Attach an "Instrumentation" to an analyzer (see "instrument" and
+"FinancialAnalyzer.set_instrumentation") to record the wall time and number
+of calls of these steps:
+
+- "perform_analysis": the whole analysis,
+- "mortgage": the mortgage schedule and loan balances,
+- "aggregation": the totals of the line items,
+- "annual_projections": all the annual projections,
+- "projection_year": one year of the annual projections (scalar engine),
+- "irr_solve": one IRR solve (scalar engine),
+- "vectorized_projections": the array computation (array backends),
+
+and the "money_allocations" counter, the number of "Money" objects created
+by the analysis, if ``count_money_allocations`` is set. Every record is also
+added to the process-wide instrumentation, see
+"get_process_instrumentation_stats".
+
+An analyzer without an instrumentation only checks for "None", so the
+overhead when disabled is negligible. The instrumentation is not pickled
+with its analyzer.
+"""
+
+from __future__ import print_function
+from contextlib import contextmanager
+from threading import Lock, local
+from moneyed import Money # Third party library for "Money" datatype.
+
+
+class Instrumentation:
+    """
+    Class will keep the timers (count, total and maximum seconds) and the
+    counters recorded by the analyzers it is attached to and add them to its
+    ``parent`` (by default the process-wide instrumentation). Every record
+    is also passed to ``callback(name, elapsed, count)`` if set, so they can
+    be exported to a metrics pipeline; the counters have no elapsed time
+    ("None").
+    """
+
+    def __init__(self, callback=None, count_money_allocations=False, parent=None):
+        self._callback = callback
+        self._count_money_allocations = count_money_allocations
+        self._parent = parent
+        self._lock = Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def is_counting_money_allocations(self):
+        return self._count_money_allocations
+
+    def record(self, name, elapsed, count=1):
+        """
+        Function will add ``count`` calls which took ``elapsed`` seconds in
+        total to the ``name`` timer.
+        """
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = {'count': count, 'total_time': elapsed, 'max_time': elapsed}
+            else:
+                timer['count'] += count
+                timer['total_time'] += elapsed
+                if elapsed > timer['max_time']:
+                    timer['max_time'] = elapsed
+        if self._callback is not None:
+            self._callback(name, elapsed, count)
+        if self._parent is not None:
+            self._parent.record(name, elapsed, count)
+
+    def increment(self, name, count=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + count
+        if self._callback is not None:
+            self._callback(name, None, count)
+        if self._parent is not None:
+            self._parent.increment(name, count)
+
+    def get_stats(self):
+        """
+        Function will return a copy of the statistics:
+
+            {
+                'timers': {name: {'count': ..., 'total_time': ..., 'max_time': ...}},
+                'counters': {name: count}
+            }
+        """
+        with self._lock:
+            return {
+                'timers': {name: dict(timer) for name, timer in self._timers.items()},
+                'counters': dict(self._counters)
+            }
+
+    def reset(self):
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+
+# The instrumentation which aggregates the records of every analyzer in this
+# process.
+process_instrumentation = Instrumentation()
+
+
+def get_process_instrumentation_stats():
+    return process_instrumentation.get_stats()
+
+
+def reset_process_instrumentation():
+    process_instrumentation.reset()
+
+
+def create_instrumentation(callback=None, count_money_allocations=False):
+    """
+    Function will return a new instrumentation which adds its records to the
+    process-wide instrumentation.
+    """
+    return Instrumentation(callback, count_money_allocations, process_instrumentation)
+
+
+# The "Money" allocations are counted by wrapping "Money.__init__" while at
+# least one analysis with an instrumentation which counts them is running
+# (see "FinancialAnalyzer.perform_analysis"). The wrapper is process-wide:
+# every thread creating "Money" pays for it while it is installed, but the
+# counts are per thread so the analyses running in other threads are not
+# counted. The number of running analyses is counted under the lock so only
+# the first one installs the wrapper and only the last one restores the
+# "Money.__init__" it replaced; it is left alone if something else replaced
+# the wrapper in the meantime.
+money_allocations = local()
+money_allocation_lock = Lock()
+money_allocation_users = [0]
+original_money_init = [Money.__init__]
+
+
+def counting_money_init(self, *args, **kwargs):
+    money_allocations.count = getattr(money_allocations, 'count', 0) + 1
+    original_money_init[0](self, *args, **kwargs)
+
+
+def start_counting_money_allocations():
+    with money_allocation_lock:
+        money_allocation_users[0] += 1
+        if money_allocation_users[0] == 1:
+            original_money_init[0] = Money.__init__
+            Money.__init__ = counting_money_init
+
+
+def stop_counting_money_allocations():
+    with money_allocation_lock:
+        money_allocation_users[0] -= 1
+        if money_allocation_users[0] == 0 and Money.__init__ is counting_money_init:
+            Money.__init__ = original_money_init[0]
+
+
+def get_money_allocation_count():
+    """
+    Function will return the number of "Money" objects created by this
+    thread while they were being counted.
+    """
+    return getattr(money_allocations, 'count', 0)
+
+
+@contextmanager
+def instrument(analyzer, callback=None, count_money_allocations=False):
+    """
+    Function will attach a new instrumentation (see "create_instrumentation")
+    to the ``analyzer`` for the duration of the "with" block and give it to
+    the block; the analyzer's previous instrumentation is restored after.
+
+        with instrument(analyzer) as instrumentation:
+            analyzer.perform_analysis()
+        stats = instrumentation.get_stats()
+    """
+    previous_instrumentation = analyzer.get_instrumentation()
+    instrumentation = create_instrumentation(callback, count_money_allocations)
+    analyzer.set_instrumentation(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        analyzer.set_instrumentation(previous_instrumentation)
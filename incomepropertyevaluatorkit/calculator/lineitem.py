@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Compact storage for the line items (rental incomes, expenses, fees, etc) of a
+"FinancialAnalyzer": every line item is a read-only record with
+``__slots__`` which behaves like the dictionary the analyzer used to store,
+and every collection keeps the amounts of its line items in parallel arrays
+of whole cents so the totals are one ``int64`` array reduction.
+"""
+
+from __future__ import print_function
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2.
+    from collections import Mapping
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from incomepropertyevaluatorkit.foundation.utils import to_cents, cents_to_decimal
+
+
+# The number of line items a collection has room for before it grows.
+LINE_ITEM_INITIAL_CAPACITY = 8
+
+
+class LineItem(Mapping):
+    """
+    Read-only record of a line item which can be used like a dictionary of
+    the fields listed in ``__slots__``; copy it with "dict(line_item)" to get
+    a dictionary you can modify. The ``optional_fields`` default to "None"
+    and the ``money_fields`` are the "Money" amounts.
+    """
+
+    __slots__ = ()
+    optional_fields = ()
+    money_fields = ()
+
+    def __init__(self, **fields):
+        for key in self.__slots__:
+            if key in self.optional_fields:
+                object.__setattr__(self, key, fields.pop(key, None))
+            else:
+                object.__setattr__(self, key, fields.pop(key))
+        assert not fields, 'fields are not supported: %r' % list(fields)
+
+    def __setattr__(self, key, value):
+        raise AttributeError('line items are read-only')
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, dict(self))
+
+    def __reduce__(self):
+        return (rebuild_line_item, (self.__class__, dict(self)))
+
+
+def rebuild_line_item(line_item_class, fields):
+    return line_item_class(**fields)
+
+
+class RentalIncomeLineItem(LineItem):
+    __slots__ = ('pk', 'annual_amount_per_unit', 'frequency',
+                 'monthly_amount_per_unit', 'type_id', 'name_text',
+                 'number_of_units', 'growth_curve')
+    optional_fields = ('growth_curve',)
+    money_fields = ('annual_amount_per_unit', 'monthly_amount_per_unit')
+
+
+class AmountLineItem(LineItem):
+    """
+    Record of the facility income, commercial income and expense line items.
+    """
+    __slots__ = ('pk', 'annual_amount', 'frequency', 'monthly_amount',
+                 'type_id', 'name_text', 'growth_curve')
+    optional_fields = ('growth_curve',)
+    money_fields = ('annual_amount', 'monthly_amount')
+
+
+class FeeLineItem(LineItem):
+    """
+    Record of the purchase fee and capital improvement line items.
+    """
+    __slots__ = ('pk', 'name_text', 'amount')
+    money_fields = ('amount',)
+
+
+class LineItemCollection(Mapping):
+    """
+    Class will store the line items of one kind keyed by "pk" (in the order
+    they were first added) and keep the ``amount_keys`` fields of every line
+    item in parallel arrays: the whole cents (rounded half up) of the "Money"
+    fields as ``int64`` and the value of the other fields. The "Money" fields
+    must be in ``currency``. The rows of the arrays are not in the order of
+    the line items once one got removed.
+    """
+
+    def __init__(self, line_item_class, amount_keys, currency='USD'):
+        self._line_item_class = line_item_class
+        self._amount_keys = tuple(amount_keys)
+        self._currency = currency
+        self._line_items = {}
+        self._indexes = {}
+        self._pks = []
+        self._size = 0
+        self._columns = {
+            key: np.zeros(LINE_ITEM_INITIAL_CAPACITY, dtype=self.get_dtype(key)) for key in self._amount_keys
+        }
+
+    def get_dtype(self, key):
+        if key in self._line_item_class.money_fields:
+            return np.int64
+        return object
+
+    def add(self, **fields):
+        """
+        Function will add the line item, replacing the line item with the
+        same "pk" if there is one.
+        """
+        line_item = self._line_item_class(**fields)
+        pk = line_item.pk
+        index = self._indexes.get(pk)
+        if index is None:
+            index = self._size
+            if index == len(self._columns[self._amount_keys[0]]):
+                self.grow()
+            self._indexes[pk] = index
+            self._pks.append(pk)
+            self._size += 1
+        for key in self._amount_keys:
+            value = line_item[key]
+            if key in self._line_item_class.money_fields:
+                assert isinstance(value, Money), '%s is not a Money class: %r' % (key, value)
+                assert value.currency.code == self._currency, '%s is not in %s: %r' % (key, self._currency, value)
+                value = to_cents(value)
+            self._columns[key][index] = value
+        self._line_items[pk] = line_item
+
+    def remove(self, pk):
+        """
+        Function will remove the line item, if there is one, and move the
+        last line item of the arrays into its row.
+        """
+        index = self._indexes.pop(pk, None)
+        if index is None:
+            return
+        del self._line_items[pk]
+        last_index = self._size - 1
+        last_pk = self._pks.pop()
+        if index != last_index:
+            self._pks[index] = last_pk
+            self._indexes[last_pk] = index
+        for column in self._columns.values():
+            column[index] = column[last_index]
+            column[last_index] = 0 if column.dtype == np.int64 else None
+        self._size -= 1
+
+    def copy(self):
+        """
+        Function will return a new collection with the same line items, which
+        are read-only and therefore shared, and copies of the arrays.
+        """
+        collection = LineItemCollection.__new__(LineItemCollection)
+        collection.__dict__.update(self.__dict__)
+        collection._line_items = dict(self._line_items)
+        collection._indexes = dict(self._indexes)
+        collection._pks = list(self._pks)
+        collection._columns = {key: column.copy() for key, column in self._columns.items()}
+        return collection
+
+    def grow(self):
+        for key, column in self._columns.items():
+            self._columns[key] = np.concatenate((column, np.zeros(len(column), dtype=column.dtype)))
+
+    def get_column(self, key):
+        """
+        Function will return the array (a view, do not modify it) of the
+        ``key`` field of every line item; the whole cents of "Money" fields.
+        """
+        return self._columns[key][:self._size]
+
+    def get_weighted_column(self, key, weight_key=None):
+        """
+        Function will return the array of the ``key`` field of every line
+        item multiplied by the ``weight_key`` field if set. The "Money" cents
+        stay ``int64`` unless a weight is not a whole number, in which case
+        the products are exact "Decimal" cents.
+        """
+        column = self.get_column(key)
+        if weight_key is None:
+            return column
+        weights = self.get_column(weight_key)
+        if column.dtype == np.int64 and weights.dtype == object:
+            integral_weights = weights.astype(np.int64)
+            if (integral_weights == weights).all():
+                return column * integral_weights
+            column = column.astype(object)
+        return column * weights
+
+    def to_money(self, total, key):
+        """
+        Function will return the ``total`` of the ``key`` field as "Money",
+        converting the cents of "Money" fields once.
+        """
+        if key not in self._line_item_class.money_fields:
+            return Money(amount=total, currency=self._currency)
+        if isinstance(total, Decimal):
+            return Money(amount=total.scaleb(-2), currency=self._currency)
+        return Money(amount=cents_to_decimal(total), currency=self._currency)
+
+    def get_total(self, key, weight_key=None):
+        """
+        Function will return the sum of the ``key`` field of every line item
+        (multiplied by the ``weight_key`` field if set) as "Money".
+        """
+        if self._size == 0:
+            return Money(amount=0, currency=self._currency)
+        return self.to_money(self.get_weighted_column(key, weight_key).sum(), key)
+
+    def get_totals_by(self, group_key, key, weight_key=None):
+        """
+        Function will return the dictionary of the sums of the ``key`` field
+        (multiplied by the ``weight_key`` field if set), as "Money", of the
+        line items grouped by the value of their ``group_key`` field.
+        """
+        totals = {}
+        for group, amount in zip(self.get_column(group_key), self.get_weighted_column(key, weight_key)):
+            totals[group] = totals.get(group, 0) + amount
+        return {group: self.to_money(total, key) for group, total in totals.items()}
+
+    def __getitem__(self, pk):
+        return self._line_items[pk]
+
+    def __iter__(self):
+        return iter(self._line_items)
+
+    def __len__(self):
+        return self._size
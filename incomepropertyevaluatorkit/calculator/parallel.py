@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Functions for running "FinancialAnalyzer.perform_analysis" on many properties
+across a pool of processes. The "Money" and "Decimal" arithmetic is pure
+python and therefore bound to one core per process by the GIL.
+"""
+
+from __future__ import print_function
+from concurrent.futures import ProcessPoolExecutor
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import iter_chunks_in_parallel
+from incomepropertyevaluatorkit.calculator.analyzer import FinancialAnalyzer
+
+
+def create_analyzer(spec):
+    """
+    Function will create a "FinancialAnalyzer" from the property ``spec``
+    dictionary which uses the same keys as the results of "perform_analysis":
+
+        {
+            'currency': 'USD',
+            'purchase_price': Money(...),
+            'inflation_rate': Decimal(...),
+            'selling_fee_rate': Decimal(...),
+            'buying_fee_rate': Decimal(...),
+            'mortgage': {...},        # The "set_mortgage" arguments.
+            'max_year': 30,
+            'loan_balance_method': LOAN_BALANCE_METHOD_CLOSED_FORM,
+            'rental_incomes': [...],  # The "add_rental_income" arguments.
+            'facility_incomes': [...],
+            'expenses': [...],
+            'commercial_incomes': [...],
+            'purchase_fees': [...],
+            'capital_improvements': [...]
+        }
+
+    The line item collections can be lists or mappings keyed by "pk", see
+    "FinancialAnalyzer.apply_changes".
+    """
+    analyzer = FinancialAnalyzer(spec.get('currency', 'USD'))
+    analyzer.apply_changes({key: value for key, value in spec.items() if key != 'currency'})
+    return analyzer
+
+
+def perform_analysis_on_item(item, include_schedule=False):
+    """
+    Function will perform the analysis of one "FinancialAnalyzer" or property
+    spec (see "create_analyzer") and return the results. The mortgage payment
+    schedule is left out unless ``include_schedule`` is set so it does not get
+    pickled back to the parent process.
+    """
+    analyzer = item if isinstance(item, FinancialAnalyzer) else create_analyzer(item)
+    return analyzer.perform_analysis(include_schedule)
+
+
+def perform_analysis_on_chunk(chunk, include_schedule=False):
+    """
+    Function will perform the analysis of a chunk of ``(index, item)`` pairs
+    and return the ``(index, results)`` pairs.
+    """
+    return [(index, perform_analysis_on_item(item, include_schedule)) for index, item in chunk]
+
+
+def perform_analysis_in_parallel(items, max_workers=None,
+                                 chunksize=PARALLEL_CHUNK_SIZE,
+                                 include_schedule=False, executor=None):
+    """
+    Function will perform the analysis of every "FinancialAnalyzer" or
+    property spec in ``items`` across a pool of processes and return the list
+    of results in the same order as the inputs.
+    """
+    items = list(items)
+    include_schedules = [include_schedule] * len(items)
+    if executor is not None:
+        return list(executor.map(perform_analysis_on_item, items, include_schedules, chunksize=chunksize))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(perform_analysis_on_item, items, include_schedules, chunksize=chunksize))
+
+
+def iter_analysis_in_parallel(items, max_workers=None,
+                              chunksize=PARALLEL_CHUNK_SIZE,
+                              include_schedule=False, executor=None):
+    """
+    Function will perform the analysis of every "FinancialAnalyzer" or
+    property spec in ``items`` across a pool of processes and yield the
+    ``(index, results)`` pairs as soon as each chunk has completed, where
+    ``index`` is the position of the item in ``items``.
+
+    Only a few chunks per worker are submitted ahead of the completed ones so
+    the ``items`` can be a long generator; pass ``max_workers`` with an
+    ``executor`` to size the chunks submitted ahead.
+    """
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for pair in iter_analysis_in_parallel(items, max_workers, chunksize, include_schedule, executor):
+                yield pair
+        return
+
+    for pair in iter_chunks_in_parallel(executor, perform_analysis_on_chunk, items, chunksize,
+                                        PARALLEL_CHUNKS_PER_WORKER, max_workers, include_schedule):
+        yield pair
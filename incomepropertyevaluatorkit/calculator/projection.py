@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Array based implementation of the annual projections computed by the
+"FinancialAnalyzer.perform_computation_on_annual_projections" function and
+of the mortgage numbers (from the "mortgagekit" library) they depend on.
+
+Every function in this module works on ``numpy`` arrays where the last axis
+is the projection year and any leading axes are broadcasted; this lets the
+same code compute one property, a portfolio of properties or a grid of
+"what-if" scenarios in a single pass.
+
+All amounts are ``float64`` and are converted into ``Money`` only when the
+list of projections is built. Amounts agree with the ``Decimal`` based
+computation to within float precision (about 1e-9 of the amount), the
+"roi_rate" is rounded with the same ``rate_decimal`` rule and the
+"annualized_roi_rate" agrees to within ``IRR_TOLERANCE``.
+"""
+
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.foundation.constants import *
+
+
+# The keys of the arrays returned by "compute_annual_projections".
+PROJECTION_ARRAY_KEYS = (
+    'debt_remaining', 'sales_price', 'legal_fees', 'cash_flow',
+    'initial_investment', 'proceeds_of_sale', 'total_return', 'roi_rate',
+    'annualized_roi_rate'
+)
+
+
+def appreciation_factors(inflation_rate, max_year=MAX_YEAR):
+    """
+    Function will return the ``(1 + inflation_rate) ** year`` factors for
+    every year from 1 to ``max_year`` (inclusive) in the last axis.
+    """
+    rate = np.asarray(inflation_rate, dtype=np.float64)[..., np.newaxis]
+    years = np.arange(1, max_year + 1, dtype=np.float64)
+    return np.power(1.0 + rate, years)
+
+
+def interest_rates_per_payment_frequency(annual_interest_rate, payment_frequency, compounding_period):
+    """
+    Function will return the interest rate per payment, the array version of
+    "MortgageCalculator.get_interest_rate_per_payment_frequency".
+    """
+    annual_interest_rate = np.asarray(annual_interest_rate, dtype=np.float64)
+    payment_frequency = np.asarray(payment_frequency, dtype=np.float64)
+    compounding_period = np.asarray(compounding_period, dtype=np.float64)
+    return np.power(annual_interest_rate / compounding_period + 1.0, compounding_period / payment_frequency) - 1.0
+
+
+def mortgage_payments_per_payment_frequency(loan_amount, interest_rate_per_payment, total_number_of_payments):
+    """
+    Function will return the amount paid per payment, the array version of
+    "MortgageCalculator.get_mortgage_payment_per_payment_frequency".
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64)
+    rate = np.asarray(interest_rate_per_payment, dtype=np.float64)
+    growth = np.power(rate + 1.0, np.asarray(total_number_of_payments, dtype=np.float64))
+    bottom = growth - 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(bottom == 0, 0.0, rate * growth / bottom * loan_amount)
+
+
+def monthly_mortgage_payments(mortgage_payment, payment_frequency):
+    """
+    Function will return the amount paid per payment standardized to a
+    monthly basis, the array version of the "mortgagekit" function
+    "get_mortgage_payment_per_frequency_to_per_month" (including the same
+    divisor it uses for each frequency).
+    """
+    payment_frequency = np.asarray(payment_frequency, dtype=np.float64)
+    multipliers = np.full(payment_frequency.shape, np.nan)
+    for frequency, multiplier in MONTHLY_PAYMENT_MULTIPLIERS.items():
+        multipliers = np.where(payment_frequency == frequency, multiplier, multipliers)
+    assert not np.isnan(multipliers).any(), 'payment_frequency is not supported: %r' % payment_frequency
+    return np.asarray(mortgage_payment, dtype=np.float64) * multipliers
+
+
+def loan_balances_at_eoy(loan_amount, interest_rate_per_payment, mortgage_payment,
+                         payment_frequency, amortization_year, max_year=MAX_YEAR):
+    """
+    Function will return the loan balance at the end of every year from 1 to
+    ``max_year`` (inclusive) in the last axis computed directly with the
+    amortization formula instead of building the payment schedule:
+
+        balance = P * (1 + r) ** k - payment * ((1 + r) ** k - 1) / r
+
+    where ``k`` is the number of payments made by the end of the year. Once
+    the loan is paid off (``k`` reaches the total number of payments) the
+    balance is exactly zero; note the payment schedule usually ends with a
+    rounding error sized balance instead, which can be positive.
+    """
+    loan_amount = np.asarray(loan_amount, dtype=np.float64)[..., np.newaxis]
+    rate = np.asarray(interest_rate_per_payment, dtype=np.float64)[..., np.newaxis]
+    mortgage_payment = np.asarray(mortgage_payment, dtype=np.float64)[..., np.newaxis]
+    payment_frequency = np.asarray(payment_frequency, dtype=np.float64)[..., np.newaxis]
+    total_number_of_payments = np.asarray(amortization_year, dtype=np.float64)[..., np.newaxis] * payment_frequency
+    payments = np.arange(1, max_year + 1, dtype=np.float64) * payment_frequency
+    growth = np.power(1.0 + rate, payments)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balances = np.where(
+            rate == 0,
+            loan_amount - mortgage_payment * payments,
+            loan_amount * growth - mortgage_payment * (growth - 1.0) / rate
+        )
+    return np.where(payments >= total_number_of_payments, 0.0, balances)
+
+
+def annualized_return_rates(initial_investment, previous_cash_flows, final_cash_flows):
+    """
+    Function will return the IRR for every year where the cash flows of year
+    ``y`` are the (negative) initial investment, the ``previous_cash_flows``
+    of years 1 to ``y - 1`` and the ``final_cash_flows`` of year ``y``.
+
+    All the years (and properties) are solved at the same time with Newton's
+    method; the rare cash flows which change sign more than once or do not
+    converge are solved one at a time by ``internal_rate_of_return``.
+    """
+    previous_cash_flows = np.asarray(previous_cash_flows, dtype=np.float64)
+    final_cash_flows = np.asarray(final_cash_flows, dtype=np.float64)
+    shape = np.broadcast(
+        np.empty(np.shape(initial_investment) + (1,)),
+        previous_cash_flows,
+        final_cash_flows
+    ).shape
+    max_year = shape[-1]
+
+    # Build the "values[..., year - 1, t]" matrix of cash flow arrays where
+    # the row of each year is padded with zeros (which do not change the
+    # polynomial) up to the length of the last year.
+    years = np.arange(max_year)
+    values = np.zeros(shape + (max_year + 1,))
+    values[..., 0] = -np.asarray(initial_investment, dtype=np.float64)[..., np.newaxis]
+    is_previous = years[np.newaxis, :] < years[:, np.newaxis]
+    values[..., 1:] = np.where(
+        is_previous,
+        np.broadcast_to(previous_cash_flows, shape)[..., np.newaxis, :],
+        0.0
+    )
+    values[..., years, years + 1] = np.broadcast_to(final_cash_flows, shape)
+
+    # Only one sign change (investment followed by returns) means a unique
+    # IRR which we can safely solve for with Newton's method.
+    first = values[..., :1]
+    rest = values[..., 1:]
+    is_unique = (((first < 0) & np.all(rest >= 0, axis=-1, keepdims=True) & np.any(rest > 0, axis=-1, keepdims=True)) |
+                 ((first > 0) & np.all(rest <= 0, axis=-1, keepdims=True) & np.any(rest < 0, axis=-1, keepdims=True)))[..., 0]
+
+    # Newton's method on "sum(values[t] * x**t)" where "x = 1 / (1 + rate)".
+    slope_values = values[..., 1:] * np.arange(1, max_year + 1, dtype=np.float64)
+    x = np.full(shape, 1.0 / (1.0 + IRR_GUESS))
+    x_powers = np.ones(shape + (max_year + 1,))
+    rates = np.full(shape, np.nan)
+    is_solving = is_unique.copy()
+    for iteration in range(IRR_MAX_ITERATIONS):
+        if not is_solving.any():
+            break
+        x_powers[..., 1:] = x[..., np.newaxis]
+        np.cumprod(x_powers, axis=-1, out=x_powers)
+        npv = np.einsum('...t,...t->...', values, x_powers)
+        slope = np.einsum('...t,...t->...', slope_values, x_powers[..., :-1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            next_x = x - npv / slope
+            next_rates = 1.0 / next_x - 1.0
+            is_converged = np.abs(next_rates - (1.0 / x - 1.0)) < IRR_TOLERANCE
+        is_valid = np.isfinite(next_x) & (next_x > 0.0)
+        is_solving &= is_valid
+        rates = np.where(is_solving & is_converged, next_rates, rates)
+        is_solving &= ~is_converged
+        x = np.where(is_solving, next_x, x)
+
+    # Solve the remaining cash flows by bracketing.
+    is_remaining = np.isnan(rates)
+    if is_remaining.any():
+        rates[is_remaining] = bracketed_return_rates(values[is_remaining])
+    return rates
+
+
+def bracketed_return_rates(values):
+    """
+    Function will return the IRR of every row of cash flow ``values`` by
+    bisection on the sign change closest to a zero rate, the array version of
+    the fallback used by ``internal_rate_of_return``. Rows without any sign
+    change have no IRR and are ``numpy.nan``.
+    """
+    def npv(values, x):
+        # Horner's method on every row (and every column of "x") at once.
+        total = np.zeros(np.broadcast(x, np.empty((len(values), 1))).shape)
+        for index in range(values.shape[-1] - 1, -1, -1):
+            total = total * x + values[:, index, np.newaxis]
+        return total
+
+    # Find the sign change of every row closest to a zero rate on the grid.
+    grid = 1.0 / (1.0 + IRR_BRACKET_RATES)
+    grid_npv = npv(values, grid)
+    signs = np.sign(grid_npv)
+    is_change = signs[:, :-1] * signs[:, 1:] < 0
+    distances = np.abs(IRR_BRACKET_RATES)
+    index = np.argmin(np.where(is_change, distances[:-1], np.inf), axis=1)
+    has_change = is_change.any(axis=1)
+
+    # Rows without a sign change only have an IRR if it is on the grid.
+    is_exact = grid_npv == 0.0
+    exact_index = np.argmin(np.where(is_exact, distances, np.inf), axis=1)
+    rates = np.where(is_exact.any(axis=1), IRR_BRACKET_RATES[exact_index], np.nan)
+
+    # Bisection on all the brackets at the same time.
+    rows = np.flatnonzero(has_change)
+    low, high = grid[index[rows] + 1], grid[index[rows]]  # "x" decreases as rates grow.
+    low_is_positive = grid_npv[rows, index[rows] + 1] > 0.0
+    for iteration in range(IRR_MAX_BISECTIONS):
+        if not np.any(1.0 / low - 1.0 / high > IRR_TOLERANCE):
+            break
+        middle = (low + high) / 2.0
+        is_low = (npv(values[rows], middle[:, np.newaxis])[:, 0] > 0.0) == low_is_positive
+        low = np.where(is_low, middle, low)
+        high = np.where(is_low, high, middle)
+    rates[rows] = 1.0 / ((low + high) / 2.0) - 1.0
+    return rates
+
+
+def compute_annual_projections(purchase_price, selling_fee_rate,
+                               initial_investment, cash_flow_with_mortgage,
+                               cash_flow_without_mortgage, loan_balances,
+                               sales_price_factors, cash_flow_factors=None,
+                               cash_flows_per_year=False,
+                               cash_flow_adjustments=None, in_cents=False):
+    """
+    Function will compute every year of the annual projections at once and
+    return a dictionary of arrays (last axis is the year) keyed by the
+    names used in the "annual_projections" dictionaries.
+
+    ``sales_price_factors`` and ``cash_flow_factors`` are the appreciation
+    factors for every year, see ``appreciation_factors``; if no cash flow
+    factors are provided then the sales price factors are used. If
+    ``cash_flows_per_year`` is set then the cash flows already have the year
+    axis (ex: when the mortgage payment changes every year). The
+    ``cash_flow_adjustments`` of every year, if any, are added to the
+    appreciated cash flows (ex: the line items which grow with their own
+    growth curve instead of the inflation rate, see "calculator/growth.py").
+
+    If ``in_cents`` is set then the amounts are ``int64`` arrays of whole
+    cents: every amount multiplied by a factor or rate is rounded back to
+    whole cents with "round_half_up" and the sums and differences are exact
+    ``int64`` arithmetic; the amounts returned are ``int64`` arrays of cents
+    and the rates are ``float64``.
+    """
+    if cash_flow_factors is None:
+        cash_flow_factors = sales_price_factors
+    amount_dtype = np.int64 if in_cents else np.float64
+    purchase_price = np.asarray(purchase_price, dtype=amount_dtype)[..., np.newaxis]
+    selling_fee_rate = np.asarray(selling_fee_rate, dtype=np.float64)[..., np.newaxis]
+    initial_investment = np.asarray(initial_investment, dtype=amount_dtype)
+    cash_flow_with_mortgage = np.asarray(cash_flow_with_mortgage, dtype=amount_dtype)
+    cash_flow_without_mortgage = np.asarray(cash_flow_without_mortgage, dtype=amount_dtype)
+    if not cash_flows_per_year:
+        cash_flow_with_mortgage = cash_flow_with_mortgage[..., np.newaxis]
+        cash_flow_without_mortgage = cash_flow_without_mortgage[..., np.newaxis]
+
+    # Defensive Coding: Cannot have negative 'debtRemaining' values.
+    loan_balances = np.maximum(np.asarray(loan_balances, dtype=amount_dtype), 0)
+
+    # Calculate how much money we have coming in at the end of the year and
+    # apply appreciation to it.
+    cash_flows = np.where(loan_balances > 0, cash_flow_with_mortgage, cash_flow_without_mortgage)
+    appreciated_cash_flows = cash_flows * cash_flow_factors
+    if cash_flow_adjustments is not None:
+        appreciated_cash_flows = appreciated_cash_flows + np.asarray(cash_flow_adjustments, dtype=np.float64)
+
+    # Calculate our new sales price, fees and the proceeds of sale.
+    sales_prices = purchase_price * sales_price_factors
+    fees = purchase_price * selling_fee_rate * sales_price_factors
+    if in_cents:
+        appreciated_cash_flows = round_half_up(appreciated_cash_flows)
+        sales_prices = round_half_up(sales_prices)
+        fees = round_half_up(fees)
+    proceeds_of_sale = sales_prices - fees - loan_balances
+
+    # Calculate the total return and the return on investment.
+    total_returns = proceeds_of_sale - appreciated_cash_flows
+    investment = initial_investment[..., np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        roi_rates = np.where(investment == 0, 0.0, (total_returns - investment) / investment)
+
+    # The cash flow used for the IRR of the previous years is the previous
+    # years appreciated cash flow, unless it was zero (ex: the first year)
+    # in which case the current years cash flow is used.
+    previous_cash_flows = np.zeros_like(appreciated_cash_flows)
+    previous_cash_flows[..., 1:] = appreciated_cash_flows[..., :-1]
+    previous_cash_flows = np.where(previous_cash_flows == 0, cash_flows, previous_cash_flows)
+    irr_rates = annualized_return_rates(
+        initial_investment,
+        previous_cash_flows,
+        previous_cash_flows + proceeds_of_sale
+    )
+
+    shape = total_returns.shape
+    return {
+        'debt_remaining': np.broadcast_to(loan_balances, shape),
+        'sales_price': np.broadcast_to(sales_prices, shape),
+        'legal_fees': np.broadcast_to(fees, shape),
+        'cash_flow': np.broadcast_to(appreciated_cash_flows, shape),
+        'initial_investment': np.broadcast_to(investment, shape),
+        'proceeds_of_sale': np.broadcast_to(proceeds_of_sale, shape),
+        'total_return': total_returns,
+        'roi_rate': np.broadcast_to(roi_rates, shape),
+        'annualized_roi_rate': np.broadcast_to(irr_rates, shape)
+    }
+
+
+def annual_projections_to_list(projection_arrays, currency='USD', in_cents=False):
+    """
+    Function will convert the dictionary of arrays for one property returned
+    by ``compute_annual_projections`` into the list of dictionaries format
+    used by the "annual_projections" of the analyzer; set ``in_cents`` if
+    the amounts are whole cents.
+    """
+    currency = Money(amount=0, currency=currency).currency  # Look up once.
+    money_keys = ('debt_remaining', 'sales_price', 'legal_fees', 'cash_flow',
+                  'initial_investment', 'proceeds_of_sale', 'total_return')
+    columns = {key: projection_arrays[key].tolist() for key in money_keys}
+    roi_rates = projection_arrays['roi_rate'].tolist()
+    irr_rates = projection_arrays['annualized_roi_rate']
+
+    annual_projections = []
+    for index, irr_rate in enumerate(irr_rates):
+        projection = {'year': index + 1}
+        for key in money_keys:
+            amount = columns[key][index]
+            if in_cents:
+                amount = cents_to_decimal(amount)
+            projection[key] = Money(amount=amount, currency=currency)
+        projection['roi_rate'] = rate_decimal(roi_rates[index])
+        projection['roi_percent'] = projection['roi_rate'] * Decimal(100.0)
+        projection['annualized_roi_rate'] = irr_rate
+        projection['annualized_roi_percent'] = irr_rate * 100
+        annual_projections.append(projection)
+    return annual_projections
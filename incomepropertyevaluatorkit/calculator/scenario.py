@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Functions for evaluating many what-if scenarios of one "FinancialAnalyzer"
+where every scenario is a dictionary of changes (see
+"FinancialAnalyzer.apply_changes"):
+
+    results = evaluate_scenarios(analyzer, [
+        {'inflation_rate': Decimal('0.02')},
+        {'inflation_rate': Decimal('0.03'), 'mortgage': other_mortgage},
+        {'capital_improvements': [{'pk': 2, 'name_text': "Roof", 'amount': roof}]},
+    ])
+
+The scenarios are arranged into a tree by the changes of every stage of the
+analysis ("SCENARIO_STAGES"): first the mortgage, then the totals and then
+the appreciation factors. Every distinct stage is computed once, in a fork
+(see "FinancialAnalyzer.fork") shared by all the scenarios below it, so a
+comparison of many scenarios with only a few distinct loans only builds a
+few mortgage schedules and loan balances.
+"""
+
+from __future__ import print_function
+import pickle
+from collections import OrderedDict
+from incomepropertyevaluatorkit.foundation.constants import *
+
+
+# The stages of the analysis and the changes which make them differ, in the
+# order they depend on each other; the other changes only change the annual
+# projections of each scenario.
+SCENARIO_STAGES = (
+    ('mortgage', ('mortgage', 'loan_balance_method')),
+    ('aggregation', ('purchase_price', 'rental_incomes', 'facility_incomes', 'expenses',
+                     'commercial_incomes', 'purchase_fees', 'capital_improvements')),
+    ('appreciation', ('inflation_rate',)),
+)
+
+
+def get_changes_key(changes):
+    """
+    Function will return a key which is the same for equal ``changes``.
+    """
+    return pickle.dumps(sorted(changes.items()), pickle.HIGHEST_PROTOCOL)
+
+
+def build_scenario_tree(scenarios, stage_index=0):
+    """
+    Function will group the ``(index, changes)`` pairs of the ``scenarios``
+    by the changes of the "SCENARIO_STAGES" from ``stage_index`` on and
+    return the list of nodes of that stage:
+
+        {'changes': {...}, 'children': [...]}
+
+    where the children of the last stage are the ``(index, changes)`` pairs
+    with the remaining changes of every scenario.
+    """
+    if stage_index == len(SCENARIO_STAGES):
+        return list(scenarios)
+    stage_name, stage_keys = SCENARIO_STAGES[stage_index]
+    groups = OrderedDict()
+    for index, changes in scenarios:
+        stage_changes = {key: value for key, value in changes.items() if key in stage_keys}
+        other_changes = {key: value for key, value in changes.items() if key not in stage_keys}
+        group = groups.setdefault(get_changes_key(stage_changes), (stage_changes, []))
+        group[1].append((index, other_changes))
+    return [
+        {'changes': stage_changes, 'children': build_scenario_tree(members, stage_index + 1)}
+        for stage_changes, members in groups.values()
+    ]
+
+
+def get_scenario_stage_counts(scenarios):
+    """
+    Function will return the number of distinct computations of every stage
+    of "SCENARIO_STAGES" needed by the ``scenarios``, ex: the number of
+    distinct loans for the "mortgage" stage.
+    """
+    counts = OrderedDict((stage_name, 0) for stage_name, stage_keys in SCENARIO_STAGES)
+    nodes = build_scenario_tree(enumerate(scenarios))
+    for stage_name, stage_keys in SCENARIO_STAGES:
+        counts[stage_name] = len(nodes)
+        nodes = [child for node in nodes for child in node['children']]
+    return counts
+
+
+def compute_scenario_stage(analyzer, stage_name, include_schedule):
+    """
+    Function will compute the ``stage_name`` stage of the ``analyzer`` so its
+    forks share the results.
+    """
+    if stage_name == 'mortgage':
+        analyzer.perform_computation_on_mortgage(include_schedule)
+    elif stage_name == 'aggregation':
+        analyzer.perform_computation_on_analysis()
+    elif stage_name == 'appreciation':
+        analyzer.get_inflation_curve().get_factor_tables(analyzer.get_max_year())
+
+
+def evaluate_scenario_nodes(analyzer, nodes, results, include_schedule, stage_index=0):
+    if stage_index == len(SCENARIO_STAGES):
+        for index, changes in nodes:
+            results[index] = analyzer.with_changes(**changes).perform_analysis(include_schedule)
+        return
+    stage_name, stage_keys = SCENARIO_STAGES[stage_index]
+    for node in nodes:
+        stage_analyzer = analyzer.with_changes(**node['changes'])
+        compute_scenario_stage(stage_analyzer, stage_name, include_schedule)
+        evaluate_scenario_nodes(stage_analyzer, node['children'], results, include_schedule, stage_index + 1)
+
+
+def evaluate_scenarios(analyzer, scenarios, include_schedule=False):
+    """
+    Function will return the list of results of "perform_analysis" of every
+    scenario, a dictionary of the changes to the ``analyzer`` (which is not
+    modified), in the same order as ``scenarios``. The results of the stages
+    scenarios have in common are the same objects.
+    """
+    scenarios = list(scenarios)
+    results = [None] * len(scenarios)
+    nodes = build_scenario_tree(enumerate(scenarios))
+    evaluate_scenario_nodes(analyzer.fork(), nodes, results, include_schedule)
+    return results
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Functions for running what-if sweeps on a "FinancialAnalyzer": every point of
+the Cartesian grid of the inputted value ranges gets analyzed in vectorized
+passes of the "BatchFinancialAnalyzer".
+"""
+
+from __future__ import print_function
+from collections import OrderedDict
+import numpy as np
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.batch import BatchFinancialAnalyzer
+from incomepropertyevaluatorkit.calculator.projection import appreciation_factors
+
+
+# The axes of the sensitivity grid in the order of the result dimensions.
+SENSITIVITY_AXES = (
+    'inflation_rate',
+    'purchase_price',
+    'annual_interest_rate',
+    'selling_fee_rate',
+    'rent_multiplier',
+    'expense_multiplier',
+)
+
+
+def get_sensitivity_axes(analyzer, inflation_rates=None, purchase_prices=None,
+                         annual_interest_rates=None, selling_fee_rates=None,
+                         rent_multipliers=None, expense_multipliers=None):
+    """
+    Function will return the values of every axis of the grid; an axis with
+    no values only contains the value of the ``analyzer``.
+    """
+    mortgage_terms = analyzer.get_mortgage_terms()
+    assert mortgage_terms is not None, 'analyzer does not have a mortgage, call "set_mortgage" first.'
+    values = {
+        'inflation_rate': (inflation_rates, analyzer.get_inflation_rate()),
+        'purchase_price': (purchase_prices, analyzer.get_purchase_price().amount),
+        'annual_interest_rate': (annual_interest_rates, mortgage_terms['annual_interest_rate']),
+        'selling_fee_rate': (selling_fee_rates, analyzer.get_selling_fee_rate()),
+        'rent_multiplier': (rent_multipliers, 1),
+        'expense_multiplier': (expense_multipliers, 1),
+    }
+    axes = OrderedDict()
+    for name in SENSITIVITY_AXES:
+        axis_values, base_value = values[name]
+        if axis_values is None:
+            axis_values = [base_value]
+        axes[name] = np.atleast_1d(np.asarray(axis_values, dtype=np.float64))
+        assert axes[name].ndim == 1, '%s is not a one dimensional range: %r' % (name, axis_values)
+    return axes
+
+
+def get_sensitivity_cash_flow_adjustments(analyzer, grid):
+    """
+    Function will return the ``(points, years)`` array of the amounts added
+    to the cash flows of every point of the ``grid`` by the line items of the
+    ``analyzer`` which grow with their own growth curve (see
+    "FinancialAnalyzer.get_cash_flow_adjustments"), or "None" if there are
+    none. The rental incomes and expenses are scaled by the multipliers.
+    """
+    max_year = analyzer.get_max_year()
+    multipliers = {
+        'rental_income': grid['rent_multiplier'],
+        'expense': grid['expense_multiplier'],
+    }
+    inflation_factors = appreciation_factors(grid['inflation_rate'], max_year)
+    cash_flow_adjustments = None
+    for kind, totals in analyzer.get_growth_curve_amounts_by_kind().items():
+        multiplier = multipliers.get(kind, np.ones_like(grid['inflation_rate']))[..., np.newaxis]
+        for growth_curve, amount in totals.items():
+            adjustments = multiplier * float(amount.amount) * (growth_curve.get_factors(max_year) - inflation_factors)
+            cash_flow_adjustments = adjustments if cash_flow_adjustments is None else cash_flow_adjustments + adjustments
+    return cash_flow_adjustments
+
+
+def perform_sensitivity_analysis(analyzer, inflation_rates=None, purchase_prices=None,
+                                 annual_interest_rates=None, selling_fee_rates=None,
+                                 rent_multipliers=None, expense_multipliers=None,
+                                 chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Function will analyze the ``analyzer`` at every point of the grid of the
+    inputted value ranges and return:
+
+        {
+            'axes': OrderedDict([('inflation_rate', array), ...]),
+            'analysis': {...},            # Arrays of the grid shape.
+            'annual_projections': {...}   # Arrays of the grid + (years,) shape.
+        }
+
+    The grid has one dimension per "SENSITIVITY_AXES" entry; the axes with no
+    inputted values have a length of one. The "rent_multiplier" scales the
+    rental income and the "expense_multiplier" scales the expenses. The
+    mortgage amount does not change with the purchase price, the same as it
+    does not with "set_purchase_price". The line items with their own growth
+    curve keep growing with it at every inflation rate of the grid.
+    """
+    axes = get_sensitivity_axes(
+        analyzer, inflation_rates, purchase_prices, annual_interest_rates,
+        selling_fee_rates, rent_multipliers, expense_multipliers
+    )
+    shape = tuple(len(axis_values) for axis_values in axes.values())
+    grid = OrderedDict(
+        (name, values.ravel()) for name, values in zip(axes.keys(), np.meshgrid(*axes.values(), indexing='ij'))
+    )
+
+    # Extract the values which are the same for every point of the grid.
+    mortgage_terms = analyzer.get_mortgage_terms()
+    rental_income = analyzer.get_total_rental_income_amount()
+    facility_income = analyzer.get_total_facility_income_amount()
+    commercial_income = analyzer.get_total_commercial_income_amount()
+    expense = analyzer.get_total_expense_amount()
+
+    # Analyze every point of the grid as a property of a batch.
+    batch_analyzer = BatchFinancialAnalyzer(int(np.prod(shape)), analyzer.get_currency())
+    batch_analyzer.set_max_year(analyzer.get_max_year())
+    batch_analyzer.set_purchase_prices(grid['purchase_price'])
+    batch_analyzer.set_inflation_rates(grid['inflation_rate'])
+    batch_analyzer.set_selling_fee_rates(grid['selling_fee_rate'])
+    batch_analyzer.set_buying_fee_rates(analyzer.get_buying_fee_rate())
+    batch_analyzer.set_mortgages(
+        mortgage_terms['total_amount'].amount,
+        mortgage_terms['down_payment'].amount,
+        mortgage_terms['amortization_year'],
+        grid['annual_interest_rate'],
+        mortgage_terms['payment_frequency'],
+        mortgage_terms['compounding_period']
+    )
+    batch_analyzer.set_rental_incomes(
+        grid['rent_multiplier'] * float(rental_income['monthly'].amount),
+        grid['rent_multiplier'] * float(rental_income['annual'].amount)
+    )
+    batch_analyzer.set_facility_incomes(facility_income['monthly'].amount, facility_income['annual'].amount)
+    batch_analyzer.set_commercial_incomes(commercial_income['monthly'].amount, commercial_income['annual'].amount)
+    batch_analyzer.set_expenses(
+        grid['expense_multiplier'] * float(expense['monthly'].amount),
+        grid['expense_multiplier'] * float(expense['annual'].amount)
+    )
+    batch_analyzer.set_purchase_fees(analyzer.get_total_purchase_fee_amount().amount)
+    batch_analyzer.set_capital_improvements(analyzer.get_total_capital_improvements_amount().amount)
+    batch_analyzer.set_cash_flow_adjustments(get_sensitivity_cash_flow_adjustments(analyzer, grid))
+    results = batch_analyzer.perform_analysis(chunk_size)
+
+    # Reshape the columns into the grid.
+    annual_projections = results['annual_projections']
+    years = annual_projections.pop('year')
+    return {
+        'axes': axes,
+        'year': years,
+        'analysis': {
+            key: values.reshape(shape) for key, values in results['analysis'].items()
+        },
+        'annual_projections': {
+            key: values.reshape(shape + (len(years),)) for key, values in annual_projections.items()
+        }
+    }
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Functions for running a Monte Carlo simulation of the annual projections of a
+"FinancialAnalyzer": the inflation, appreciation, vacancy and interest rates
+are sampled as ``(paths, years)`` arrays and every path gets projected with
+the array functions of "calculator/projection.py".
+"""
+
+from __future__ import print_function
+import warnings
+import numpy as np
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.projection import *
+
+
+# The keys of the simulated arrays summarized by the simulation.
+SIMULATION_ARRAY_KEYS = ('proceeds_of_sale', 'roi_rate', 'annualized_roi_rate')
+
+
+def simulate_mortgage(loan_amount, annual_interest_rates, payment_frequency,
+                      compounding_period, amortization_year):
+    """
+    Function will return the ``(annual_mortgage_payments, loan_balances)``
+    arrays of a mortgage whose annual interest rate can change every year
+    (the last axis of ``annual_interest_rates``); at the start of every year
+    the payment is re-computed to pay off the remaining balance by the end
+    of the amortization. With constant rates the results are the same as
+    the closed form loan balances.
+    """
+    annual_interest_rates = np.asarray(annual_interest_rates, dtype=np.float64)
+    max_year = annual_interest_rates.shape[-1]
+    annual_mortgage_payments = np.zeros(annual_interest_rates.shape)
+    loan_balances = np.zeros(annual_interest_rates.shape)
+    loan_balance = np.full(annual_interest_rates.shape[:-1], float(loan_amount))
+    for year in range(max_year):
+        remaining_payments = (amortization_year - year) * payment_frequency
+        if remaining_payments <= 0:
+            break
+        rate = interest_rates_per_payment_frequency(annual_interest_rates[..., year], payment_frequency, compounding_period)
+        mortgage_payment = mortgage_payments_per_payment_frequency(loan_balance, rate, remaining_payments)
+        annual_mortgage_payments[..., year] = mortgage_payment * payment_frequency
+        if remaining_payments <= payment_frequency:
+            break  # Paid off, the balance stays zero.
+        growth = np.power(1.0 + rate, payment_frequency)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            loan_balance = np.where(
+                rate == 0,
+                loan_balance - mortgage_payment * payment_frequency,
+                loan_balance * growth - mortgage_payment * (growth - 1.0) / rate
+            )
+        loan_balances[..., year] = loan_balance
+    return annual_mortgage_payments, loan_balances
+
+
+def perform_monte_carlo_simulation(analyzer, number_of_paths, seed=None,
+                                   inflation_rate_volatility=0,
+                                   appreciation_rate=None,
+                                   appreciation_rate_volatility=0,
+                                   vacancy_rate=0, vacancy_rate_volatility=0,
+                                   interest_rate_volatility=0,
+                                   percentiles=SIMULATION_PERCENTILES,
+                                   chunk_size=SIMULATION_CHUNK_SIZE,
+                                   include_paths=False):
+    """
+    Function will simulate ``number_of_paths`` paths of the annual
+    projections of the ``analyzer`` and return the distributions of the
+    "proceeds_of_sale", "roi_rate" and "annualized_roi_rate" per year:
+
+        {
+            'year': array,                # (years,)
+            'percentiles': array,         # (percentiles,)
+            'proceeds_of_sale': {
+                'mean': array,            # (years,)
+                'percentiles': array,     # (percentiles, years)
+                'paths': array            # (paths, years), if "include_paths".
+            },
+            'roi_rate': {...},
+            'annualized_roi_rate': {...}
+        }
+
+    Every year of every path samples, from normal distributions:
+
+    - the inflation rate which grows the cash flows (mean: the analyzer's),
+    - the appreciation rate which grows the sales price (mean:
+      ``appreciation_rate``, by default the analyzer's inflation rate),
+    - the vacancy rate, clipped to [0, 1], which reduces the gross income,
+    - the change of the mortgage's annual interest rate (a random walk from
+      the analyzer's rate, never below zero); see "simulate_mortgage".
+
+    The line items with their own growth curve grow with it instead of the
+    sampled inflation rates (the vacancy rate still reduces the incomes).
+
+    The paths are computed ``chunk_size`` at a time so the memory used by the
+    IRR computation stays bounded. Every variable has its own random stream
+    seeded from ``seed``, so the results do not depend on ``chunk_size``. The
+    paths which have no IRR ("nan") are left out of its percentiles.
+    """
+    mortgage_terms = analyzer.get_mortgage_terms()
+    assert mortgage_terms is not None, 'analyzer does not have a mortgage, call "set_mortgage" first.'
+    assert number_of_paths > 0, 'number_of_paths is not positive: %r' % number_of_paths
+    max_year = analyzer.get_max_year()
+    inflation_rate = float(analyzer.get_inflation_rate())
+    if appreciation_rate is None:
+        appreciation_rate = inflation_rate
+
+    # Extract the values which are the same for every path.
+    purchase_price = float(analyzer.get_purchase_price().amount)
+    selling_fee_rate = float(analyzer.get_selling_fee_rate())
+    initial_investment = float(analyzer.get_total_initial_investment_amount().amount)
+    annual_gross_income = float(analyzer.get_total_gross_income_amount()['annual'].amount)
+    annual_expense = float(analyzer.get_total_expense_amount()['annual'].amount)
+    loan_amount = float((mortgage_terms['total_amount'] - mortgage_terms['down_payment']).amount)
+    payment_frequency = int(mortgage_terms['payment_frequency'])
+    compounding_period = float(mortgage_terms['compounding_period'])
+
+    # Split the amounts of the line items with their own growth curve into
+    # the incomes (reduced by the vacancy rate) and the expenses.
+    growth_curve_amounts = {}
+    for kind, totals in analyzer.get_growth_curve_amounts_by_kind().items():
+        for growth_curve, amount in totals.items():
+            income_amount, expense_amount = growth_curve_amounts.get(growth_curve, (0.0, 0.0))
+            if kind == 'expense':
+                expense_amount += float(amount.amount)
+            else:
+                income_amount += float(amount.amount)
+            growth_curve_amounts[growth_curve] = (income_amount, expense_amount)
+
+    # Create the random stream of every variable, each seeded by a draw of
+    # a stream seeded from "seed".
+    inflation_stream, appreciation_stream, vacancy_stream, interest_rate_stream = [
+        np.random.RandomState(stream_seed) for stream_seed in np.random.RandomState(seed).randint(0, 2**31 - 1, size=4)
+    ]
+
+    simulated_arrays = {key: np.empty((number_of_paths, max_year)) for key in SIMULATION_ARRAY_KEYS}
+    for start in range(0, number_of_paths, chunk_size):
+        shape = (min(chunk_size, number_of_paths - start), max_year)
+
+        # Sample the paths of the chunk.
+        inflation_rates = inflation_stream.normal(inflation_rate, inflation_rate_volatility, shape)
+        appreciation_rates = appreciation_stream.normal(appreciation_rate, appreciation_rate_volatility, shape)
+        vacancy_rates = np.clip(vacancy_stream.normal(vacancy_rate, vacancy_rate_volatility, shape), 0.0, 1.0)
+        interest_rate_changes = interest_rate_stream.normal(0.0, interest_rate_volatility, shape)
+        annual_interest_rates = np.maximum(float(mortgage_terms['annual_interest_rate']) + np.cumsum(interest_rate_changes, axis=-1), 0.0)
+
+        # Project the paths of the chunk.
+        annual_mortgage_payments, loan_balances = simulate_mortgage(
+            loan_amount, annual_interest_rates, payment_frequency,
+            compounding_period, mortgage_terms['amortization_year']
+        )
+        cash_flow_without_mortgage = annual_gross_income * (1.0 - vacancy_rates) - annual_expense
+        cash_flow_factors = np.cumprod(1.0 + inflation_rates, axis=-1)
+        cash_flow_adjustments = None
+        for growth_curve, (income_amount, expense_amount) in growth_curve_amounts.items():
+            adjustments = (income_amount * (1.0 - vacancy_rates) + expense_amount) * (growth_curve.get_factors(max_year) - cash_flow_factors)
+            cash_flow_adjustments = adjustments if cash_flow_adjustments is None else cash_flow_adjustments + adjustments
+        projection_arrays = compute_annual_projections(
+            purchase_price = purchase_price,
+            selling_fee_rate = selling_fee_rate,
+            initial_investment = initial_investment,
+            cash_flow_with_mortgage = cash_flow_without_mortgage - annual_mortgage_payments,
+            cash_flow_without_mortgage = cash_flow_without_mortgage,
+            loan_balances = loan_balances,
+            sales_price_factors = np.cumprod(1.0 + appreciation_rates, axis=-1),
+            cash_flow_factors = cash_flow_factors,
+            cash_flows_per_year = True,
+            cash_flow_adjustments = cash_flow_adjustments
+        )
+        for key in SIMULATION_ARRAY_KEYS:
+            simulated_arrays[key][start:start + shape[0]] = projection_arrays[key]
+
+    # Summarize the distributions of every year.
+    simulated_arrays['roi_rate'] = round_rates_half_up(simulated_arrays['roi_rate'])
+    results = {
+        'year': np.arange(1, max_year + 1),
+        'percentiles': np.asarray(percentiles, dtype=np.float64)
+    }
+    for key, values in simulated_arrays.items():
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # Years without any IRR.
+            results[key] = {
+                'mean': np.nanmean(values, axis=0),
+                'percentiles': np.nanpercentile(values, percentiles, axis=0)
+            }
+        if include_paths:
+            results[key]['paths'] = values
+    return results
@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+"""
+Versioned binary snapshots of the inputs of a "FinancialAnalyzer" and of the
+results of its "perform_analysis" function.
+
+Every snapshot is laid out as:
+
+    header      "<4sHHIIQ": magic, version, kind, array table length,
+                metadata length and snapshot length (padded to 8 bytes).
+    table       for every array: "<H" name length, the UTF-8 name, then
+                "<ccBIQ": value kind, dtype, number of dimensions (0 or 1),
+                length and offset from the start of the snapshot.
+    metadata    UTF-8 JSON of everything which is not an array (the inputs,
+                the line items and the structure of the results).
+    arrays      ``float64`` / ``int64`` little endian arrays, 8 byte aligned.
+
+The numbers of the results (the "mortgage" and "analysis" amounts and the
+columns of the "annual_projections" and of the mortgage schedule) are stored
+as arrays so they can be read without parsing the metadata; the "Money" and
+"Decimal" numbers are stored as ``float64`` so they come back with the
+precision of the "float64" numeric backend. The inputs are stored exactly.
+
+Snapshots can be appended to an archive file with "SnapshotWriter" and read
+back with "SnapshotReader", which memory-maps the archive so one array of
+every snapshot can be scanned without loading the rest.
+"""
+
+from __future__ import print_function
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import json
+import mmap
+import struct
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2.
+    from collections import Mapping
+from incomepropertyevaluatorkit.calculator.growth import *
+from incomepropertyevaluatorkit.calculator.lineitem import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+
+
+SNAPSHOT_MAGIC = b'IPEK'
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_KIND_ANALYZER = 1
+SNAPSHOT_KIND_RESULTS = 2
+
+SNAPSHOT_HEADER = struct.Struct('<4sHHIIQ')
+SNAPSHOT_ARRAY_NAME_LENGTH = struct.Struct('<H')
+SNAPSHOT_ARRAY_ENTRY = struct.Struct('<ccBIQ')
+
+# The kinds of values an array holds and the dtype it is stored with.
+SNAPSHOT_VALUE_KINDS = {
+    b'm': '<f8',  # Money
+    b'd': '<f8',  # Decimal
+    b'f': '<f8',  # float
+    b'i': '<i8',  # int
+    b't': '<i8',  # date, as its ordinal
+    b'T': '<i8',  # datetime (naive), as microseconds since the epoch
+}
+
+SNAPSHOT_EPOCH = datetime(1970, 1, 1)
+SNAPSHOT_MICROSECOND = timedelta(microseconds=1)
+
+# The attributes of a "FinancialAnalyzer" saved with its line items and
+# mortgage terms.
+SNAPSHOT_ANALYZER_KEYS = (
+    'purchase_price', 'inflation_rate', 'selling_fee_rate', 'buying_fee_rate',
+    'projection_engine', 'loan_balance_method', 'max_year', 'numeric_backend',
+    'verify_numeric_backend'
+)
+
+# The line item collections of a "FinancialAnalyzer": the key of the results
+# dictionary, the attribute and the "add_*" function.
+SNAPSHOT_LINE_ITEM_COLLECTIONS = (
+    ('rental_incomes', '_rental_income_dict', 'add_rental_income'),
+    ('facility_incomes', '_facility_income_dict', 'add_facility_income'),
+    ('expenses', '_expense_dict', 'add_expense'),
+    ('commercial_incomes', '_commercial_income_dict', 'add_commercial_income'),
+    ('purchase_fees', '_fee_dict', 'add_purchase_fee'),
+    ('capital_improvements', '_capital_improvements_dict', 'add_capital_improvement'),
+)
+
+
+def encode_value(value):
+    """
+    Function will convert a value of the inputs into JSON, see
+    "decode_value".
+    """
+    if isinstance(value, Money):
+        return {'money': str(value.amount), 'currency': value.currency.code}
+    if isinstance(value, Decimal):
+        return {'decimal': str(value)}
+    if isinstance(value, GrowthCurve):
+        return {
+            'growth_curve': [str(rate) for rate in value.rates],
+            'step_ups': [[year, str(rate)] for year, rate in value.step_ups]
+        }
+    if isinstance(value, (date, datetime)):
+        return {'date': value.isoformat()}
+    assert value is None or isinstance(value, (bool, int, float, str)), 'value is not supported: %r' % value
+    return value
+
+
+def decode_value(value):
+    if not isinstance(value, dict):
+        return value
+    if 'money' in value:
+        return Money(amount=Decimal(value['money']), currency=value['currency'])
+    if 'decimal' in value:
+        return Decimal(value['decimal'])
+    if 'growth_curve' in value:
+        return GrowthCurve(
+            [Decimal(rate) for rate in value['growth_curve']],
+            {year: Decimal(rate) for year, rate in value['step_ups']}
+        )
+    assert 'date' in value, 'value encoding is not supported: %r' % value
+    if '.' in value['date']:
+        return datetime.strptime(value['date'], '%Y-%m-%dT%H:%M:%S.%f')
+    if 'T' in value['date']:
+        return datetime.strptime(value['date'], '%Y-%m-%dT%H:%M:%S')
+    return datetime.strptime(value['date'], '%Y-%m-%d').date()
+
+
+def get_value_kind(value):
+    if isinstance(value, Money):
+        return b'm'
+    if isinstance(value, Decimal):
+        return b'd'
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, np.integer)):
+        return b'i'
+    if isinstance(value, (float, np.floating)):
+        return b'f'
+    if isinstance(value, datetime):
+        return b'T' if value.tzinfo is None else None
+    if isinstance(value, date):
+        return b't'
+    return None
+
+
+def to_number(value, value_kind):
+    if value_kind == b'm':
+        return float(value.amount)
+    if value_kind == b't':
+        return value.toordinal()
+    if value_kind == b'T':
+        return (value - SNAPSHOT_EPOCH) // SNAPSHOT_MICROSECOND
+    return value
+
+
+def from_number(number, value_kind, currency):
+    if value_kind == b'm':
+        return Money(amount=Decimal(repr(float(number))), currency=currency)
+    if value_kind == b'd':
+        return Decimal(repr(float(number)))
+    if value_kind == b'f':
+        return float(number)
+    if value_kind == b't':
+        return date.fromordinal(int(number))
+    if value_kind == b'T':
+        return SNAPSHOT_EPOCH + timedelta(microseconds=int(number))
+    return int(number)
+
+
+def pack_snapshot(kind, metadata, arrays):
+    """
+    Function will return the bytes of a snapshot of the ``metadata`` (JSON)
+    and the ``arrays``, a list of "(name, value_kind, array)".
+    """
+    names = [name.encode('utf-8') for name, value_kind, array in arrays]
+    metadata = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+    table_length = sum(SNAPSHOT_ARRAY_NAME_LENGTH.size + len(name) + SNAPSHOT_ARRAY_ENTRY.size for name in names)
+
+    # The arrays start and the snapshot ends on an 8 byte boundary.
+    start = SNAPSHOT_HEADER.size + table_length + len(metadata)
+    padding = -start % 8
+    offset = start + padding
+    table = []
+    data = []
+    for name, (_, value_kind, array) in zip(names, arrays):
+        data.append(np.ascontiguousarray(array, dtype=SNAPSHOT_VALUE_KINDS[value_kind]).tobytes())
+        table.append(SNAPSHOT_ARRAY_NAME_LENGTH.pack(len(name)) + name)
+        table.append(SNAPSHOT_ARRAY_ENTRY.pack(value_kind, SNAPSHOT_VALUE_KINDS[value_kind][-2:-1].encode('ascii'), array.ndim, array.size, offset))
+        offset += len(data[-1])
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind, table_length, len(metadata), offset)
+    return b''.join([header] + table + [metadata, b'\0' * padding] + data)
+
+
+def unpack_snapshot_header(buffer, offset=0):
+    """
+    Function will return the "(kind, table_length, metadata_length, length)"
+    of the snapshot at ``offset`` in ``buffer``.
+    """
+    magic, version, kind, table_length, metadata_length, length = SNAPSHOT_HEADER.unpack_from(buffer, offset)
+    assert magic == SNAPSHOT_MAGIC, 'buffer is not a snapshot: %r' % magic
+    assert version <= SNAPSHOT_VERSION, 'snapshot version is not supported: %r' % version
+    return kind, table_length, metadata_length, length
+
+
+def unpack_snapshot_entries(buffer, offset=0, table_length=None):
+    """
+    Function will return the dictionary of the "(value_kind, ndim, size,
+    array_offset)" of every array of the snapshot at ``offset`` in
+    ``buffer``, where the array offset is from the start of the snapshot.
+    """
+    if table_length is None:
+        table_length = unpack_snapshot_header(buffer, offset)[1]
+    entries = {}
+    position = offset + SNAPSHOT_HEADER.size
+    end = position + table_length
+    while position < end:
+        name_length = SNAPSHOT_ARRAY_NAME_LENGTH.unpack_from(buffer, position)[0]
+        position += SNAPSHOT_ARRAY_NAME_LENGTH.size
+        name = bytes(buffer[position:position + name_length]).decode('utf-8')
+        position += name_length
+        value_kind, dtype, ndim, size, array_offset = SNAPSHOT_ARRAY_ENTRY.unpack_from(buffer, position)
+        position += SNAPSHOT_ARRAY_ENTRY.size
+        entries[name] = (value_kind, ndim, size, array_offset)
+    return entries
+
+
+def get_snapshot_array(buffer, offset, entry):
+    value_kind, ndim, size, array_offset = entry
+    array = np.frombuffer(buffer, dtype=SNAPSHOT_VALUE_KINDS[value_kind], count=size, offset=offset + array_offset)
+    return array if ndim else array.reshape(())
+
+
+def unpack_snapshot_table(buffer, offset=0, table_length=None):
+    """
+    Function will return the dictionary of the "(value_kind, array)" of
+    every array of the snapshot at ``offset`` in ``buffer``; the arrays are
+    views of ``buffer``, nothing else is read.
+    """
+    return {
+        name: (entry[0], get_snapshot_array(buffer, offset, entry))
+        for name, entry in unpack_snapshot_entries(buffer, offset, table_length).items()
+    }
+
+
+def unpack_snapshot(buffer, offset=0):
+    """
+    Function will return the "(kind, metadata, arrays)" of the snapshot at
+    ``offset`` in ``buffer``, see "unpack_snapshot_table".
+    """
+    kind, table_length, metadata_length, length = unpack_snapshot_header(buffer, offset)
+    start = offset + SNAPSHOT_HEADER.size + table_length
+    metadata = json.loads(bytes(buffer[start:start + metadata_length]).decode('utf-8'))
+    return kind, metadata, unpack_snapshot_table(buffer, offset, table_length)
+
+
+def dump_line_items(collection):
+    return [
+        {key: encode_value(value) for key, value in line_item.items()}
+        for line_item in collection.values()
+    ]
+
+
+def dump_analyzer(analyzer):
+    """
+    Function will return the snapshot of the inputs of the ``analyzer``.
+    """
+    mortgage_terms = None
+    if analyzer._mortgage_terms is not None:
+        mortgage_terms = {key: encode_value(value) for key, value in analyzer._mortgage_terms.items()}
+    metadata = {
+        'currency': analyzer._currency,
+        'inputs': {key: encode_value(getattr(analyzer, '_' + key)) for key in SNAPSHOT_ANALYZER_KEYS},
+        'mortgage_terms': mortgage_terms,
+        'line_items': {
+            key: dump_line_items(getattr(analyzer, attribute))
+            for key, attribute, add_function in SNAPSHOT_LINE_ITEM_COLLECTIONS
+        }
+    }
+    return pack_snapshot(SNAPSHOT_KIND_ANALYZER, metadata, [])
+
+
+def create_analyzer_from_metadata(metadata):
+    analyzer = FinancialAnalyzer(metadata['currency'])
+    inputs = {key: decode_value(value) for key, value in metadata['inputs'].items()}
+    if 'numeric_backend' in inputs or 'verify_numeric_backend' in inputs:
+        analyzer.set_numeric_backend(inputs.pop('numeric_backend', None), inputs.pop('verify_numeric_backend', False))
+    analyzer.apply_changes(inputs)
+    if metadata['mortgage_terms'] is not None:
+        analyzer.set_mortgage(**{
+            key: decode_value(value) for key, value in metadata['mortgage_terms'].items()
+        })
+    for key, attribute, add_function in SNAPSHOT_LINE_ITEM_COLLECTIONS:
+        for fields in metadata['line_items'].get(key, ()):
+            getattr(analyzer, add_function)(**{
+                field: decode_value(value) for field, value in fields.items()
+            })
+    return analyzer
+
+
+def load_analyzer(buffer, offset=0):
+    """
+    Function will return a new "FinancialAnalyzer" with the inputs of the
+    snapshot at ``offset`` in ``buffer``.
+    """
+    kind, metadata, arrays = unpack_snapshot(buffer, offset)
+    assert kind == SNAPSHOT_KIND_ANALYZER, 'snapshot is not of an analyzer: %r' % kind
+    return create_analyzer_from_metadata(metadata)
+
+
+def dump_result_values(values, path, arrays):
+    """
+    Function will append the numbers in the ``values`` dictionary to
+    ``arrays`` (the lists of dictionaries, like the "annual_projections",
+    are stored one array per key) and return the structure to save in the
+    metadata.
+    """
+    structure = {}
+    for key, value in values.items():
+        name = path + key
+        value_kind = get_value_kind(value)
+        if value_kind is not None:
+            arrays.append((name, value_kind, np.asarray(to_number(value, value_kind))))
+            structure[key] = {'array': name}
+        elif isinstance(value, dict):
+            structure[key] = {'values': dump_result_values(value, name + '/', arrays)}
+        elif isinstance(value, (list, tuple)):
+            keys = list(value[0].keys()) if value else []
+            for column_key in keys:
+                column_kind = get_value_kind(value[0][column_key])
+                assert column_kind is not None, '%s/%s is not a column of numbers: %r' % (name, column_key, value[0][column_key])
+                column = [to_number(row[column_key], column_kind) for row in value]
+                arrays.append((name + '/' + column_key, column_kind, np.asarray(column)))
+            structure[key] = {'rows': len(value), 'keys': keys}
+        else:
+            structure[key] = {'value': encode_value(value)}
+    return structure
+
+
+def load_result_values(structure, path, arrays, currency):
+    values = {}
+    for key, value in structure.items():
+        name = path + key
+        if 'array' in value:
+            value_kind, array = arrays[value['array']]
+            values[key] = from_number(array[()], value_kind, currency)
+        elif 'values' in value:
+            values[key] = load_result_values(value['values'], name + '/', arrays, currency)
+        elif 'rows' in value:
+            columns = []
+            for column_key in value['keys']:
+                value_kind, array = arrays[name + '/' + column_key]
+                columns.append([from_number(number, value_kind, currency) for number in array.tolist()])
+            values[key] = [dict(zip(value['keys'], row)) for row in zip(*columns)]
+        else:
+            values[key] = decode_value(value['value'])
+    return values
+
+
+def dump_results(results):
+    """
+    Function will return the snapshot of the ``results`` returned by the
+    "FinancialAnalyzer.perform_analysis" function; see the module for what
+    is stored as arrays.
+    """
+    arrays = []
+    metadata = {
+        'currency': results['purchase_price'].currency.code,
+        'inputs': {
+            key: encode_value(results[key])
+            for key in ('purchase_price', 'inflation_rate', 'selling_fee_rate', 'buying_fee_rate')
+        },
+        'line_items': {
+            key: dump_line_items(results[key])
+            for key, attribute, add_function in SNAPSHOT_LINE_ITEM_COLLECTIONS
+        },
+        'results': dump_result_values({
+            key: results[key] for key in ('mortgage', 'analysis', 'annual_projections')
+        }, '', arrays)
+    }
+    return pack_snapshot(SNAPSHOT_KIND_RESULTS, metadata, arrays)
+
+
+def load_results(buffer, offset=0):
+    """
+    Function will return the results dictionary of the snapshot at
+    ``offset`` in ``buffer``.
+    """
+    kind, metadata, arrays = unpack_snapshot(buffer, offset)
+    assert kind == SNAPSHOT_KIND_RESULTS, 'snapshot is not of results: %r' % kind
+    currency = metadata['currency']
+
+    # The line items are rebuilt with an analyzer so they are stored the
+    # same way as in the original results.
+    analyzer = create_analyzer_from_metadata({
+        'currency': currency,
+        'inputs': {},
+        'mortgage_terms': None,
+        'line_items': metadata['line_items']
+    })
+    results = {key: decode_value(value) for key, value in metadata['inputs'].items()}
+    for key, attribute, add_function in SNAPSHOT_LINE_ITEM_COLLECTIONS:
+        results[key] = getattr(analyzer, attribute)
+    results.update(load_result_values(metadata['results'], '', arrays, currency))
+    if results['mortgage'].get('schedule') is not None:
+        results['mortgage']['schedule'] = tuple(results['mortgage']['schedule'])
+    return results
+
+
+def load_snapshot(buffer, offset=0):
+    """
+    Function will return the analyzer or the results of the snapshot at
+    ``offset`` in ``buffer``.
+    """
+    if unpack_snapshot_header(buffer, offset)[0] == SNAPSHOT_KIND_ANALYZER:
+        return load_analyzer(buffer, offset)
+    return load_results(buffer, offset)
+
+
+class SnapshotWriter:
+    """
+    Class will append snapshots to an archive, a binary ``file_object``
+    (opened with "wb" or "ab") the snapshots are written one after the
+    other to.
+    """
+
+    def __init__(self, file_object):
+        self._file_object = file_object
+
+    def write(self, snapshot):
+        assert len(snapshot) % 8 == 0, 'snapshot is not padded'
+        self._file_object.write(snapshot)
+
+    def write_analyzer(self, analyzer):
+        self.write(dump_analyzer(analyzer))
+
+    def write_results(self, results):
+        self.write(dump_results(results))
+
+
+class SnapshotReader:
+    """
+    Class will memory-map the archive at ``path`` and give access to its
+    snapshots by index. The arrays returned by "iter_arrays" are views of
+    the archive which are valid until the reader gets closed.
+    """
+
+    def __init__(self, path):
+        self._file_object = open(path, 'rb')
+        self._buffer = b''
+        self._offsets = []
+        try:
+            self._buffer = mmap.mmap(self._file_object.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty archive.
+            pass
+        offset = 0
+        while offset < len(self._buffer):
+            self._offsets.append(offset)
+            offset += unpack_snapshot_header(self._buffer, offset)[3]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        return load_snapshot(self._buffer, self._offsets[index])
+
+    def __iter__(self):
+        for offset in self._offsets:
+            yield load_snapshot(self._buffer, offset)
+
+    def iter_arrays(self, name):
+        """
+        Function will yield the array ``name`` (ex: "analysis/annual_cash_flow"
+        or "annual_projections/roi_rate") of every snapshot which has it, as
+        numbers; only the array tables of the snapshots are read and the
+        snapshots with the same layout as the previous one are not even
+        parsed.
+        """
+        layout = None
+        entry = None
+        for offset in self._offsets:
+            table_length = unpack_snapshot_header(self._buffer, offset)[1]
+            start = offset + SNAPSHOT_HEADER.size
+            table = self._buffer[start:start + table_length]
+            if table != layout:
+                layout = table
+                entry = unpack_snapshot_entries(self._buffer, offset, table_length).get(name)
+            if entry is not None:
+                yield get_snapshot_array(self._buffer, offset, entry)
+
+    def get_column(self, name):
+        """
+        Function will return the array ``name`` of every snapshot which has
+        it stacked into one array, the first axis is the snapshot.
+        """
+        if not self._offsets:
+            return np.empty(0)
+        return np.stack(list(self.iter_arrays(name)))
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file_object.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -6,7 +6,122 @@ Constants for the 'incomepropertyevaluatorkit' python library.
 MAX_YEAR = 30
 
 
+# The following are the engines used to compute the annual projections.
+#
+
+PROJECTION_ENGINE_SCALAR = "scalar"         # Year by year with "Money".
+PROJECTION_ENGINE_VECTORIZED = "vectorized" # All years at once with "numpy".
+
+
+# The following are the numeric types the analyzer can use to compute the
+# annual projections: "Money" and "Decimal" objects (the reference), "float64"
+# arrays or "int64" arrays of whole cents (see "calculator/backend.py").
+#
+
+NUMERIC_BACKEND_DECIMAL = "decimal"
+NUMERIC_BACKEND_FLOAT64 = "float64"
+NUMERIC_BACKEND_INT64_CENTS = "int64_cents"
+NUMERIC_BACKENDS = (NUMERIC_BACKEND_DECIMAL, NUMERIC_BACKEND_FLOAT64, NUMERIC_BACKEND_INT64_CENTS)
+
+
+# The following are the number of payment periods in one month per payment
+# frequency as used by the "mortgagekit" library to compute the monthly
+# mortgage payment.
+#
+
+MONTHLY_PAYMENT_MULTIPLIERS = {
+    1: 1.0 / 12.0,    # Annual
+    2: 1.0 / 6.0,     # Semi-annual
+    4: 1.0 / 4.0,     # Quarterly
+    6: 1.0 / 2.0,     # Bi-monthly
+    12: 1.0,          # Monthly
+    26: 26.0 / 12.0,  # Bi-weekly
+    52: 52.0 / 12.0,  # Weekly
+}
+
+
+# The methods the analyzer can use to find the loan balance at the end of
+# every year: look it up in the payment schedule or compute it directly with
+# the amortization formula.
+#
+
+LOAN_BALANCE_METHOD_SCHEDULE = "schedule"
+LOAN_BALANCE_METHOD_CLOSED_FORM = "closed_form"
+
+
+# The results the analyzer can goal seek (see "FinancialAnalyzer.goal_seek_*"),
+# and the default search range around the current value.
+#
+
+GOAL_SEEK_METRICS = (
+    'cap_rate_with_mortgage',
+    'cap_rate_without_mortgage',
+    'roi_rate',
+    'annualized_roi_rate',
+)
+GOAL_SEEK_LOWER_BOUND_FACTOR = 0.1
+GOAL_SEEK_UPPER_BOUND_FACTOR = 10.0
+
+
+# The number of properties the batch analyzer computes at the same time; this
+# bounds the memory used by the "(properties, years, years)" IRR arrays.
+#
+
+BATCH_CHUNK_SIZE = 1024
+
+
+# The number of paths the Monte Carlo simulation computes at the same time and
+# the percentiles of the simulated distributions it reports by default.
+#
+
+SIMULATION_CHUNK_SIZE = 4096
+SIMULATION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# The number of properties sent to a worker process at a time when running
+# analyses in parallel, and the number of chunks per worker submitted ahead
+# so the results do not pile up in memory.
+#
+
+PARALLEL_CHUNK_SIZE = 16
+PARALLEL_CHUNKS_PER_WORKER = 2
+
+
+# The maximum number of mortgage payment schedules kept by the process-wide
+# schedule cache before the least recently used schedule gets discarded.
+#
+
+MORTGAGE_SCHEDULE_CACHE_SIZE = 128
+
+
+# The file formats the annual projections and mortgage schedules can be
+# exported to and the number of rows buffered before they get written.
+#
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NPZ = "npz"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_BUFFER_SIZE = 65536
+
+
 # The following are used by the PDF code.
 #
 
 PDF_EVALUATOR_DOCUMENT_ID = "evaluator"
+
+
+# The number of documents sent to a worker process at a time when generating
+# PDF documents in parallel, and the number of chunks per worker submitted
+# ahead so the generated documents do not pile up in memory.
+#
+
+PDF_PARALLEL_CHUNK_SIZE = 4
+PDF_PARALLEL_CHUNKS_PER_WORKER = 2
+
+
+# The number of analyses and PDF documents run at the same time by the asyncio
+# front-end and the size of the chunks the PDF documents are streamed in.
+#
+
+ASYNC_MAX_CONCURRENCY = 4
+ASYNC_PDF_CHUNK_SIZE = 65536
@@ -5,11 +5,30 @@ Utility functions for the 'incomepropertyevaluatorkit' python library.
 
 from decimal import Decimal
 import decimal
+import math
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
 from moneyed import Money # Third party library for "Money" datatype.
 
 
 MONTHS_IN_YEAR = 12
 RATE_QUANTIZE = decimal.Decimal('.0001')
+CENTS_QUANTIZE = decimal.Decimal('.01')
+IRR_GUESS = 0.1
+IRR_TOLERANCE = 1e-10
+IRR_MAX_ITERATIONS = 50
+IRR_MAX_BISECTIONS = 200
+IRR_BRACKET_RATES = np.concatenate((
+    -np.geomspace(0.9999, 0.99, 20, endpoint=False),
+    np.linspace(-0.99, -0.1, 90, endpoint=False),
+    np.linspace(-0.1, 1.0, 111, endpoint=False),
+    np.geomspace(1.0, 1000.0, 60)
+))
+GOAL_SEEK_TOLERANCE = 1e-6
+GOAL_SEEK_MAX_ITERATIONS = 100
+TEMPLATE_PLACEHOLDER_PATTERN = re.compile(r"\{\{.*?\}\}")
 
 
 def rate_decimal(f, round=decimal.ROUND_HALF_UP):
@@ -55,6 +74,214 @@ def return_on_investment(initial_investment_amount, total_return_amount):
     return rate_decimal(roi)
 
 
+def internal_rate_of_return(values, guess=IRR_GUESS,
+                            max_iterations=IRR_MAX_ITERATIONS,
+                            tolerance=IRR_TOLERANCE):
+    """
+    Function will return the "internal rate of return" (IRR) of the cash flow
+    ``values`` where the first item is the (negative) initial investment, or
+    ``numpy.nan`` if there is none; ``guess`` is the warm start (ex: the
+    previous year's IRR).
+    """
+    values = [float(value) for value in values]
+
+    # Descartes' rule of signs: a single sign change in the cash flows means
+    # there is exactly one IRR so whichever root Newton's method finds is it.
+    signs = [value > 0.0 for value in values if value != 0.0]
+    sign_changes = sum(1 for a, b in zip(signs, signs[1:]) if a != b)
+
+    # STEP 1: Newton's method from the warm start on the polynomial
+    #         "sum(values[t] * x**t)" where "x = 1 / (1 + rate)", the same
+    #         polynomial the removed "numpy.irr" used to factor; it agrees
+    #         with "numpy.irr" to within "tolerance" when there is one IRR.
+    if sign_changes == 1 and guess is not None and -1.0 < guess < math.inf:
+        rate = guess
+        for iteration in range(max_iterations):
+            # Evaluate the polynomial and its derivative with Horner's method.
+            x = 1.0 / (1.0 + rate)
+            npv, slope = 0.0, 0.0
+            for value in reversed(values):
+                slope = slope * x + npv
+                npv = npv * x + value
+            if slope == 0.0:
+                break
+            x = x - npv / slope
+            if not 0.0 < x < math.inf:
+                break
+            next_rate = 1.0 / x - 1.0
+            if abs(next_rate - rate) < tolerance:
+                return next_rate
+            rate = next_rate
+
+    # STEP 2: If Newton's method did not converge, or the cash flows change
+    #         sign more than once (so there may be many roots), bisect the
+    #         sign change of the "IRR_BRACKET_RATES" grid closest to a zero
+    #         rate.
+    coefficients = values[::-1]
+    grid = 1.0 / (1.0 + IRR_BRACKET_RATES)
+    npv = np.polyval(coefficients, grid)
+    exact = np.flatnonzero(npv == 0.0)
+    changes = np.flatnonzero(np.sign(npv[:-1]) * np.sign(npv[1:]) < 0)
+    if len(changes) == 0:
+        if len(exact) == 0:
+            return np.nan  # STEP 3: No sign change, no IRR exists (like "numpy.irr").
+        return float(IRR_BRACKET_RATES[exact[np.argmin(np.abs(IRR_BRACKET_RATES[exact]))]])
+
+    index = changes[np.argmin(np.abs(IRR_BRACKET_RATES[changes]))]
+    low, high = float(grid[index + 1]), float(grid[index])  # "x" decreases as rates grow.
+    low_is_positive = npv[index + 1] > 0.0
+    for iteration in range(IRR_MAX_BISECTIONS):
+        if 1.0 / low - 1.0 / high <= tolerance:
+            break
+        middle = (low + high) / 2.0
+        if middle == low or middle == high:
+            break  # Defensive Code: Floating point resolution reached.
+        middle_npv = float(np.polyval(coefficients, middle))
+        if middle_npv == 0.0:
+            return 1.0 / middle - 1.0
+        if (middle_npv > 0.0) == low_is_positive:
+            low = middle
+        else:
+            high = middle
+    return 1.0 / ((low + high) / 2.0) - 1.0
+
+
+def round_half_up(values):
+    """
+    Function will round ``values`` to whole numbers with the same rule as
+    "decimal.ROUND_HALF_UP" (halves are rounded away from zero) and return
+    them as an ``int64`` array.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+
+
+def round_rates_half_up(values):
+    """
+    Function will round the rates in ``values`` to 4 decimal places with the
+    same rule as "rate_decimal" (halves are rounded away from zero) and
+    return them as a ``float64`` array; "nan" and infinite rates are kept.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    # Drop the error of the scaling (ex: "0.00125 * 1e4" is not exactly
+    # "12.5") so halves are found the same as in the decimal representation.
+    with np.errstate(invalid='ignore'):
+        scaled = np.round(values * 1e4, 6)
+        rounded = np.sign(scaled) * np.floor(np.abs(scaled) + 0.5) / 1e4
+    return np.where(np.isfinite(values), rounded, values)
+
+
+def to_cents(amount):
+    """
+    Function will convert the "Money" or "Decimal" ``amount`` into whole
+    cents, rounding with "decimal.ROUND_HALF_UP".
+    """
+    amount = getattr(amount, 'amount', amount)
+    return int(Decimal(amount).quantize(CENTS_QUANTIZE, rounding=decimal.ROUND_HALF_UP).scaleb(2))
+
+
+def cents_to_decimal(cents):
+    """
+    Function will convert whole ``cents`` into the exact "Decimal" amount.
+    """
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def iter_chunks_in_parallel(executor, chunk_function, items, chunksize,
+                            chunks_per_worker, max_workers=None, *args):
+    """
+    Function will split ``items`` into chunks of ``(index, item)`` pairs,
+    submit ``chunk_function(chunk, *args)`` for every chunk to the
+    ``executor`` and yield the ``(index, result)`` pairs it returns as soon
+    as each chunk has completed.
+
+    Only ``chunks_per_worker`` chunks per worker are submitted ahead of the
+    completed ones so the ``items`` can be a long generator.
+    """
+    max_pending = chunks_per_worker * (max_workers or os.cpu_count() or 1)
+    pending = set()
+
+    def wait_for_chunks():
+        done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+        pending.intersection_update(not_done)
+        return [pair for future in done for pair in future.result()]
+
+    # Split the items into chunks and submit every chunk to our pool.
+    chunk = []
+    for index, item in enumerate(items):
+        chunk.append((index, item))
+        if len(chunk) < chunksize:
+            continue
+        pending.add(executor.submit(chunk_function, chunk, *args))
+        chunk = []
+        if len(pending) >= max_pending:
+            for pair in wait_for_chunks():
+                yield pair
+    if chunk:
+        pending.add(executor.submit(chunk_function, chunk, *args))
+
+    # Stream the remaining results as the chunks complete.
+    while pending:
+        for pair in wait_for_chunks():
+            yield pair
+
+
+def goal_seek(function, target, lower_bound, upper_bound,
+              tolerance=GOAL_SEEK_TOLERANCE,
+              max_iterations=GOAL_SEEK_MAX_ITERATIONS):
+    """
+    Function will return the value between ``lower_bound`` and
+    ``upper_bound`` at which ``function(value)`` equals ``target``, to within
+    ``tolerance`` of the value, or "None" if the function does not cross the
+    target between the bounds.
+
+    The solve is done with the "Illinois" variant of the false position
+    method: secant steps, which converge in one step for linear functions,
+    that always keep the solution bracketed.
+    """
+    low, high = float(lower_bound), float(upper_bound)
+    low_error = float(function(low)) - target
+    high_error = float(function(high)) - target
+    if not (np.isfinite(low_error) and np.isfinite(high_error)):
+        return None
+    if low_error == 0.0:
+        return low
+    if high_error == 0.0:
+        return high
+    if (low_error > 0.0) == (high_error > 0.0):
+        return None
+
+    side = 0
+    previous_middle = None
+    for iteration in range(max_iterations):
+        middle = (low * high_error - high * low_error) / (high_error - low_error)
+        middle_error = float(function(middle)) - target
+        if not np.isfinite(middle_error):
+            # Defensive Code: Fall back to bisection.
+            middle = (low + high) / 2.0
+            middle_error = float(function(middle)) - target
+            if not np.isfinite(middle_error):
+                return None
+        if middle_error == 0.0:
+            return middle
+        if previous_middle is not None and abs(middle - previous_middle) <= tolerance:
+            return middle
+        previous_middle = middle
+        if (middle_error > 0.0) == (high_error > 0.0):
+            high, high_error = middle, middle_error
+            if side == -1:
+                low_error /= 2.0
+            side = -1
+        else:
+            low, low_error = middle, middle_error
+            if side == 1:
+                high_error /= 2.0
+            side = 1
+        if abs(high - low) <= tolerance:
+            break
+    return (low + high) / 2.0
+
+
 def replace_all(text, dic):
     """
     https://stackoverflow.com/a/6117042
@@ -62,3 +289,35 @@ def replace_all(text, dic):
     for i, j in dic.items():
         text = text.replace(i, j)
     return text
+
+
+def compile_template(text, pattern=TEMPLATE_PLACEHOLDER_PATTERN):
+    """
+    Function will split the ``text`` around its placeholders (the matches of
+    the ``pattern``, by default "{{ name }}") and return the "(literals,
+    placeholders)" tuple, where "literals" has one more item than
+    "placeholders", for the "render_template" function.
+    """
+    literals = []
+    placeholders = []
+    start = 0
+    for match in pattern.finditer(text):
+        literals.append(text[start:match.start()])
+        placeholders.append(match.group(0))
+        start = match.end()
+    literals.append(text[start:])
+    return tuple(literals), tuple(placeholders)
+
+
+def render_template(template, dic):
+    """
+    Function will return the text of the ``template`` (see
+    "compile_template") with its placeholders replaced by their values in
+    ``dic`` in a single pass; the placeholders not in ``dic`` are kept.
+    """
+    literals, placeholders = template
+    parts = [literals[0]]
+    for placeholder, literal in zip(placeholders, literals[1:]):
+        parts.append(dic.get(placeholder, placeholder))
+        parts.append(literal)
+    return "".join(parts)
@@ -16,14 +16,17 @@ library.
 
 def set_evaluator_content(html_content, doc_content):
     """
-    Function will take the "evaluator" content and replace all the
-    placeholders with the user inputted content.
+    Function will take the "evaluator" content, the HTML text or its compiled
+    template (see "compile_template"), and replace all the placeholders with
+    the user inputted content.
     """
     # Validate format.
     assert doc_content['id'] == PDF_EVALUATOR_DOCUMENT_ID
 
     # Handle text placeholders here.
-    html_content = replace_all(html_content, doc_content['text_placeholders'])
+    if isinstance(html_content, str):
+        html_content = compile_template(html_content)
+    html_content = render_template(html_content, doc_content['text_placeholders'])
 
     #TODO: IMPLEMENT DOCUMENT CREATION CODE HERE!
 
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Functions for generating many PDF documents with "PDFDocGen" across a pool of
+processes. Every worker process is warmed up once when it starts (see
+"warm_up_pdf_worker"): the HTML template is compiled and "xhtml2pdf" and
+"reportlab" are imported and initialized, so only the rendering itself is
+done per document. Keep the executor of "create_pdf_executor" to reuse the
+warm workers across batches.
+
+The documents are written into a directory or returned as bytes.
+"""
+
+from __future__ import print_function
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from xhtml2pdf import pisa
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import iter_chunks_in_parallel
+from incomepropertyevaluatorkit.pdf.pdfdocgen import *
+
+
+def warm_up_pdf_worker(doc_id=PDF_EVALUATOR_DOCUMENT_ID):
+    """
+    Function will compile the HTML template of the ``doc_id`` document and
+    render a blank document so the next documents rendered by this process
+    do not pay for the initialization of "xhtml2pdf" and "reportlab".
+    """
+    get_compiled_html_template(doc_id)
+    enable_pdf_logging()
+    pisa.CreatePDF("<html><body><p></p></body></html>", dest=io.BytesIO())
+
+
+def create_pdf_executor(max_workers=None, doc_id=PDF_EVALUATOR_DOCUMENT_ID):
+    """
+    Function will return a pool of processes which are warmed up for the
+    ``doc_id`` document, see "warm_up_pdf_worker".
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, initializer=warm_up_pdf_worker, initargs=(doc_id,))
+
+
+def get_pdf_filepath(directory, doc_id, index):
+    return os.path.join(directory, "%s_%d.pdf" % (doc_id, index))
+
+
+def generate_pdf_on_item(doc_content, filepath=None, doc_id=PDF_EVALUATOR_DOCUMENT_ID):
+    """
+    Function will generate the PDF document of the ``doc_content`` into
+    ``filepath`` and return it, or return its bytes if "None".
+    """
+    pdf_docgen = PDFDocGen(doc_id)
+    pdf_docgen.set_doc_content(doc_content)
+    if filepath is None:
+        return pdf_docgen.generate()
+    pdf_docgen.generate(filepath)
+    return filepath
+
+
+def generate_pdf_on_chunk(chunk, directory=None, doc_id=PDF_EVALUATOR_DOCUMENT_ID):
+    """
+    Function will generate the PDF documents of a chunk of ``(index,
+    doc_content)`` pairs and return the ``(index, filepath or bytes)`` pairs.
+    """
+    return [
+        (index, generate_pdf_on_item(
+            doc_content,
+            None if directory is None else get_pdf_filepath(directory, doc_id, index),
+            doc_id
+        ))
+        for index, doc_content in chunk
+    ]
+
+
+def iter_pdfs_in_parallel(doc_contents, directory=None,
+                          doc_id=PDF_EVALUATOR_DOCUMENT_ID, max_workers=None,
+                          chunksize=PDF_PARALLEL_CHUNK_SIZE, executor=None):
+    """
+    Function will generate the PDF document of every ``doc_content`` in
+    ``doc_contents`` across a pool of processes and yield the ``(index,
+    result)`` pairs as soon as each chunk has completed, where ``index`` is
+    the position of the document in ``doc_contents``. The result is the
+    filepath of the document in ``directory`` (named by "get_pdf_filepath")
+    or its bytes if ``directory`` is "None".
+
+    Only a few chunks per worker are submitted ahead of the completed ones so
+    the ``doc_contents`` can be a long generator; pass ``max_workers`` with
+    an ``executor`` to size the chunks submitted ahead.
+    """
+    if executor is None:
+        with create_pdf_executor(max_workers, doc_id) as executor:
+            for pair in iter_pdfs_in_parallel(doc_contents, directory, doc_id, max_workers, chunksize, executor):
+                yield pair
+        return
+
+    for pair in iter_chunks_in_parallel(executor, generate_pdf_on_chunk, doc_contents, chunksize,
+                                        PDF_PARALLEL_CHUNKS_PER_WORKER, max_workers, directory, doc_id):
+        yield pair
+
+
+def generate_pdfs_in_parallel(doc_contents, directory=None,
+                              doc_id=PDF_EVALUATOR_DOCUMENT_ID, max_workers=None,
+                              chunksize=PDF_PARALLEL_CHUNK_SIZE, executor=None):
+    """
+    Function will generate the PDF document of every ``doc_content`` in
+    ``doc_contents`` across a pool of processes and return the list of
+    filepaths (or bytes if ``directory`` is "None") in the same order as the
+    inputs; see "iter_pdfs_in_parallel".
+    """
+    results = {}
+    for index, result in iter_pdfs_in_parallel(doc_contents, directory, doc_id, max_workers, chunksize, executor):
+        results[index] = result
+    return [results[index] for index in range(len(results))]
@@ -1,11 +1,65 @@
 # -*- coding: utf-8 -*-
+import io
 import os, sys
+from threading import Lock
 from xhtml2pdf import pisa
 from incomepropertyevaluatorkit.foundation.constants import *
 from incomepropertyevaluatorkit.foundation.utils import *
 from incomepropertyevaluatorkit.pdf.evaluatorfileformat import *
 
 
+# The compiled HTML templates (see "compile_template") of the documents keyed
+# by document ID, with the modification time of the file they were compiled
+# from; a template is only read and compiled again once its file changes.
+html_template_cache = {}
+html_template_cache_lock = Lock()
+
+
+def get_html_template_filepath(doc_id):
+    # Get the filepath of where THIS file is located and attach to the
+    # filepath the document name.
+    THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+    return THIS_DIR + "/html_document/" + doc_id + ".html"
+
+
+def get_compiled_html_template(doc_id):
+    """
+    Function will return the compiled HTML template of the ``doc_id``
+    document from the cache, or read and compile it if its file changed.
+    """
+    filepath = get_html_template_filepath(doc_id)
+    modification_time = os.stat(filepath).st_mtime_ns
+    with html_template_cache_lock:
+        cached = html_template_cache.get(doc_id)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+
+    # Attempt to open the document.
+    with open(filepath) as input_file_handle:
+        template = compile_template(input_file_handle.read())
+    with html_template_cache_lock:
+        html_template_cache[doc_id] = (modification_time, template)
+    return template
+
+
+def clear_html_template_cache():
+    with html_template_cache_lock:
+        html_template_cache.clear()
+
+
+# Whether the PDF generation logging was enabled, it only needs to be done
+# once per process.
+pdf_logging_lock = Lock()
+pdf_logging_enabled = [False]
+
+
+def enable_pdf_logging():
+    with pdf_logging_lock:
+        if not pdf_logging_enabled[0]:
+            pisa.showLogging()
+            pdf_logging_enabled[0] = True
+
+
 class PDFDocGen:
     """
     Class will take financial information about a rental property and
@@ -28,47 +82,62 @@ class PDFDocGen:
     def set_doc_content(self, doc_content):
         self._doc_content = doc_content
 
-    def generate(self, filepath):
+    def generate(self, filepath=None):
+        """
+        Function will generate the PDF document into ``filepath``, a path or
+        a writable binary stream (ex: an HTTP response), or return its bytes
+        if "None". A "RuntimeError" is raised if "xhtml2pdf" reports errors.
+        """
         # Load up the document from the file.
         self.init_html_content()
 
         # Set our variables.
         self.update_html_content()
 
+        # Generate our document in memory if there is no destination.
+        if filepath is None:
+            output_stream = io.BytesIO()
+            self.check_pdf_errors(self.convert_html_to_pdf(self._html_content, output_stream))
+            return output_stream.getvalue()
+
         # Generate our document locally.
-        self.convert_html_to_pdf(self._html_content, filepath)
+        self.check_pdf_errors(self.convert_html_to_pdf(self._html_content, filepath))
 
     #--------------------------------------------------------------------------#
     #                     P R I V A T E  F U N C T I O N S                     #
     #--------------------------------------------------------------------------#
 
     def init_html_content(self):
-        # Get the filepath of where THIS file is located and attach to the
-        # filepath the document name.
-        THIS_DIR = os.path.dirname(os.path.abspath(__file__))
-        filepath = THIS_DIR + "/html_document/" + self._doc_id + ".html"
-
-        # Attempt to open the document.
-        with open(filepath) as input_file_handle:
-            self._html_content = input_file_handle.read()
-
-        # sys.stderr.write( "[myScript] - Error: Could not open %s\n" % (inputFn) )
-        # sys.exit(-1)
+        # Load the compiled document from the cache (see
+        # "get_compiled_html_template").
+        self._html_content = get_compiled_html_template(self._doc_id)
 
     def update_html_content(self):
         """
         Function will go through the document text and replace all the
         placeholders with the user content.
         """
-        if self._doc_id is PDF_EVALUATOR_DOCUMENT_ID:
+        if self._doc_id == PDF_EVALUATOR_DOCUMENT_ID:
             self._html_content = set_evaluator_content(self._html_content, self._doc_content)
 
+    def check_pdf_errors(self, err):
+        if err:
+            raise RuntimeError('PDF document %r failed to generate with %d error(s)' % (self._doc_id, err))
+
     def convert_html_to_pdf(self, sourceHtml, outputFilename):
         """
         https://github.com/xhtml2pdf/xhtml2pdf/blob/master/doc/source/usage.rst
+
+        The ``outputFilename`` is a path or a writable binary stream, which is
+        left open.
         """
         # Enable PDF generation logging.
-        pisa.showLogging()
+        enable_pdf_logging()
+
+        # Write into the stream as is.
+        if hasattr(outputFilename, "write"):
+            pisaStatus = pisa.CreatePDF(sourceHtml, dest=outputFilename)
+            return pisaStatus.err
 
         # open output file for writing (truncated binary)
         resultFile = open(outputFilename, "w+b")
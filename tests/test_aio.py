@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import asyncio
+import json
+import os
+import threading
+import unittest
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from incomepropertyevaluatorkit.aio import *
+from tests.test_parallel import get_spec
+
+
+THIS_TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_SAMPLE_FILEPATH = THIS_TEST_DIR+"/"+"evaluator_sample.json"
+
+
+class TestAsyncEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_perform_analyses(self):
+        specs = [get_spec(price) for price in (200000, 250000, 300000)]
+
+        async def perform_analyses():
+            async with AsyncEvaluator(max_concurrency=2) as evaluator:
+                return await evaluator.perform_analyses(specs)
+
+        results = self.loop.run_until_complete(perform_analyses())
+        for spec, result in zip(specs, results):
+            expected = create_analyzer(spec).perform_analysis(include_schedule=False)
+            self.assertEqual(result['annual_projections'], expected['annual_projections'])
+
+    def test_iter_pdf_chunks(self):
+        with open(TEST_SAMPLE_FILEPATH) as input_file_handle:
+            doc_content = json.load(input_file_handle)
+
+        async def generate_pdf():
+            async with AsyncEvaluator(chunk_size=1000) as evaluator:
+                chunks = [chunk async for chunk in evaluator.iter_pdf_chunks(doc_content)]
+                return chunks, await evaluator.generate_pdf(doc_content)
+
+        chunks, pdf_bytes = self.loop.run_until_complete(generate_pdf())
+        self.assertTrue(all(len(chunk) == 1000 for chunk in chunks[:-1]))
+        self.assertEqual(len(b"".join(chunks)), len(pdf_bytes))
+        self.assertTrue(chunks[0].startswith(b"%PDF"))
+
+    def test_cancellation(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return 'blocked'
+
+        async def cancel():
+            evaluator = AsyncEvaluator(max_concurrency=1)
+            task = asyncio.ensure_future(evaluator.run(block))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            release.set()
+            # The slot was released for the next call.
+            result = await evaluator.run(lambda: 'next')
+            evaluator.close()
+            return result
+
+        self.assertEqual(self.loop.run_until_complete(cancel()), 'next')
+
+    def test_several_event_loops(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+            return 'blocked'
+
+        async def run_with_contention(evaluator):
+            # The second call waits on the semaphore of this loop.
+            first = asyncio.ensure_future(evaluator.run(block))
+            while not started.is_set():
+                await asyncio.sleep(0.001)
+            second = asyncio.ensure_future(evaluator.run(lambda: 'next'))
+            await asyncio.sleep(0.01)
+            release.set()
+            return await asyncio.gather(first, second)
+
+        evaluator = AsyncEvaluator(max_concurrency=1)
+        try:
+            for loop in (self.loop, asyncio.new_event_loop()):
+                started.clear()
+                release.clear()
+                self.assertEqual(loop.run_until_complete(run_with_contention(evaluator)), ['blocked', 'next'])
+                if loop is not self.loop:
+                    loop.close()
+        finally:
+            evaluator.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ from __future__ import print_function
 import unittest
 from datetime import datetime
 from decimal import Decimal
+import numpy as np
 from moneyed import Money # Third party library for "Money" datatype.
 from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
 from incomepropertyevaluatorkit.foundation.constants import *
@@ -424,6 +425,38 @@ class TestFinancialAnalyzer(unittest.TestCase):
         cap_rate = analyzer.get_cap_rate_with_mortgage_expense_excluded()
         self.assertIsNotNone(cap_rate)
 
+    def test_totals_cache(self):
+        analyzer = FinancialAnalyzer()  # Initialize object we will be testing.
+        analyzer.add_rental_income(1, Money(amount=1200, currency='USD'), Decimal(1), Money(amount=100, currency='USD'), 1, "Granny suite", Decimal(1))
+        analyzer.add_expense(1, Money(amount=120, currency='USD'), Decimal(1), Money(amount=10, currency='USD'), 1, "Netflix")
+
+        # Totals are computed once and then returned from the cache.
+        net_income_info = analyzer.get_net_income_without_mortgage()
+        self.assertEqual(net_income_info['annual'].amount, 1080)
+        self.assertIn('rental_income', analyzer._totals_cache)
+        self.assertIn('gross_income', analyzer._totals_cache)
+        self.assertIn('net_income_without_mortgage', analyzer._totals_cache)
+
+        # Modifying a returned dictionary does not modify the cache.
+        net_income_info['annual'] = Money(amount=0, currency='USD')
+        self.assertEqual(analyzer.get_net_income_without_mortgage()['annual'].amount, 1080)
+
+        # Mutators only invalidate the totals which depend on them.
+        analyzer.add_expense(2, Money(amount=60, currency='USD'), Decimal(1), Money(amount=5, currency='USD'), 1, "Music")
+        self.assertIn('rental_income', analyzer._totals_cache)
+        self.assertIn('gross_income', analyzer._totals_cache)
+        self.assertNotIn('net_income_without_mortgage', analyzer._totals_cache)
+        self.assertEqual(analyzer.get_net_income_without_mortgage()['annual'].amount, 1020)
+
+        analyzer.remove_rental_income(1)
+        self.assertNotIn('gross_income', analyzer._totals_cache)
+        self.assertEqual(analyzer.get_net_income_without_mortgage()['annual'].amount, -180)
+
+        analyzer.add_purchase_fee(1, "Legal Fees", Money(amount=1500, currency='USD'))
+        self.assertEqual(analyzer.get_total_initial_investment_amount().amount, 1500)
+        analyzer.add_capital_improvement(1, "Repaired Roof", Money(amount=500, currency='USD'))
+        self.assertEqual(analyzer.get_total_initial_investment_amount().amount, 2000)
+
     def test_run_analysis_1(self):
         """
         """
@@ -553,5 +586,131 @@ class TestFinancialAnalyzer(unittest.TestCase):
         self.assertIsNotNone(results['annual_projections'])
         #TODO: WRITE MORE CODE TO VERIFY THE ANNUAL PROJECTS.
 
+        # Verify 'annualized_roi_rate' against the "numpy.roots" approach the
+        # removed "numpy.irr" function used on the same cash flows.
+        cash_flows = [-results['analysis']['initial_investment_amount'].amount]
+        previous_cash_flow = results['analysis']['annual_cash_flow'].amount
+        for projection in results['annual_projections']:
+            values = cash_flows + [previous_cash_flow + projection['proceeds_of_sale'].amount]
+            roots = np.roots([float(value) for value in values[::-1]])
+            roots = roots[(roots.imag == 0) & (roots.real > 0)].real
+            rates = 1 / roots - 1
+            expected = rates[np.argmin(np.abs(rates))]
+            self.assertAlmostEqual(projection['annualized_roi_rate'], expected, 8)
+            cash_flows.append(previous_cash_flow)
+            previous_cash_flow = projection['cash_flow'].amount
+
+    def get_goal_seek_analyzer(self, purchase_price=250000):
+        analyzer = FinancialAnalyzer()
+        analyzer.set_purchase_price(Money(amount=purchase_price, currency='USD'))
+        analyzer.set_inflation_rate(Decimal(0.025))
+        analyzer.set_selling_fee_rate(Decimal(0.06))
+        analyzer.set_buying_fee_rate(Decimal(0.006))
+        analyzer.set_mortgage(Money(amount=purchase_price, currency='USD'), Money(amount=50000, currency='USD'), 25, Decimal(0.04), MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL, '2008-01-01')
+        analyzer.add_rental_income(1, Money(amount=12300, currency='USD'), Decimal(1), Money(amount=1025, currency='USD'), 1, "Duplex Units", Decimal(2))
+        analyzer.add_expense(1, Money(amount=3222, currency='USD'), Decimal(1), Money(amount=268.50, currency='USD'), 1, "Property Tax")
+        analyzer.add_purchase_fee(1, "Down Payment", Money(amount=50000, currency='USD'))
+        return analyzer
+
+    def test_goal_seek_purchase_price(self):
+        analyzer = self.get_goal_seek_analyzer()
+        purchase_price = analyzer.goal_seek_purchase_price(Decimal(3), metric='cap_rate_with_mortgage')
+        analyzer.set_purchase_price(purchase_price)
+        self.assertAlmostEqual(float(analyzer.perform_analysis()['analysis']['cap_rate_with_mortgage']), 3.0, 6)
+
+        # Verify the price where the mortgage follows the purchase price.
+        analyzer = self.get_goal_seek_analyzer()
+        purchase_price = analyzer.goal_seek_purchase_price(Decimal('0.05'), year=10, mortgage_follows_purchase_price=True)
+        analyzer = self.get_goal_seek_analyzer(purchase_price.amount)
+        self.assertAlmostEqual(analyzer.perform_analysis()['annual_projections'][9]['annualized_roi_rate'], 0.05, 6)
+
+        # Unreachable targets have no solution.
+        self.assertIsNone(analyzer.goal_seek_purchase_price(Decimal(50), metric='cap_rate_with_mortgage'))
+
+    def test_goal_seek_rental_income(self):
+        analyzer = self.get_goal_seek_analyzer()
+        annual_amount_per_unit = analyzer.goal_seek_rental_income(1, Decimal(6))
+        rental_income = analyzer.get_rental_income(1)
+        analyzer.add_rental_income(1, annual_amount_per_unit, Decimal(1), rental_income['monthly_amount_per_unit'], 1, "Duplex Units", Decimal(2))
+        # The amount is stored rounded to whole cents.
+        self.assertAlmostEqual(float(analyzer.perform_analysis()['analysis']['cap_rate_with_mortgage']), 6.0, 4)
+
+    def test_incremental_analysis(self):
+        analyzer = self.get_goal_seek_analyzer()
+        results = analyzer.perform_analysis()
+        self.assertEqual(analyzer._stale_steps, set())
+
+        # Nothing changed so the previous results are returned.
+        self.assertIs(analyzer.perform_analysis()['annual_projections'], results['annual_projections'])
+
+        # An expense does not change the mortgage.
+        analyzer.add_expense(2, Money(amount=1200, currency='USD'), Decimal(1), Money(amount=100, currency='USD'), 1, "Insurance")
+        self.assertEqual(analyzer._stale_steps, {'aggregation', 'annual_projections'})
+        actual = analyzer.perform_analysis()
+        self.assertIs(actual['mortgage']['schedule'], results['mortgage']['schedule'])
+        analyzer.invalidate_all()
+        expected = analyzer.perform_analysis()
+        self.assertEqual(actual['analysis'], expected['analysis'])
+        self.assertEqual(actual['annual_projections'], expected['annual_projections'])
+        self.assertNotEqual(actual['annual_projections'], results['annual_projections'])
+
+        # The schedule is only built when it is included.
+        self.assertIsNone(analyzer.perform_analysis(include_schedule=False)['mortgage']['schedule'])
+        self.assertEqual(len(analyzer.perform_analysis()['mortgage']['schedule']), 300)
+
+        # A new horizon only runs the projections again.
+        analyzer.set_max_year(10)
+        self.assertEqual(analyzer._stale_steps, {'annual_projections'})
+        self.assertEqual(len(analyzer.perform_analysis()['annual_projections']), 10)
+
+    def test_fork(self):
+        analyzer = self.get_goal_seek_analyzer()
+        results = analyzer.perform_analysis()
+
+        # A fork shares the line items and the results until they change.
+        scenario = analyzer.fork()
+        self.assertIs(scenario._expense_dict, analyzer._expense_dict)
+        self.assertIs(scenario.perform_analysis()['annual_projections'], results['annual_projections'])
+
+        scenario = analyzer.with_changes(
+            purchase_price = Money(amount=240000, currency='USD'),
+            expenses = {1: None, 2: {'pk': 2, 'annual_amount': Money(amount=1200, currency='USD'), 'frequency': Decimal(1), 'monthly_amount': Money(amount=100, currency='USD'), 'type_id': 1, 'name_text': "Insurance"}}
+        )
+        self.assertIs(scenario._rental_income_dict, analyzer._rental_income_dict)
+        self.assertIsNot(scenario._expense_dict, analyzer._expense_dict)
+        self.assertEqual(list(scenario.perform_analysis()['expenses']), [2])
+        self.assertIs(scenario._mortgage_payment_schedule, results['mortgage']['schedule'])
+
+        # The parent is not changed by its forks and copies the line items
+        # it shares before changing them.
+        self.assertEqual(list(analyzer._expense_dict), [1])
+        self.assertIs(analyzer.perform_analysis()['annual_projections'], results['annual_projections'])
+        analyzer.remove_rental_income(1)
+        self.assertIsNotNone(scenario.get_rental_income(1))
+        self.assertIsNone(analyzer.get_rental_income(1))
+
+        # The results match an analyzer built with the changes.
+        expected = self.get_goal_seek_analyzer()
+        expected.set_purchase_price(Money(amount=240000, currency='USD'))
+        expected.remove_expense(1)
+        expected.add_expense(2, Money(amount=1200, currency='USD'), Decimal(1), Money(amount=100, currency='USD'), 1, "Insurance")
+        self.assertEqual(scenario.perform_analysis()['annual_projections'], expected.perform_analysis()['annual_projections'])
+
+    def test_getters(self):
+        analyzer = FinancialAnalyzer()
+        self.assertEqual(analyzer.get_currency(), 'USD')
+        self.assertEqual(analyzer.get_max_year(), MAX_YEAR)
+        self.assertIsNone(analyzer.get_mortgage_terms())
+
+        analyzer = self.get_goal_seek_analyzer()
+        self.assertEqual(analyzer.get_purchase_price(), analyzer.perform_analysis()['purchase_price'])
+        self.assertEqual(analyzer.get_inflation_rate(), analyzer.perform_analysis()['inflation_rate'])
+
+        # The mortgage terms are a copy.
+        mortgage_terms = analyzer.get_mortgage_terms()
+        mortgage_terms['amortization_year'] = 5
+        self.assertEqual(analyzer.get_mortgage_terms()['amortization_year'], 25)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL, MORTGAGEKIT_WEEK
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.batch import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+PURCHASE_PRICES = [250000, 400000, 120000]
+INFLATION_RATES = [0.025, 0.03, 0.01]
+PAYMENT_FREQUENCIES = [MORTGAGEKIT_MONTH, MORTGAGEKIT_WEEK, MORTGAGEKIT_MONTH]
+AMORTIZATION_YEARS = [25, 35, 40]
+
+
+class TestBatchFinancialAnalyzer(unittest.TestCase):
+
+    def get_analyzer(self, index):
+        """
+        Function returns the reference analyzer of the property at "index".
+        """
+        spec = get_spec(PURCHASE_PRICES[index])
+        spec['inflation_rate'] = Decimal(INFLATION_RATES[index])
+        spec['mortgage'].update(
+            amortization_year = AMORTIZATION_YEARS[index],
+            payment_frequency = PAYMENT_FREQUENCIES[index]
+        )
+        analyzer = create_analyzer(spec)
+        analyzer.add_capital_improvement(1, "Repaired Roof", Money(amount=1200, currency='USD'))
+        return analyzer
+
+    def test_perform_analysis_matches_financial_analyzer(self):
+        batch_analyzer = BatchFinancialAnalyzer(len(PURCHASE_PRICES))
+        batch_analyzer.set_purchase_prices(PURCHASE_PRICES)
+        batch_analyzer.set_inflation_rates(INFLATION_RATES)
+        batch_analyzer.set_selling_fee_rates(0.06)
+        batch_analyzer.set_buying_fee_rates(0.006)
+        batch_analyzer.set_mortgages(PURCHASE_PRICES, 50000, AMORTIZATION_YEARS, 0.04, PAYMENT_FREQUENCIES, MORTGAGEKIT_SEMI_ANNUAL)
+        batch_analyzer.set_rental_incomes(2050, 24600)
+        batch_analyzer.set_expenses(268.50, 3222)
+        batch_analyzer.set_purchase_fees(50000)
+        batch_analyzer.set_capital_improvements(1200)
+        results = batch_analyzer.perform_analysis(chunk_size=2)
+
+        for index in range(len(PURCHASE_PRICES)):
+            expected = self.get_analyzer(index).perform_analysis()
+
+            # Verify 'mortgage'.
+            for key in ('monthly_mortgage_payment', 'annual_mortgage_payment'):
+                self.assertAlmostEqual(results['mortgage'][key][index], float(expected['mortgage'][key].amount), 6)
+
+            # Verify 'analysis'.
+            for key, value in expected['analysis'].items():
+                value = value.amount if isinstance(value, Money) else value
+                self.assertAlmostEqual(results['analysis'][key][index], float(value), 6)
+
+            # Verify 'annual_projections'.
+            for year_index, projection in enumerate(expected['annual_projections']):
+                for key in ('debt_remaining', 'sales_price', 'legal_fees', 'cash_flow', 'proceeds_of_sale', 'total_return'):
+                    self.assertAlmostEqual(results['annual_projections'][key][index, year_index], float(projection[key].amount), 4)
+                self.assertAlmostEqual(results['annual_projections']['roi_rate'][index, year_index], float(projection['roi_rate']), 4)
+                self.assertAlmostEqual(results['annual_projections']['annualized_roi_rate'][index, year_index], projection['annualized_roi_rate'], 8)
+
+    def test_max_year(self):
+        batch_analyzer = BatchFinancialAnalyzer(2)
+        batch_analyzer.set_purchase_prices(250000)
+        batch_analyzer.set_max_year(50)
+        results = batch_analyzer.perform_analysis()
+        self.assertEqual(results['annual_projections']['total_return'].shape, (2, 50))
+        np.testing.assert_array_equal(results['annual_projections']['year'], np.arange(1, 51))
+
+    def test_to_column(self):
+        batch_analyzer = BatchFinancialAnalyzer(2)
+        np.testing.assert_array_equal(batch_analyzer.to_column(5), [5.0, 5.0])
+        with self.assertRaises(AssertionError):
+            batch_analyzer.to_column([1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from benchmarks.benchmark_suite import *
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks('return_on_investment', repeat=2, min_time=0.001, include_pdf=False)
+        self.assertEqual(list(results['benchmarks']), ['return_on_investment'])
+        self.assertGreater(results['benchmarks']['return_on_investment']['median'], 0)
+
+        # Every benchmark has a unique name.
+        names = [name for name, setup in get_benchmarks()]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_compare_with_baseline(self):
+        baseline = {'version': BENCHMARK_FORMAT_VERSION, 'benchmarks': {'a': {'median': 1.0}, 'b': {'median': 1.0}}}
+        results = {'version': BENCHMARK_FORMAT_VERSION, 'benchmarks': {'a': {'median': 1.05}, 'b': {'median': 1.5}, 'c': {'median': 9.0}}}
+        self.assertEqual(compare_with_baseline(results, baseline, 0.1), [('b', 1.0, 1.5, 1.5)])
+        self.assertEqual(compare_with_baseline(results, baseline, 0.6), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pickle
+import unittest
+from decimal import Decimal
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.cache import *
+
+
+MORTGAGE_TERMS = {
+    'total_amount': Money(amount=250000, currency='USD'),
+    'down_payment': Money(amount=50000, currency='USD'),
+    'amortization_year': 25,
+    'annual_interest_rate': Decimal(0.04),
+    'payment_frequency': MORTGAGEKIT_MONTH,
+    'compounding_period': MORTGAGEKIT_SEMI_ANNUAL,
+    'first_payment_date': '2008-01-01'
+}
+
+
+class TestMortgageScheduleCache(unittest.TestCase):
+
+    def test_get_schedule(self):
+        cache = MortgageScheduleCache(max_size=2)
+        schedule = cache.get_schedule(**MORTGAGE_TERMS)
+        self.assertEqual(len(schedule), 300)
+        self.assertIs(cache.get_schedule(**MORTGAGE_TERMS), schedule)
+        self.assertEqual(cache.get_stats(), {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 2})
+
+        # The rows are shared and therefore read-only.
+        with self.assertRaises(TypeError):
+            schedule[0]['loan_balance'] = Money(amount=0, currency='USD')
+        self.assertEqual(pickle.loads(pickle.dumps(schedule)), schedule)
+
+    def test_least_recently_used_schedule_is_discarded(self):
+        cache = MortgageScheduleCache(max_size=2)
+        first_schedule = cache.get_schedule(**MORTGAGE_TERMS)
+        cache.get_schedule(**dict(MORTGAGE_TERMS, amortization_year=20))
+        cache.get_schedule(**MORTGAGE_TERMS)
+        cache.get_schedule(**dict(MORTGAGE_TERMS, amortization_year=15))
+        self.assertEqual(cache.get_stats()['size'], 2)
+        self.assertIs(cache.get_schedule(**MORTGAGE_TERMS), first_schedule)
+        cache.get_schedule(**dict(MORTGAGE_TERMS, amortization_year=20))
+        self.assertEqual(cache.get_stats(), {'hits': 2, 'misses': 4, 'size': 2, 'max_size': 2})
+
+        cache.set_max_size(0)
+        self.assertEqual(cache.get_stats()['size'], 0)
+        cache.clear()
+        self.assertEqual(cache.get_stats(), {'hits': 0, 'misses': 0, 'size': 0, 'max_size': 0})
+
+    def test_analyzers_share_schedule(self):
+        schedules = []
+        for index in range(2):
+            analyzer = FinancialAnalyzer()
+            analyzer.set_inflation_rate(Decimal(0.025))
+            analyzer.set_selling_fee_rate(Decimal(0.06))
+            analyzer.set_mortgage(**MORTGAGE_TERMS)
+            schedules.append(analyzer.perform_analysis()['mortgage']['schedule'])
+        self.assertIs(schedules[0], schedules[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
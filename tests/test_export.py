@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import csv
+import io
+import unittest
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.batch import *
+from incomepropertyevaluatorkit.calculator.export import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestExport(unittest.TestCase):
+
+    def test_export_annual_projections_to_csv(self):
+        analyzers = [create_analyzer(get_spec(purchase_price)) for purchase_price in (250000, 300000)]
+        file_object = io.StringIO()
+        writer = create_columnar_writer(file_object, PROJECTION_EXPORT_COLUMNS, EXPORT_FORMAT_CSV)
+        # The buffer size splits the rows of the properties across chunks.
+        number_of_rows = export_annual_projections(writer, enumerate(analyzers), buffer_size=7)
+        self.assertEqual(number_of_rows, 60)
+        self.assertEqual(writer.get_number_of_rows(), 60)
+
+        rows = list(csv.DictReader(io.StringIO(file_object.getvalue())))
+        self.assertEqual(len(rows), 60)
+        self.assertEqual(list(rows[0]), [key for key, dtype in PROJECTION_EXPORT_COLUMNS])
+        expected = analyzers[1].perform_analysis()['annual_projections'][4]
+        self.assertEqual(rows[34]['property_id'], '1')
+        self.assertEqual(rows[34]['year'], '5')
+        self.assertAlmostEqual(float(rows[34]['total_return']), float(expected['total_return'].amount), 6)
+
+        # The results of the analyzers are written the same.
+        results_file_object = io.StringIO()
+        writer = create_columnar_writer(results_file_object, PROJECTION_EXPORT_COLUMNS, EXPORT_FORMAT_CSV)
+        export_annual_projections(writer, enumerate(analyzer.perform_analysis() for analyzer in analyzers))
+        self.assertEqual(results_file_object.getvalue(), file_object.getvalue())
+
+    def test_columnar_writer_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ColumnarWriter(PROJECTION_EXPORT_COLUMNS)
+
+    def test_export_mortgage_schedules_to_npz(self):
+        analyzer = create_analyzer(get_spec(250000))
+        results = analyzer.perform_analysis()
+        file_object = io.BytesIO()
+        with create_columnar_writer(file_object, SCHEDULE_EXPORT_COLUMNS, EXPORT_FORMAT_NPZ) as writer:
+            export_mortgage_schedules(writer, [(10, analyzer), (11, results)], buffer_size=100)
+        file_object.seek(0)
+        with np.load(file_object) as arrays:
+            self.assertEqual(arrays['property_id'].shape, (600,))
+            np.testing.assert_array_equal(np.unique(arrays['property_id']), [10, 11])
+            np.testing.assert_array_equal(arrays['loan_balance'][:300], arrays['loan_balance'][300:])
+            self.assertEqual(arrays['payment_date'][0], np.datetime64('2008-02-01'))
+            self.assertAlmostEqual(arrays['interest'][0], float(results['mortgage']['schedule'][0]['interest'].amount), 6)
+
+    def test_export_batch_annual_projections(self):
+        batch_analyzer = BatchFinancialAnalyzer(3)
+        batch_analyzer.set_purchase_prices([250000, 300000, 350000])
+        batch_analyzer.set_inflation_rates(0.025)
+        batch_analyzer.set_selling_fee_rates(0.06)
+        batch_analyzer.set_buying_fee_rates(0.006)
+        batch_analyzer.set_mortgages([250000, 300000, 350000], 50000, 25, 0.04, MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL)
+        batch_analyzer.set_rental_incomes(2050, 24600)
+        batch_analyzer.set_expenses(268.50, 3222)
+        batch_analyzer.set_purchase_fees(50000)
+        batch_analyzer.set_capital_improvements(0)
+        results = batch_analyzer.perform_analysis()
+
+        file_object = io.BytesIO()
+        with create_columnar_writer(file_object, PROJECTION_EXPORT_COLUMNS, EXPORT_FORMAT_NPZ) as writer:
+            export_batch_annual_projections(writer, results, property_ids=[7, 8, 9], buffer_size=45)
+        file_object.seek(0)
+        with np.load(file_object) as arrays:
+            np.testing.assert_array_equal(arrays['property_id'], np.repeat([7, 8, 9], 30))
+            np.testing.assert_array_equal(arrays['year'][30:60], np.arange(1, 31))
+            np.testing.assert_array_equal(arrays['roi_rate'], results['annual_projections']['roi_rate'].ravel())
+
+    @unittest.skipUnless(pyarrow is not None, 'requires pyarrow')
+    def test_export_annual_projections_to_parquet(self):
+        file_object = io.BytesIO()
+        with create_columnar_writer(file_object, PROJECTION_EXPORT_COLUMNS, EXPORT_FORMAT_PARQUET) as writer:
+            export_annual_projections(writer, [(1, create_analyzer(get_spec(250000)))])
+        file_object.seek(0)
+        table = pyarrow.parquet.read_table(file_object)
+        self.assertEqual(table.num_rows, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
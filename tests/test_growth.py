@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pickle
+import unittest
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.growth import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestGrowthCurve(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = create_analyzer(get_spec(250000))
+
+    def set_rental_income_growth_curve(self, growth_curve, **changes):
+        self.analyzer.add_rental_income(**dict(self.analyzer.get_rental_income(1), growth_curve=growth_curve, **changes))
+
+    def set_expense_growth_curve(self, growth_curve):
+        self.analyzer.add_expense(**dict(self.analyzer.get_expense(1), growth_curve=growth_curve))
+
+    def test_factors(self):
+        # A constant rate gives the same factors as "appreciated_value".
+        growth_curve = GrowthCurve(Decimal(0.025))
+        factors = growth_curve.get_decimal_factors(30)
+        self.assertEqual(len(factors), 30)
+        one = Money(amount=1, currency='USD')
+        self.assertEqual(one * factors[9], appreciated_value(one, 10, Decimal(0.025)))
+
+        # The tables are computed once per horizon.
+        self.assertIs(growth_curve.get_factors(30), growth_curve.get_factors(30))
+        self.assertFalse(growth_curve.get_factors(30).flags.writeable)
+
+        # Per year rates (the last one is repeated) and step-ups.
+        growth_curve = GrowthCurve((Decimal('0.10'), Decimal('0')), {3: Decimal('0.5')})
+        np.testing.assert_allclose(growth_curve.get_factors(4), [1.1, 1.1, 1.65, 1.65])
+
+    def test_equality(self):
+        growth_curve = GrowthCurve(Decimal('0.03'), {5: Decimal('0.1')})
+        self.assertEqual(growth_curve, GrowthCurve((Decimal('0.03'),), {5: Decimal('0.1')}))
+        self.assertNotEqual(growth_curve, GrowthCurve(Decimal('0.03')))
+        self.assertEqual(pickle.loads(pickle.dumps(growth_curve)), growth_curve)
+        with self.assertRaises(AttributeError):
+            growth_curve.rates = (Decimal(0),)
+
+    def test_inflation_curve_does_not_change_projections(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        self.set_expense_growth_curve(GrowthCurve(Decimal(0.025)))
+        actual = self.analyzer.perform_analysis()['annual_projections']
+        for expected_projection, actual_projection in zip(expected, actual):
+            self.assertEqual(expected_projection['cash_flow'], actual_projection['cash_flow'])
+
+    def test_line_item_growth_curves(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+
+        # The expenses no longer grow and the rent steps up by 10% in year 5.
+        rent_curve = GrowthCurve(Decimal(0.025), {5: Decimal('0.1')})
+        self.set_rental_income_growth_curve(rent_curve)
+        self.set_expense_growth_curve(GrowthCurve(Decimal(0)))
+        actual = self.analyzer.perform_analysis()['annual_projections']
+        inflation_factors = GrowthCurve(Decimal(0.025)).get_decimal_factors(30)
+        for year in (1, 5, 30):
+            difference = actual[year - 1]['cash_flow'] - expected[year - 1]['cash_flow']
+            expected_difference = (
+                Decimal(24600) * (rent_curve.get_decimal_factors(30)[year - 1] - inflation_factors[year - 1]) -
+                Decimal(3222) * (1 - inflation_factors[year - 1])
+            )
+            self.assertAlmostEqual(difference.amount, expected_difference, 8)
+            self.assertEqual(actual[year - 1]['sales_price'], expected[year - 1]['sales_price'])
+
+        # The array backends agree with the "decimal" backend.
+        for numeric_backend in (NUMERIC_BACKEND_FLOAT64, NUMERIC_BACKEND_INT64_CENTS):
+            self.analyzer.set_numeric_backend(numeric_backend, verify=True)
+            self.analyzer.perform_analysis()
+
+        # Removing the line items removes their growth.
+        self.analyzer.set_numeric_backend(None)
+        self.analyzer.remove_rental_income(1)
+        self.analyzer.remove_expense(1)
+        self.assertEqual(self.analyzer.get_growth_curve_amounts(), {})
+
+    def test_goal_seek_with_growth_curve(self):
+        self.set_rental_income_growth_curve(GrowthCurve(Decimal('0.04')))
+        self.analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+        self.analyzer.set_numeric_backend(NUMERIC_BACKEND_FLOAT64)
+        annual_amount_per_unit = self.analyzer.goal_seek_rental_income(1, 0.1, 'annualized_roi_rate', year=10)
+        self.set_rental_income_growth_curve(GrowthCurve(Decimal('0.04')), annual_amount_per_unit=annual_amount_per_unit)
+        projection = self.analyzer.perform_analysis()['annual_projections'][9]
+        self.assertAlmostEqual(projection['annualized_roi_rate'], 0.1, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
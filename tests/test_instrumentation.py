@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.instrumentation import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = create_analyzer(get_spec(250000))
+
+    def test_disabled(self):
+        self.assertIsNone(self.analyzer.get_instrumentation())
+        self.assertIsNone(self.analyzer.get_instrumentation_stats())
+        self.analyzer.perform_analysis()
+
+    def test_steps(self):
+        records = []
+        expected = self.analyzer.perform_analysis()
+        process_stats = get_process_instrumentation_stats()
+        self.analyzer.invalidate_all()  # Run every step again.
+        with instrument(self.analyzer, callback=lambda *record: records.append(record)) as instrumentation:
+            actual = self.analyzer.perform_analysis()
+            self.assertEqual(self.analyzer.get_instrumentation_stats(), instrumentation.get_stats())
+        self.assertIsNone(self.analyzer.get_instrumentation())
+        self.assertEqual(actual['annual_projections'], expected['annual_projections'])
+
+        timers = instrumentation.get_stats()['timers']
+        for name in ('perform_analysis', 'mortgage', 'aggregation', 'annual_projections'):
+            self.assertEqual(timers[name]['count'], 1)
+        self.assertEqual(timers['projection_year']['count'], 30)
+        self.assertEqual(timers['irr_solve']['count'], 30)
+        self.assertGreaterEqual(timers['perform_analysis']['total_time'], timers['annual_projections']['total_time'])
+        self.assertGreaterEqual(timers['projection_year']['total_time'], timers['projection_year']['max_time'])
+        self.assertEqual(len(records), 64)
+        self.assertEqual(records[-1][0], 'perform_analysis')
+
+        # The records are added to the process-wide instrumentation.
+        previous_count = process_stats['timers'].get('perform_analysis', {}).get('count', 0)
+        self.assertEqual(get_process_instrumentation_stats()['timers']['perform_analysis']['count'], previous_count + 1)
+
+    def test_vectorized_projections(self):
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_VECTORIZED)
+        with instrument(self.analyzer) as instrumentation:
+            self.analyzer.perform_analysis()
+        timers = instrumentation.get_stats()['timers']
+        self.assertEqual(timers['vectorized_projections']['count'], 1)
+        self.assertNotIn('irr_solve', timers)
+
+    def test_money_allocations(self):
+        original_money_init = Money.__init__
+        with instrument(self.analyzer, count_money_allocations=True) as instrumentation:
+            self.analyzer.perform_analysis()
+            self.analyzer.perform_analysis()
+            # The instrumentation is not pickled.
+            self.assertIsNone(pickle.loads(pickle.dumps(self.analyzer)).get_instrumentation())
+        self.assertIs(Money.__init__, original_money_init)
+        self.assertGreater(instrumentation.get_stats()['counters']['money_allocations'], 0)
+
+    def test_money_allocations_without_detaching(self):
+        original_money_init = Money.__init__
+        self.analyzer.set_instrumentation(create_instrumentation(count_money_allocations=True))
+        self.analyzer.perform_analysis()
+        # "Money" is only patched while the analysis runs, so an analyzer
+        # which is never detached (ex: garbage collected) does not leak it.
+        self.assertIs(Money.__init__, original_money_init)
+        self.assertGreater(self.analyzer.get_instrumentation_stats()['counters']['money_allocations'], 0)
+        del self.analyzer
+        self.assertIs(Money.__init__, original_money_init)
+
+    def test_money_allocations_in_threads(self):
+        original_money_init = Money.__init__
+        analyzers = [create_analyzer(get_spec(price)) for price in (200000, 250000, 300000, 350000)]
+        for analyzer in analyzers:
+            analyzer.set_instrumentation(create_instrumentation(count_money_allocations=True))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda analyzer: analyzer.perform_analysis(), analyzers))
+        self.assertIs(Money.__init__, original_money_init)
+        for analyzer in analyzers:
+            self.assertGreater(analyzer.get_instrumentation_stats()['counters']['money_allocations'], 0)
+
+        # Only the last analysis restores "Money.__init__", and only if it
+        # was not replaced by something else in the meantime.
+        start_counting_money_allocations()
+        start_counting_money_allocations()
+        stop_counting_money_allocations()
+        self.assertIs(Money.__init__, counting_money_init)
+        Money.__init__ = other_money_init = lambda money, *args, **kwargs: original_money_init(money, *args, **kwargs)
+        try:
+            stop_counting_money_allocations()
+            self.assertIs(Money.__init__, other_money_init)
+        finally:
+            Money.__init__ = original_money_init
+
+
+if __name__ == '__main__':
+    unittest.main()
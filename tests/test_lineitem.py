@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import pickle
+import unittest
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from incomepropertyevaluatorkit.calculator.lineitem import *
+
+
+class TestLineItemCollection(unittest.TestCase):
+
+    def setUp(self):
+        self.collection = LineItemCollection(RentalIncomeLineItem, ('monthly_amount_per_unit', 'number_of_units'))
+        for pk in range(1, 11):
+            self.collection.add(
+                pk = pk,
+                annual_amount_per_unit = Money(amount=12 * pk, currency='USD'),
+                frequency = Decimal(1),
+                monthly_amount_per_unit = Money(amount=pk, currency='USD'),
+                type_id = 1,
+                name_text = "Unit %s" % pk,
+                number_of_units = Decimal(2)
+            )
+
+    def test_line_item(self):
+        line_item = self.collection[3]
+        self.assertEqual(line_item['name_text'], "Unit 3")
+        self.assertEqual(dict(line_item)['monthly_amount_per_unit'], Money(amount=3, currency='USD'))
+        self.assertEqual(list(line_item.keys()), list(RentalIncomeLineItem.__slots__))
+        with self.assertRaises(TypeError):
+            line_item['name_text'] = "Penthouse"
+        with self.assertRaises(AttributeError):
+            line_item.name_text = "Penthouse"
+        self.assertEqual(pickle.loads(pickle.dumps(line_item)), line_item)
+
+    def test_get_total(self):
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount=110, currency='USD'))
+        self.assertEqual(self.collection.get_total('number_of_units'), Money(amount=20, currency='USD'))
+
+        # Replacing a line item keeps its position.
+        self.collection.add(**dict(self.collection[5], monthly_amount_per_unit=Money(amount=100, currency='USD')))
+        self.assertEqual(list(self.collection.keys()), list(range(1, 11)))
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount=300, currency='USD'))
+
+        # Removing a line item moves the last line item into its row.
+        self.collection.remove(5)
+        self.collection.remove(666)
+        self.assertEqual(len(self.collection), 9)
+        self.assertEqual(list(self.collection.keys()), [1, 2, 3, 4, 6, 7, 8, 9, 10])
+        self.assertEqual(list(self.collection.get_column('monthly_amount_per_unit')), [100, 200, 300, 400, 1000, 600, 700, 800, 900])
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount=100, currency='USD'))
+
+        # The moved line item is replaced in its new row.
+        self.collection.add(**dict(self.collection[10], monthly_amount_per_unit=Money(amount=20, currency='USD')))
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount=120, currency='USD'))
+        self.collection.remove(10)
+        self.assertEqual(list(self.collection.get_column('monthly_amount_per_unit')), [100, 200, 300, 400, 900, 600, 700, 800])
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount=80, currency='USD'))
+
+        # Empty collections have no total.
+        for pk in list(self.collection.keys()):
+            self.collection.remove(pk)
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit'), Money(amount=0, currency='USD'))
+
+    def test_cents(self):
+        # The amounts are stored in whole cents, rounded half up.
+        self.collection.add(**dict(self.collection[1], monthly_amount_per_unit=Money(amount='1.005', currency='USD')))
+        self.assertEqual(self.collection.get_column('monthly_amount_per_unit').dtype, np.int64)
+        self.assertEqual(self.collection.get_column('monthly_amount_per_unit')[0], 101)
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit'), Money(amount='55.01', currency='USD'))
+
+        # Weights which are not whole numbers are multiplied exactly.
+        self.collection.add(**dict(self.collection[2], number_of_units=Decimal('0.5')))
+        self.assertEqual(self.collection.get_total('monthly_amount_per_unit', 'number_of_units'), Money(amount='107.02', currency='USD'))
+        self.assertEqual(self.collection.get_totals_by('number_of_units', 'monthly_amount_per_unit', 'number_of_units'), {
+            Decimal(2): Money(amount='106.02', currency='USD'),
+            Decimal('0.5'): Money(amount='1.00', currency='USD')
+        })
+
+    def test_currency(self):
+        with self.assertRaises(AssertionError):
+            self.collection.add(**dict(self.collection[1], monthly_amount_per_unit=Money(amount=1, currency='CAD')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.parallel import *
+
+
+def get_spec(purchase_price):
+    return {
+        'purchase_price': Money(amount=purchase_price, currency='USD'),
+        'inflation_rate': Decimal(0.025),
+        'selling_fee_rate': Decimal(0.06),
+        'buying_fee_rate': Decimal(0.006),
+        'mortgage': {
+            'total_amount': Money(amount=purchase_price, currency='USD'),
+            'down_payment': Money(amount=50000, currency='USD'),
+            'amortization_year': 25,
+            'annual_interest_rate': Decimal(0.04),
+            'payment_frequency': MORTGAGEKIT_MONTH,
+            'compounding_period': MORTGAGEKIT_SEMI_ANNUAL,
+            'first_payment_date': '2008-01-01'
+        },
+        'rental_incomes': [{
+            'pk': 1,
+            'annual_amount_per_unit': Money(amount=12300, currency='USD'),
+            'frequency': Decimal(1),
+            'monthly_amount_per_unit': Money(amount=1025, currency='USD'),
+            'type_id': 1,
+            'name_text': "Duplex Units",
+            'number_of_units': Decimal(2)
+        }],
+        'expenses': [{
+            'pk': 1,
+            'annual_amount': Money(amount=3222, currency='USD'),
+            'frequency': Decimal(1),
+            'monthly_amount': Money(amount=268.50, currency='USD'),
+            'type_id': 1,
+            'name_text': "Property Tax"
+        }],
+        'purchase_fees': [
+            {'pk': 1, 'name_text': "Down Payment", 'amount': Money(amount=50000, currency='USD')}
+        ]
+    }
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.specs = [get_spec(price) for price in (200000, 250000, 300000, 350000, 400000)]
+
+    def test_create_analyzer(self):
+        analyzer = create_analyzer(self.specs[0])
+        self.assertEqual(analyzer.get_rental_income(1)['name_text'], "Duplex Units")
+        self.assertEqual(analyzer.get_total_purchase_fee_amount().amount, 50000)
+
+        # The results of an analysis can be used as a spec too.
+        results = analyzer.perform_analysis()
+        analyzer = create_analyzer({
+            'rental_incomes': results['rental_incomes'],
+            'purchase_fees': results['purchase_fees']
+        })
+        self.assertEqual(analyzer.get_rental_income(1)['name_text'], "Duplex Units")
+
+    def test_pickled_analyzer(self):
+        analyzer = pickle.loads(pickle.dumps(create_analyzer(self.specs[0])))
+        results = analyzer.perform_analysis()
+        self.assertEqual(len(results['mortgage']['schedule']), 300)
+
+    def test_perform_analysis_in_parallel(self):
+        items = self.specs[:4] + [create_analyzer(self.specs[4])]
+        results = perform_analysis_in_parallel(items, max_workers=2, chunksize=2)
+        self.assertEqual(len(results), 5)
+        for spec, result in zip(self.specs, results):
+            self.assertEqual(result['purchase_price'], spec['purchase_price'])
+            self.assertIsNone(result['mortgage']['schedule'])
+            expected = create_analyzer(spec).perform_analysis()
+            self.assertEqual(result['analysis']['annual_cash_flow'], expected['analysis']['annual_cash_flow'])
+
+        # Schedules are only returned if requested.
+        results = perform_analysis_in_parallel(self.specs[:1], max_workers=1, include_schedule=True)
+        self.assertEqual(len(results[0]['mortgage']['schedule']), 300)
+
+    def test_iter_analysis_in_parallel(self):
+        pairs = list(iter_analysis_in_parallel(self.specs, max_workers=2, chunksize=2))
+        self.assertEqual(sorted(index for index, result in pairs), [0, 1, 2, 3, 4])
+        for index, result in pairs:
+            self.assertEqual(result['purchase_price'], self.specs[index]['purchase_price'])
+
+    def test_iter_analysis_in_parallel_bounds_pending_chunks(self):
+        consumed = []
+
+        def generate_specs():
+            for spec in self.specs:
+                consumed.append(spec)
+                yield spec
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pairs = iter_analysis_in_parallel(generate_specs(), max_workers=1, chunksize=1, executor=executor)
+            next(pairs)
+            self.assertEqual(len(consumed), PARALLEL_CHUNKS_PER_WORKER)
+            self.assertEqual(len(list(pairs)), len(self.specs) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
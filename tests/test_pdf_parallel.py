@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.pdf.parallel import *
+
+
+THIS_TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_SAMPLE_FILEPATH = THIS_TEST_DIR+"/"+"evaluator_sample.json"
+
+
+class TestPDFParallel(unittest.TestCase):
+
+    def setUp(self):
+        with open(TEST_SAMPLE_FILEPATH) as input_file_handle:
+            doc_content = json.load(input_file_handle)
+        self.doc_contents = []
+        for index in range(5):
+            doc_content = copy.deepcopy(doc_content)
+            doc_content['text_placeholders']['{{ property_name }}'] = "Property %s" % index
+            self.doc_contents.append(doc_content)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generate_pdfs_in_parallel(self):
+        with create_pdf_executor(max_workers=2) as executor:
+            # Write into the directory ...
+            filepaths = generate_pdfs_in_parallel(self.doc_contents, self.directory, max_workers=2, chunksize=2, executor=executor)
+            self.assertEqual(filepaths, [get_pdf_filepath(self.directory, PDF_EVALUATOR_DOCUMENT_ID, index) for index in range(5)])
+            for filepath in filepaths:
+                self.assertTrue(os.path.isfile(filepath))
+
+            # ... or return the bytes, with the same warm workers.
+            pairs = list(iter_pdfs_in_parallel(iter(self.doc_contents), max_workers=1, chunksize=1, executor=executor))
+        self.assertEqual(sorted(index for index, pdf_bytes in pairs), [0, 1, 2, 3, 4])
+        for index, pdf_bytes in pairs:
+            self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+    def test_generate_pdf_on_item(self):
+        warm_up_pdf_worker()
+        self.assertTrue(generate_pdf_on_item(self.doc_contents[0]).startswith(b"%PDF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 import unittest
+import io
 import os
 import json
+from unittest import mock
 from datetime import datetime
 from decimal import Decimal
 from moneyed import Money # Third party library for "Money" datatype.
@@ -42,5 +44,44 @@ class TestPDFDocGen(unittest.TestCase):
         # Delete the file once tested.
         os.remove(TEST_OUTPUT_FILEPATH)
 
+    def test_generate_evaluator_doc_in_memory(self):
+        with open(TEST_SAMPLE_FILEPATH) as input_file_handle:
+            doc_content = json.load(input_file_handle)
+        pdf_docgen = PDFDocGen(PDF_EVALUATOR_DOCUMENT_ID)
+        pdf_docgen.set_doc_content(doc_content)
+
+        # Verify the bytes are returned without a destination ...
+        pdf_bytes = pdf_docgen.generate()
+        self.assertTrue(pdf_bytes.startswith(b"%PDF"))
+
+        # ... or written into the stream.
+        output_stream = io.BytesIO()
+        self.assertIsNone(pdf_docgen.generate(output_stream))
+        self.assertTrue(output_stream.getvalue().startswith(b"%PDF"))
+        self.assertFalse(output_stream.closed)
+        self.assertFalse(os.path.isfile(TEST_OUTPUT_FILEPATH))
+
+    def test_generate_errors(self):
+        pdf_docgen = PDFDocGen(PDF_EVALUATOR_DOCUMENT_ID)
+        with open(TEST_SAMPLE_FILEPATH) as input_file_handle:
+            pdf_docgen.set_doc_content(json.load(input_file_handle))
+        with mock.patch.object(pisa, 'CreatePDF', return_value=mock.Mock(err=1)):
+            with self.assertRaises(RuntimeError):
+                pdf_docgen.generate()
+            with self.assertRaises(RuntimeError):
+                pdf_docgen.generate(TEST_OUTPUT_FILEPATH)
+        os.remove(TEST_OUTPUT_FILEPATH)
+
+    def test_compiled_html_template_cache(self):
+        clear_html_template_cache()
+        template = get_compiled_html_template(PDF_EVALUATOR_DOCUMENT_ID)
+        self.assertIs(get_compiled_html_template(PDF_EVALUATOR_DOCUMENT_ID), template)
+        self.assertIn("{{ property_name }}", template[1])
+
+        # The template is compiled again once its file changed.
+        modification_time, template = html_template_cache[PDF_EVALUATOR_DOCUMENT_ID]
+        html_template_cache[PDF_EVALUATOR_DOCUMENT_ID] = (modification_time - 1, template)
+        self.assertIsNot(get_compiled_html_template(PDF_EVALUATOR_DOCUMENT_ID), template)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL, MORTGAGEKIT_WEEK
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.foundation.utils import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.projection import *
+from incomepropertyevaluatorkit.calculator.backend import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestProjection(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = create_analyzer(get_spec(250000))
+        self.analyzer.add_purchase_fee(2, "CMHC Premium", Money(amount=4375, currency='USD'))
+
+    def assertProjectionsAlmostEqual(self, expected_projections, actual_projections):
+        self.assertEqual(len(expected_projections), len(actual_projections))
+        for expected, actual in zip(expected_projections, actual_projections):
+            self.assertEqual(expected['year'], actual['year'])
+            for key in ('debt_remaining', 'sales_price', 'legal_fees', 'cash_flow',
+                        'initial_investment', 'proceeds_of_sale', 'total_return'):
+                self.assertAlmostEqual(expected[key].amount, actual[key].amount, 4)
+            self.assertAlmostEqual(expected['roi_rate'], actual['roi_rate'], 4)
+            self.assertAlmostEqual(expected['annualized_roi_rate'], actual['annualized_roi_rate'], 8)
+
+    def test_appreciation_factors(self):
+        actual = appreciation_factors(Decimal(0.25), 5)
+        self.assertEqual(actual.shape, (5,))
+        self.assertAlmostEqual(actual[-1], 3.0517578125, 10)
+
+        # Rates are broadcasted into the leading axes.
+        actual = appreciation_factors([0.0, 0.1], 3)
+        self.assertEqual(actual.shape, (2, 3))
+        self.assertAlmostEqual(actual[1, 2], 1.331, 10)
+
+    def test_loan_balances_at_eoy(self):
+        calculator = self.analyzer._mortgage_calculator
+        schedule = calculator.get_mortgage_payment_schedule()
+        actual = loan_balances_at_eoy(
+            loan_amount = 200000,
+            interest_rate_per_payment = calculator.get_interest_rate_per_payment_frequency(),
+            mortgage_payment = float(calculator.get_mortgage_payment_per_payment_frequency().amount),
+            payment_frequency = 12,
+            amortization_year = 25,
+            max_year = 30
+        )
+        for year in range(1, 25):
+            self.assertAlmostEqual(actual[year - 1], float(schedule[year * 12 - 1]['loan_balance'].amount), 4)
+
+        # Paid off loans have no balance remaining.
+        np.testing.assert_array_equal(actual[24:], 0.0)
+
+    def test_annualized_return_rates(self):
+        previous_cash_flows = np.array([1000.0, 1100.0, 1200.0])
+        final_cash_flows = np.array([11000.0, 12100.0, 13200.0])
+        actual = annualized_return_rates(10000.0, previous_cash_flows, final_cash_flows)
+        self.assertAlmostEqual(actual[0], internal_rate_of_return([-10000, 11000]), 8)
+        self.assertAlmostEqual(actual[1], internal_rate_of_return([-10000, 1000, 12100]), 8)
+        self.assertAlmostEqual(actual[2], internal_rate_of_return([-10000, 1000, 1100, 13200]), 8)
+
+    def test_vectorized_engine_matches_scalar_engine(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_VECTORIZED)
+        actual = self.analyzer.perform_analysis()['annual_projections']
+        self.assertProjectionsAlmostEqual(expected, actual)
+
+    def test_closed_form_loan_balances_match_schedule(self):
+        expected = self.analyzer.perform_analysis()
+        self.analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+        actual = self.analyzer.perform_analysis(include_schedule=False)
+        self.assertIsNone(actual['mortgage']['schedule'])
+        self.assertProjectionsAlmostEqual(expected['annual_projections'], actual['annual_projections'])
+
+        # The schedule is still built when the caller asks for it.
+        actual = self.analyzer.perform_analysis()
+        self.assertEqual(len(actual['mortgage']['schedule']), 300)
+
+    def test_max_year(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        self.analyzer.set_max_year(60)
+        actual = self.analyzer.perform_analysis()['annual_projections']
+        self.assertEqual(len(actual), 60)
+        self.assertProjectionsAlmostEqual(expected, actual[:30])
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_VECTORIZED)
+        self.assertProjectionsAlmostEqual(actual, self.analyzer.perform_analysis()['annual_projections'])
+
+    def test_iter_annual_projections(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        self.analyzer.set_max_year(100)
+        actual = []
+        for projection in self.analyzer.iter_annual_projections():
+            actual.append(projection)
+            if projection['year'] == 10:
+                break
+        self.assertProjectionsAlmostEqual(expected[:10], actual)
+
+        # Up to date projections are not computed again.
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        for expected_projection, actual_projection in zip(expected, self.analyzer.iter_annual_projections()):
+            self.assertIs(expected_projection, actual_projection)
+
+        # The projections are computed by the projection engine.
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_VECTORIZED)
+        actual = list(self.analyzer.iter_annual_projections())
+        self.assertEqual(actual, self.analyzer.perform_analysis()['annual_projections'])
+        self.assertIsInstance(actual[0]['cash_flow'], Money)
+
+    def test_numeric_backends_match_decimal_backend(self):
+        for payment_frequency in (MORTGAGEKIT_MONTH, MORTGAGEKIT_WEEK):
+            self.analyzer.set_mortgage(
+                total_amount = Money(amount=250000, currency='USD'),
+                down_payment = Money(amount=50000, currency='USD'),
+                amortization_year = 25,
+                annual_interest_rate = Decimal(0.04),
+                payment_frequency = payment_frequency,
+                compounding_period = MORTGAGEKIT_SEMI_ANNUAL,
+                first_payment_date = '2008-01-01'
+            )
+            for loan_balance_method in (LOAN_BALANCE_METHOD_SCHEDULE, LOAN_BALANCE_METHOD_CLOSED_FORM):
+                self.analyzer.set_loan_balance_method(loan_balance_method)
+                for numeric_backend in (NUMERIC_BACKEND_FLOAT64, NUMERIC_BACKEND_INT64_CENTS):
+                    self.analyzer.set_numeric_backend(numeric_backend, verify=True)
+                    self.analyzer.perform_analysis()  # Raises if the backends differ.
+
+        # Amounts of the "int64_cents" backend are whole cents.
+        for projection in self.analyzer.perform_analysis()['annual_projections']:
+            self.assertEqual(projection['sales_price'].amount, projection['sales_price'].amount.quantize(Decimal('0.01')))
+
+    def test_projection_backend(self):
+        self.assertEqual(self.analyzer.get_projection_backend(), NUMERIC_BACKEND_DECIMAL)
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_VECTORIZED)
+        self.assertEqual(self.analyzer.get_projection_backend(), NUMERIC_BACKEND_FLOAT64)
+
+        # The numeric backend wins over the projection engine.
+        self.analyzer.set_numeric_backend(NUMERIC_BACKEND_INT64_CENTS)
+        self.assertEqual(self.analyzer.get_projection_backend(), NUMERIC_BACKEND_INT64_CENTS)
+        self.analyzer.set_projection_engine(PROJECTION_ENGINE_SCALAR)
+        self.assertEqual(self.analyzer.get_projection_backend(), NUMERIC_BACKEND_INT64_CENTS)
+
+    def test_compute_annual_projections_in_cents(self):
+        projection_arrays = compute_annual_projections(
+            purchase_price = 25000000,
+            selling_fee_rate = 0.06,
+            initial_investment = 5000000,
+            cash_flow_with_mortgage = 250001,
+            cash_flow_without_mortgage = 1500001,
+            loan_balances = np.array([10000000, 5000000, 0]),
+            sales_price_factors = appreciation_factors(0.025, 3),
+            in_cents = True
+        )
+        for key in ('sales_price', 'legal_fees', 'cash_flow', 'proceeds_of_sale', 'total_return'):
+            self.assertEqual(projection_arrays[key].dtype, np.int64)
+        self.assertEqual(projection_arrays['sales_price'][1], 26265625)  # 262656.25 exactly.
+        self.assertEqual(projection_arrays['cash_flow'][2], round_half_up(1500001 * 1.025 ** 3))
+        self.assertEqual(projection_arrays['proceeds_of_sale'][0], 25625000 - 1537500 - 10000000)
+
+    def test_default_numeric_backend(self):
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        set_default_numeric_backend(NUMERIC_BACKEND_INT64_CENTS)
+        try:
+            self.assertEqual(self.analyzer.get_numeric_backend(), NUMERIC_BACKEND_INT64_CENTS)
+            actual = self.analyzer.perform_analysis()['annual_projections']
+        finally:
+            set_default_numeric_backend(NUMERIC_BACKEND_DECIMAL)
+        self.assertEqual(compare_annual_projections(expected, actual, NUMERIC_BACKEND_INT64_CENTS), [])
+
+        # Verify the differences are reported.
+        actual[4] = dict(actual[4], total_return=actual[4]['total_return'] + Money(amount=1, currency='USD'))
+        self.assertEqual(len(compare_annual_projections(expected, actual, NUMERIC_BACKEND_INT64_CENTS)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
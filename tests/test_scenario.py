@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from decimal import Decimal
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_BI_WEEK, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from incomepropertyevaluatorkit.calculator.scenario import *
+from tests.test_parallel import get_spec
+
+
+class TestScenario(unittest.TestCase):
+
+    def setUp(self):
+        self.spec = get_spec(250000)
+        self.analyzer = create_analyzer(self.spec)
+        other_mortgage = dict(self.spec['mortgage'], payment_frequency=MORTGAGEKIT_BI_WEEK)
+        roof = [{'pk': 1, 'name_text': "Roof", 'amount': Money(amount=8000, currency='USD')}]
+        self.scenarios = []
+        for mortgage in (None, other_mortgage):
+            for inflation_rate in (Decimal('0.02'), Decimal('0.03')):
+                for capital_improvements in ([], roof):
+                    changes = {'inflation_rate': inflation_rate, 'capital_improvements': capital_improvements}
+                    if mortgage is not None:
+                        changes['mortgage'] = mortgage
+                    self.scenarios.append(changes)
+
+    def test_get_scenario_stage_counts(self):
+        counts = get_scenario_stage_counts(self.scenarios)
+        self.assertEqual(list(counts.items()), [('mortgage', 2), ('aggregation', 4), ('appreciation', 8)])
+
+    def test_evaluate_scenarios(self):
+        results = evaluate_scenarios(self.analyzer, self.scenarios, include_schedule=True)
+        self.assertEqual(len(results), 8)
+        for changes, actual in zip(self.scenarios, results):
+            expected = create_analyzer(dict(self.spec, **changes)).perform_analysis()
+            self.assertEqual(actual['analysis'], expected['analysis'])
+            self.assertEqual(actual['annual_projections'], expected['annual_projections'])
+
+        # The scenarios with the same loan share the schedule and the ones
+        # with the same totals share the aggregates.
+        self.assertIs(results[0]['mortgage']['schedule'], results[3]['mortgage']['schedule'])
+        self.assertEqual(len(results[4]['mortgage']['schedule']), 650)
+        self.assertIs(results[0]['analysis']['annual_cash_flow'], results[2]['analysis']['annual_cash_flow'])
+
+        # The analyzer is not modified.
+        self.assertEqual(len(self.analyzer.perform_analysis()['capital_improvements']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.sensitivity import *
+
+
+INFLATION_RATES = [0.01, 0.025]
+PURCHASE_PRICES = [200000, 250000, 300000]
+ANNUAL_INTEREST_RATES = [0.03, 0.05]
+RENT_MULTIPLIERS = [0.9, 1.1]
+
+
+def get_analyzer(inflation_rate=0.025, purchase_price=250000,
+                 annual_interest_rate=0.04, rent_multiplier=1, expense_multiplier=1,
+                 growth_curves=False):
+    analyzer = FinancialAnalyzer()
+    analyzer.set_purchase_price(Money(amount=purchase_price, currency='USD'))
+    analyzer.set_inflation_rate(Decimal(inflation_rate))
+    analyzer.set_selling_fee_rate(Decimal(0.06))
+    analyzer.set_buying_fee_rate(Decimal(0.006))
+    analyzer.set_mortgage(
+        total_amount = Money(amount=250000, currency='USD'),
+        down_payment = Money(amount=50000, currency='USD'),
+        amortization_year = 25,
+        annual_interest_rate = Decimal(annual_interest_rate),
+        payment_frequency = MORTGAGEKIT_MONTH,
+        compounding_period = MORTGAGEKIT_SEMI_ANNUAL,
+        first_payment_date = '2008-01-01'
+    )
+    analyzer.add_rental_income(1, Money(amount=12300 * rent_multiplier, currency='USD'), Decimal(1), Money(amount=1025 * rent_multiplier, currency='USD'), 1, "Duplex Units", Decimal(2),
+                               GrowthCurve(Decimal('0.05'), {5: Decimal('0.10')}) if growth_curves else None)
+    analyzer.add_expense(1, Money(amount=3222 * expense_multiplier, currency='USD'), Decimal(1), Money(amount=268.50 * expense_multiplier, currency='USD'), 1, "Property Tax",
+                         GrowthCurve(Decimal('0.04')) if growth_curves else None)
+    analyzer.add_purchase_fee(1, "Down Payment", Money(amount=50000, currency='USD'))
+    return analyzer
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def test_get_sensitivity_axes(self):
+        axes = get_sensitivity_axes(get_analyzer(), purchase_prices=PURCHASE_PRICES)
+        self.assertEqual(tuple(axes.keys()), SENSITIVITY_AXES)
+        np.testing.assert_array_equal(axes['purchase_price'], PURCHASE_PRICES)
+        np.testing.assert_array_almost_equal(axes['inflation_rate'], [0.025])
+        np.testing.assert_array_equal(axes['rent_multiplier'], [1.0])
+
+    def test_perform_sensitivity_analysis(self):
+        results = perform_sensitivity_analysis(
+            get_analyzer(),
+            inflation_rates = INFLATION_RATES,
+            purchase_prices = PURCHASE_PRICES,
+            annual_interest_rates = ANNUAL_INTEREST_RATES,
+            rent_multipliers = RENT_MULTIPLIERS,
+            chunk_size = 5
+        )
+        self.assertEqual(results['analysis']['cap_rate_with_mortgage'].shape, (2, 3, 2, 1, 2, 1))
+        self.assertEqual(results['annual_projections']['annualized_roi_rate'].shape, (2, 3, 2, 1, 2, 1, 30))
+
+        # Verify a few points of the grid against the "FinancialAnalyzer"; it
+        # uses the closed form loan balances so the payoff year matches.
+        for index in ((0, 0, 0, 0, 0, 0), (1, 2, 1, 0, 1, 0), (0, 1, 1, 0, 0, 0)):
+            analyzer = get_analyzer(
+                INFLATION_RATES[index[0]], PURCHASE_PRICES[index[1]],
+                ANNUAL_INTEREST_RATES[index[2]], RENT_MULTIPLIERS[index[4]]
+            )
+            analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+            expected = analyzer.perform_analysis()
+            for key in ('annual_cash_flow', 'cap_rate_with_mortgage', 'cap_rate_without_mortgage'):
+                self.assertAlmostEqual(results['analysis'][key][index], float(getattr(expected['analysis'][key], 'amount', expected['analysis'][key])), 6)
+            for year_index, projection in enumerate(expected['annual_projections']):
+                self.assertAlmostEqual(results['annual_projections']['cash_flow'][index + (year_index,)], float(projection['cash_flow'].amount), 4)
+                self.assertAlmostEqual(results['annual_projections']['roi_rate'][index + (year_index,)], float(projection['roi_rate']), 4)
+                self.assertAlmostEqual(results['annual_projections']['annualized_roi_rate'][index + (year_index,)], projection['annualized_roi_rate'], 8)
+
+    def test_perform_sensitivity_analysis_with_growth_curves(self):
+        expense_multipliers = [1.0, 1.2]
+        results = perform_sensitivity_analysis(
+            get_analyzer(growth_curves=True),
+            inflation_rates = INFLATION_RATES,
+            rent_multipliers = RENT_MULTIPLIERS,
+            expense_multipliers = expense_multipliers
+        )
+        for index in ((0, 0, 0, 0, 0, 0), (1, 0, 0, 0, 1, 1)):
+            analyzer = get_analyzer(
+                INFLATION_RATES[index[0]], rent_multiplier=RENT_MULTIPLIERS[index[4]],
+                expense_multiplier=expense_multipliers[index[5]], growth_curves=True
+            )
+            analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+            expected = analyzer.perform_analysis()
+            for year_index, projection in enumerate(expected['annual_projections']):
+                self.assertAlmostEqual(results['annual_projections']['total_return'][index + (year_index,)], float(projection['total_return'].amount), 4)
+                self.assertAlmostEqual(results['annual_projections']['roi_rate'][index + (year_index,)], float(projection['roi_rate']), 4)
+                self.assertAlmostEqual(results['annual_projections']['annualized_roi_rate'][index + (year_index,)], projection['annualized_roi_rate'], 8)
+
+    def test_perform_sensitivity_analysis_without_fee_rates(self):
+        analyzer = FinancialAnalyzer()
+        analyzer.set_purchase_price(Money(amount=250000, currency='USD'))
+        analyzer.set_mortgage(
+            total_amount = Money(amount=250000, currency='USD'),
+            down_payment = Money(amount=50000, currency='USD'),
+            amortization_year = 25,
+            annual_interest_rate = Decimal(0.04),
+            payment_frequency = MORTGAGEKIT_MONTH,
+            compounding_period = MORTGAGEKIT_SEMI_ANNUAL,
+            first_payment_date = '2008-01-01'
+        )
+        analyzer.add_rental_income(1, Money(amount=12300, currency='USD'), Decimal(1), Money(amount=1025, currency='USD'), 1, "Duplex Units", Decimal(2))
+        analyzer.add_purchase_fee(1, "Down Payment", Money(amount=50000, currency='USD'))
+        analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+        results = perform_sensitivity_analysis(analyzer, purchase_prices = PURCHASE_PRICES)
+        np.testing.assert_array_equal(results['axes']['selling_fee_rate'], [0.0])
+        expected = analyzer.perform_analysis()['annual_projections']
+        for year_index, projection in enumerate(expected):
+            self.assertAlmostEqual(results['annual_projections']['proceeds_of_sale'][(0, 1, 0, 0, 0, 0, year_index)], float(projection['proceeds_of_sale'].amount), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import unittest
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.foundation.constants import *
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.simulation import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = create_analyzer(get_spec(250000))
+
+    def test_simulate_mortgage(self):
+        calculator = self.analyzer._mortgage_calculator
+        annual_mortgage_payments, loan_balances = simulate_mortgage(200000, np.full((2, 30), 0.04), 12, 2, 25)
+        expected = loan_balances_at_eoy(
+            200000, calculator.get_interest_rate_per_payment_frequency(),
+            float(calculator.get_mortgage_payment_per_payment_frequency().amount), 12, 25, 30
+        )
+        np.testing.assert_allclose(loan_balances[1], expected, atol=1e-6)
+        np.testing.assert_allclose(annual_mortgage_payments[0, :25], float(calculator.get_annual_mortgage_payment().amount))
+        np.testing.assert_array_equal(annual_mortgage_payments[0, 25:], 0.0)
+
+    def test_simulation_without_volatility_matches_analyzer(self):
+        self.analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        results = perform_monte_carlo_simulation(self.analyzer, 3, seed=1)
+        for year_index, projection in enumerate(expected):
+            self.assertAlmostEqual(results['proceeds_of_sale']['mean'][year_index], float(projection['proceeds_of_sale'].amount), 4)
+            self.assertAlmostEqual(results['roi_rate']['percentiles'][0, year_index], float(projection['roi_rate']), 4)
+            self.assertAlmostEqual(results['annualized_roi_rate']['percentiles'][-1, year_index], projection['annualized_roi_rate'], 8)
+
+    def test_simulation_with_growth_curves_matches_analyzer(self):
+        self.analyzer.add_facility_income(1, Money(amount=1200, currency='USD'), Decimal(1), Money(amount=100, currency='USD'), 1, "Parking", GrowthCurve(Decimal('0.05')))
+        self.analyzer.add_expense(2, Money(amount=600, currency='USD'), Decimal(1), Money(amount=50, currency='USD'), 1, "Insurance", GrowthCurve(Decimal('0.05')))
+        self.analyzer.set_loan_balance_method(LOAN_BALANCE_METHOD_CLOSED_FORM)
+        expected = self.analyzer.perform_analysis()['annual_projections']
+        results = perform_monte_carlo_simulation(self.analyzer, 3, seed=1)
+        for year_index, projection in enumerate(expected):
+            self.assertAlmostEqual(results['roi_rate']['percentiles'][0, year_index], float(projection['roi_rate']), 4)
+            self.assertAlmostEqual(results['annualized_roi_rate']['percentiles'][-1, year_index], projection['annualized_roi_rate'], 8)
+
+    def test_simulation_is_reproducible(self):
+        kwargs = {
+            'number_of_paths': 50,
+            'seed': 42,
+            'inflation_rate_volatility': 0.01,
+            'appreciation_rate_volatility': 0.03,
+            'vacancy_rate': 0.05,
+            'vacancy_rate_volatility': 0.02,
+            'interest_rate_volatility': 0.005,
+            'include_paths': True
+        }
+        results = perform_monte_carlo_simulation(self.analyzer, chunk_size=50, **kwargs)
+        self.assertEqual(results['annualized_roi_rate']['paths'].shape, (50, 30))
+        self.assertEqual(results['annualized_roi_rate']['percentiles'].shape, (len(SIMULATION_PERCENTILES), 30))
+
+        # The chunk size does not change the paths.
+        chunked_results = perform_monte_carlo_simulation(self.analyzer, chunk_size=7, **kwargs)
+        for key in SIMULATION_ARRAY_KEYS:
+            np.testing.assert_array_equal(results[key]['paths'], chunked_results[key]['paths'])
+
+        # The percentiles are sorted.
+        self.assertTrue(np.all(np.diff(results['proceeds_of_sale']['percentiles'], axis=0) >= 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
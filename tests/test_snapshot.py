@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from __future__ import print_function
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from moneyed import Money # Third party library for "Money" datatype.
+from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
+from incomepropertyevaluatorkit.calculator.analyzer import *
+from incomepropertyevaluatorkit.calculator.growth import *
+from incomepropertyevaluatorkit.calculator.snapshot import *
+from incomepropertyevaluatorkit.calculator.parallel import create_analyzer
+from tests.test_parallel import get_spec
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.analyzer = create_analyzer(get_spec(250000))
+        self.analyzer.add_expense(**dict(self.analyzer.get_expense(1), growth_curve=GrowthCurve(Decimal('0.03'))))
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_analyzer_snapshot(self):
+        analyzer = load_analyzer(dump_analyzer(self.analyzer))
+        self.assertEqual(analyzer.get_expense(1), self.analyzer.get_expense(1))
+        self.assertEqual(analyzer._mortgage_terms, self.analyzer._mortgage_terms)
+        self.assertEqual(analyzer.perform_analysis()['annual_projections'], self.analyzer.perform_analysis()['annual_projections'])
+
+        # The inputs are restored through the setters.
+        self.analyzer.set_max_year(10)
+        self.analyzer.set_numeric_backend(NUMERIC_BACKEND_FLOAT64, verify=True)
+        analyzer = load_analyzer(dump_analyzer(self.analyzer))
+        self.assertEqual(analyzer.get_max_year(), 10)
+        self.assertEqual(analyzer.get_numeric_backend(), NUMERIC_BACKEND_FLOAT64)
+        self.assertEqual(analyzer.get_inflation_curve(), self.analyzer.get_inflation_curve())
+        self.assertEqual(len(analyzer.perform_analysis()['annual_projections']), 10)
+
+    def test_decode_value(self):
+        self.assertEqual(decode_value(encode_value(datetime(2008, 1, 1, 12))), datetime(2008, 1, 1, 12))
+        with self.assertRaises(AssertionError):
+            decode_value({'unknown': 1})
+
+    def test_results_snapshot(self):
+        expected = self.analyzer.perform_analysis()
+        actual = load_results(dump_results(expected))
+        self.assertEqual(actual['purchase_price'], expected['purchase_price'])
+        self.assertEqual(actual['expenses'][1], expected['expenses'][1])
+        self.assertAlmostEqual(actual['analysis']['annual_cash_flow'].amount, expected['analysis']['annual_cash_flow'].amount, 8)
+        self.assertEqual(len(actual['mortgage']['schedule']), len(expected['mortgage']['schedule']))
+        self.assertEqual(actual['mortgage']['schedule'][-1]['paymentData'], expected['mortgage']['schedule'][-1]['paymentData'])
+        for expected_projection, actual_projection in zip(expected['annual_projections'], actual['annual_projections']):
+            self.assertEqual(set(actual_projection), set(expected_projection))
+            self.assertEqual(actual_projection['year'], expected_projection['year'])
+            self.assertAlmostEqual(actual_projection['total_return'].amount, expected_projection['total_return'].amount, 8)
+            self.assertEqual(actual_projection['roi_rate'], expected_projection['roi_rate'])
+            self.assertEqual(actual_projection['annualized_roi_rate'], expected_projection['annualized_roi_rate'])
+
+        # Results without a schedule.
+        actual = load_results(dump_results(self.analyzer.perform_analysis(include_schedule=False)))
+        self.assertIsNone(actual['mortgage']['schedule'])
+
+    def test_results_snapshot_with_datetime_payment_dates(self):
+        mortgage_terms = dict(self.analyzer._mortgage_terms, first_payment_date=datetime(2008, 1, 1))
+        self.analyzer.set_mortgage(**mortgage_terms)
+        expected = self.analyzer.perform_analysis()
+        self.assertIsInstance(expected['mortgage']['schedule'][0]['paymentData'], datetime)
+        actual = load_results(dump_results(expected))
+        self.assertEqual(
+            [payment['paymentData'] for payment in actual['mortgage']['schedule']],
+            [payment['paymentData'] for payment in expected['mortgage']['schedule']]
+        )
+
+        # The analyzer snapshot keeps the datetime too.
+        analyzer = load_analyzer(dump_analyzer(self.analyzer))
+        self.assertEqual(analyzer._mortgage_terms['first_payment_date'], datetime(2008, 1, 1))
+
+    def test_snapshot_version(self):
+        snapshot = bytearray(dump_analyzer(self.analyzer))
+        SNAPSHOT_HEADER.pack_into(snapshot, 0, SNAPSHOT_MAGIC, SNAPSHOT_VERSION + 1, SNAPSHOT_KIND_ANALYZER, 0, 0, len(snapshot))
+        with self.assertRaises(AssertionError):
+            load_analyzer(snapshot)
+
+    def test_archive(self):
+        path = os.path.join(self.directory, 'results.ipek')
+        results = []
+        with open(path, 'wb') as file_object:
+            writer = SnapshotWriter(file_object)
+            writer.write_analyzer(self.analyzer)
+            for purchase_price in (200000, 250000, 300000):
+                self.analyzer.set_purchase_price(Money(amount=purchase_price, currency='USD'))
+                results.append(self.analyzer.perform_analysis(include_schedule=False))
+                writer.write_results(results[-1])
+
+        with SnapshotReader(path) as reader:
+            self.assertEqual(len(reader), 4)
+            self.assertIsInstance(reader[0], FinancialAnalyzer)
+            self.assertEqual(reader[2]['purchase_price'], Money(amount=250000, currency='USD'))
+            roi_rates = reader.get_column('annual_projections/roi_rate')
+            self.assertEqual(roi_rates.shape, (3, 30))
+            self.assertEqual(roi_rates[2, -1], float(results[2]['annual_projections'][-1]['roi_rate']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
+import numpy as np
 from moneyed import Money # Third party library for "Money" datatype.
 from mortgagekit.calculator import MORTGAGEKIT_MONTH, MORTGAGEKIT_SEMI_ANNUAL
 from incomepropertyevaluatorkit.foundation.constants import *
@@ -21,6 +23,13 @@ class TestUtils(unittest.TestCase):
         actual = rate_decimal(Decimal(666.00))
         self.assertAlmostEqual(actual, Decimal(666.00))
 
+    def test_round_rates_half_up(self):
+        rates = [0.00125, -0.00125, 0.00005, 0.123449, 2.5e-05, 1.00015, float('nan')]
+        actual = round_rates_half_up(rates)
+        for rate, actual_rate in zip(rates[:-1], actual[:-1]):
+            self.assertEqual(actual_rate, float(rate_decimal(rate)))
+        self.assertTrue(np.isnan(actual[-1]))
+
     def test_appreciated_value(self):
         initial_value = Money(amount=666.00, currency="USD")
         inflation_rate = Decimal(0.25)
@@ -44,6 +53,42 @@ class TestUtils(unittest.TestCase):
         expect = Decimal(0.0000)
         self.assertAlmostEqual(actual, expect, 2)
 
+    def test_goal_seek(self):
+        # CASE 1 - Linear functions are solved by the first secant step.
+        self.assertAlmostEqual(goal_seek(lambda x: 3 * x + 1, 7, -100, 100), 2.0, 10)
+
+        # CASE 2 - Non-linear function.
+        self.assertAlmostEqual(goal_seek(lambda x: x ** 3, 2, 0, 10), 2 ** (1.0 / 3.0), 6)
+
+        # CASE 3 - Target is not reached between the bounds.
+        self.assertIsNone(goal_seek(lambda x: x, 200, 0, 10))
+
+    def test_internal_rate_of_return(self):
+        # CASE 1 - Single period.
+        actual = internal_rate_of_return([-100, 110])
+        self.assertAlmostEqual(actual, 0.10, 10)
+
+        # CASE 2 - Compare with the "numpy.roots" approach "numpy.irr" used.
+        values = [-50000, 3000, 3100, 3200, 3300, 62000]
+        roots = np.roots(values[::-1])
+        roots = roots[(roots.imag == 0) & (roots.real > 0)].real
+        rates = 1 / roots - 1
+        expect = rates[np.argmin(np.abs(rates))]
+        actual = internal_rate_of_return(values)
+        self.assertAlmostEqual(actual, expect, 8)
+
+        # CASE 3 - Warm started from a nearby rate gives the same result.
+        actual = internal_rate_of_return(values, guess=expect + 0.01)
+        self.assertAlmostEqual(actual, expect, 8)
+
+        # CASE 4 - Multiple sign changes falls back to bracketing.
+        actual = internal_rate_of_return([-100, 230, -132])
+        self.assertAlmostEqual(actual, 0.10, 8)
+
+        # CASE 5 - No sign change means there is no IRR.
+        actual = internal_rate_of_return([-100, -50])
+        self.assertTrue(np.isnan(actual))
+
     def test_replace_all(self):
         data = "Hello world, my name is {{ name }}! {{ extra }}"
         rep = {
@@ -53,6 +98,21 @@ class TestUtils(unittest.TestCase):
         out_data = replace_all(data, rep)
         self.assertEqual(out_data, "Hello world, my name is Chambers! How are you?")
 
+    def test_render_template(self):
+        template = compile_template("Hello world, my name is {{ name }}! {{ extra }}{{ name }}")
+        self.assertEqual(template[1], ("{{ name }}", "{{ extra }}", "{{ name }}"))
+        out_data = render_template(template, {"{{ name }}": "Chambers"})
+        self.assertEqual(out_data, "Hello world, my name is Chambers! {{ extra }}Chambers")
+        self.assertEqual(render_template(compile_template("No placeholders"), {}), "No placeholders")
+
+    def test_iter_chunks_in_parallel(self):
+        def square_chunk(chunk, offset):
+            return [(index, item * item + offset) for index, item in chunk]
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pairs = iter_chunks_in_parallel(executor, square_chunk, iter(range(7)), 2, 1, 2, 1)
+            self.assertEqual(sorted(pairs), [(index, index * index + 1) for index in range(7)])
+
 
 if __name__ == '__main__':
     unittest.main()